@@ -1,57 +1,461 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, g, has_request_context
 import os
-import random
 import numpy as np
 from datetime import datetime
 import json
-from collections import Counter
+import sys
+import atexit
+import logging
+import queue
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from collections import Counter, namedtuple
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+import hashlib
+import hmac
+import copy
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, wraps
+from itertools import combinations, permutations
+from math import comb
+from multiprocessing import shared_memory
 
-# pandas는 선택적으로 import
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+# pandas는 스냅샷 재생성 때만 필요하므로 설치 여부만 확인하고 import는 미룬다
+PANDAS_AVAILABLE = importlib.util.find_spec('pandas') is not None
+if PANDAS_AVAILABLE:
     print("✅ pandas 사용 가능")
-except ImportError:
-    PANDAS_AVAILABLE = False
+else:
     print("⚠️ pandas 없음 - 기본 모드로 동작")
 
+CSV_PATH = 'new_1196.csv'
+SNAPSHOT_DIR = 'new_1196.snapshot'
+MODEL_DIR = os.environ.get('MODEL_DIR', 'models')
+RELOAD_TRIGGER_PATH = os.environ.get('RELOAD_TRIGGER_PATH', 'new_1196.reload')
+DATASET_WATCH_INTERVAL = float(os.environ.get('DATASET_WATCH_INTERVAL', '5'))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+SNAPSHOT_FORMAT_VERSION = 6
+SNAPSHOT_ARRAYS = (
+    'rounds', 'dates', 'numbers', 'bonus', 'analysis_counts', 'pair_counts', 'triple_counts', 'cumulative_counts',
+    'gap_stats', 'gap_histogram', 'transition_counts'
+)
+
 # Flask 앱 초기화
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'lottopro-dev-key-2024')
 
-# 글로벌 변수
-sample_data = None
-csv_dataframe = None
-frequency_analysis = None
-trend_analysis = None
-pattern_analysis = None
-latest_round_info = None
+# 글로벌 변수 (데이터셋은 Dataset 객체 하나로 게시하고 리로드 시 참조만 교체)
+active_dataset = None
+warmed_version = None
+shared_dataset = None
+response_cache = {}
+RESPONSE_CACHE_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_MAX_AGE', '60'))
+data_lock = threading.RLock()
+
+# 로깅 설정
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0.01'))
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+LOG_LEVEL_NO = LOG_LEVELS.get(LOG_LEVEL.lower(), logging.INFO)
+
+logger = logging.getLogger('lottopro')
+_log_listener = None
+_log_pid = None
+_log_setup_lock = threading.Lock()
+log_dropped = 0
+
+class JsonLogFormatter(logging.Formatter):
+    """로그 한 건 → JSON 한 줄"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'msg': record.getMessage(),
+            'pid': record.process
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry['request_id'] = request_id
+        return json.dumps(entry, ensure_ascii=False)
+
+class DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버리는 QueueHandler (요청 스레드가 로그 때문에 막히지 않게)"""
+
+    def enqueue(self, record):
+        global log_dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_dropped += 1
+
+def configure_logging():
+    """로그 큐 + 백그라운드 출력 스레드 구성
+
+    요청 스레드는 큐에 넣기만 하고 stdout 쓰기는 QueueListener 스레드가 맡는다.
+    fork 된 프로세스에는 출력 스레드가 없으므로 safe_log가 pid 변화를 보고 다시 호출한다.
+    """
+    global _log_listener, _log_pid
+    with _log_setup_lock:
+        if _log_pid == os.getpid():
+            return
+        log_queue = queue.Queue(LOG_QUEUE_SIZE)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if LOG_FORMAT == 'json':
+            stream_handler.setFormatter(JsonLogFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter('[LOG] %(message)s'))
+        
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(DroppingQueueHandler(log_queue))
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        
+        _log_listener = QueueListener(log_queue, stream_handler)
+        _log_listener.start()
+        _log_pid = os.getpid()
+
+@atexit.register
+def flush_logging():
+    """종료 시 큐에 남은 로그를 모두 출력"""
+    if _log_listener is not None and _log_pid == os.getpid():
+        _log_listener.stop()
 
-def safe_log(message):
-    """안전한 로깅"""
+def safe_log(message, level=None):
+    """안전한 로깅
+
+    level을 주지 않으면 메시지의 ❌ / ⚠️ 표시로 error / warning을 정하고 나머지는 info.
+    요청 처리 중의 debug 로그는 LOG_DEBUG_SAMPLE_RATE 비율로 뽑힌 요청만 남긴다.
+    """
     try:
-        print(f"[LOG] {message}")
+        message = str(message)
+        if level is None:
+            levelno = logging.ERROR if '❌' in message else logging.WARNING if '⚠️' in message else logging.INFO
+        else:
+            levelno = LOG_LEVELS[level]
+        
+        if levelno < LOG_LEVEL_NO and LOG_DEBUG_SAMPLE_RATE <= 0:
+            return
+        
+        request_id = None
+        if has_request_context():
+            request_id = g.get('request_id')
+            if levelno < LOG_LEVEL_NO and not g.get('log_sampled'):
+                return
+        elif levelno < LOG_LEVEL_NO:
+            return
+        
+        if _log_pid != os.getpid():
+            configure_logging()
+        logger.log(levelno, message, extra={'request_id': request_id})
     except:
         pass
 
-def load_csv_data_completely():
+# 지연 시간 히스토그램 버킷 (초)
+METRIC_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class MetricsRegistry:
+    """Prometheus 텍스트 형식 지표 수집기
+
+    카운터와 히스토그램은 스레드마다 따로 가진 샤드에 기록하므로 기록 경로에
+    잠금이 없다 (새 스레드가 처음 기록할 때 샤드 등록만 잠금). /metrics 수집 시에만
+    모든 샤드를 합친다. 게이지는 수집 시점에 등록된 함수를 호출해 값을 읽는다.
+
+    directory를 지정하면 (gunicorn 멀티 워커) 프로세스마다 자기 합계를
+    directory/metrics-<pid>.json에 주기적으로 덮어쓰고, 수집 시 모든 파일을 합친다.
+    끝난 워커의 파일도 남겨 두므로 어느 워커가 응답하든 카운터가 줄어들지 않는다.
+    게이지는 살아 있는 프로세스별로 pid 라벨을 붙여 내보낸다.
+    """
+
+    def __init__(self, buckets=METRIC_BUCKETS, directory=None):
+        self.buckets = tuple(buckets)
+        self.directory = directory or None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._descriptions = {}
+        self._gauges = {}
+        self._flusher_pid = None
+        self._flusher_stop = threading.Event()
+
+    def describe(self, name, kind, help_text):
+        self._descriptions[name] = (kind, help_text)
+
+    def gauge(self, name, help_text, fn):
+        """수집 시 fn()을 호출하는 게이지. fn은 숫자 또는 [(labels, 값), ...]을 반환"""
+        self.describe(name, 'gauge', help_text)
+        self._gauges[name] = fn
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {'counters': {}, 'histograms': {}}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def inc(self, name, labels=(), value=1):
+        counters = self._shard()['counters']
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard()['histograms']
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        histogram[0][bisect_left(self.buckets, seconds)] += 1
+        histogram[1] += seconds
+
+    @contextmanager
+    def timer(self, name, labels=()):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, labels, time.perf_counter() - started)
+
+    def timed(self, name, labels=()):
+        """함수 실행 시간을 히스토그램에 기록하는 데코레이터"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def take_local(self):
+        """현재 스레드 샤드를 꺼내고 비운다 (예측 워커 프로세스 → 부모로 전달용)"""
+        shard = self._shard()
+        taken = {'counters': shard['counters'], 'histograms': shard['histograms']}
+        shard['counters'], shard['histograms'] = {}, {}
+        return taken
+
+    def merge(self, taken):
+        """take_local()로 받은 기록을 현재 스레드 샤드에 더한다"""
+        for (name, labels), value in taken['counters'].items():
+            self.inc(name, labels, value)
+        histograms = self._shard()['histograms']
+        for key, (buckets, total) in taken['histograms'].items():
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0] = [a + b for a, b in zip(histogram[0], buckets)]
+            histogram[1] += total
+
+    def counter_totals(self, name):
+        """라벨별 카운터 합계 {labels: 값}"""
+        totals = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for (metric, labels), value in list(shard['counters'].items()):
+                if metric == name:
+                    totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def reset(self):
+        """fork 직후: 부모에서 복제된 기록을 버린다 (부모 기록은 부모가 자기 파일에 남김)"""
+        with self._lock:
+            self._shards = []
+            self._local = threading.local()
+
+    def _merge_shards(self, shards, counters, histograms):
+        for shard in shards:
+            for key, value in list(shard['counters'].items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, (buckets, total) in list(shard['histograms'].items()):
+                merged = histograms.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+
+    def _local_totals(self):
+        """이 프로세스의 카운터 / 히스토그램 합계"""
+        with self._lock:
+            shards = list(self._shards)
+        counters, histograms = {}, {}
+        self._merge_shards(shards, counters, histograms)
+        return counters, histograms
+
+    def _gauge_series(self):
+        """{name: [(labels, 값), ...]} (실패하거나 None인 게이지는 제외)"""
+        series = {}
+        for name, fn in self._gauges.items():
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            series[name] = value if isinstance(value, list) else [((), value)]
+        return series
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'metrics-{pid}.json')
+
+    def flush(self, include_gauges=True):
+        """이 프로세스의 합계를 directory/metrics-<pid>.json에 원자적으로 덮어쓴다"""
+        if not self.directory:
+            return
+        counters, histograms = self._local_totals()
+        gauges = self._gauge_series() if include_gauges else {}
+        payload = {
+            'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+            'histograms': [[name, labels, buckets, total] for (name, labels), (buckets, total) in histograms.items()],
+            'gauges': [[name, labels, float(v)] for name, series in gauges.items() for labels, v in series]
+        }
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def clear_directory(self):
+        """마스터 시작 시: 이전 실행이 남긴 지표 파일 삭제"""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if name.startswith('metrics-'):
+                os.remove(os.path.join(self.directory, name))
+
+    def start_flusher(self, interval):
+        """이 프로세스의 합계를 interval초마다 파일로 내보내는 데몬 스레드 (이미 실행 중이면 무시)"""
+        if not self.directory or interval <= 0 or self._flusher_pid == os.getpid():
+            return False
+        self._flusher_pid = os.getpid()
+        self._flusher_stop = threading.Event()
+        threading.Thread(target=self._run_flusher, args=(interval,), name='metrics-flusher', daemon=True).start()
+        return True
+
+    def _run_flusher(self, interval):
+        while not self._flusher_stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                safe_log(f"⚠️ 지표 파일 기록 실패: {str(e)}")
+
+    def _read_directory(self):
+        """모든 프로세스 파일을 합친 (카운터, 히스토그램, 살아 있는 프로세스의 pid별 게이지)"""
+        counters, histograms, gauges = {}, {}, {}
+        self.flush()
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                continue
+            pid = name[len('metrics-'):-len('.json')]
+            shard = {
+                'counters': {(metric, tuple(map(tuple, labels))): value for metric, labels, value in payload['counters']},
+                'histograms': {
+                    (metric, tuple(map(tuple, labels))): (buckets, total)
+                    for metric, labels, buckets, total in payload['histograms']
+                }
+            }
+            self._merge_shards([shard], counters, histograms)
+            if payload['gauges'] and process_alive(int(pid)):
+                for metric, labels, value in payload['gauges']:
+                    gauges.setdefault(metric, []).append((tuple(map(tuple, labels)) + (('pid', pid),), value))
+        return counters, histograms, gauges
+
+    def render(self):
+        """모든 샤드(멀티 프로세스 모드면 모든 프로세스 파일)를 합쳐 Prometheus 텍스트 노출 형식으로 반환"""
+        if self.directory:
+            counters, histograms, gauges = self._read_directory()
+        else:
+            (counters, histograms), gauges = self._local_totals(), self._gauge_series()
+        
+        samples = {}
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), (buckets, total) in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), buckets):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        for name, series in gauges.items():
+            samples[name] = [f"{name}{format_labels(labels)} {float(v):g}" for labels, v in series]
+        
+        output = []
+        for name in sorted(samples):
+            kind, help_text = self._descriptions.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+def process_alive(pid):
+    """pid 프로세스가 살아 있는지 (신호 0 전송)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def format_labels(labels):
+    """(('route', '/api/predict'), ...) → {route="/api/predict",...}"""
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '1'))
+
+metrics = MetricsRegistry(directory=METRICS_DIR)
+metrics.describe('lottopro_http_requests_total', 'counter', 'HTTP 요청 수 (라우트, 메서드, 상태 코드별)')
+metrics.describe('lottopro_http_request_duration_seconds', 'histogram', 'HTTP 요청 처리 시간 (스트리밍은 첫 응답까지)')
+metrics.describe('lottopro_csv_load_seconds', 'histogram', 'load_csv_data_completely 실행 시간')
+metrics.describe('lottopro_analysis_seconds', 'histogram', 'analyze_* 분석 실행 시간')
+metrics.describe('lottopro_generate_seconds', 'histogram', '모델별 티켓 배치 생성 시간')
+metrics.describe('lottopro_generate_tickets_total', 'counter', '모델별 생성 티켓 수')
+metrics.describe('lottopro_coverage_seconds', 'histogram', '모델별 커버리지 티켓 최적화 시간')
+metrics.describe('lottopro_response_cache_requests_total', 'counter', '응답 캐시 조회 수 (hit/miss)')
+metrics.describe('lottopro_dataset_reloads_total', 'counter', '데이터셋 리로드 시도 수 (결과별)')
+metrics.describe('lottopro_dataset_reload_seconds', 'histogram', '데이터셋 리로드 (빌드 + 게시) 시간')
+metrics.describe('lottopro_cache_warm_seconds', 'histogram', '데이터셋 게시 후 캐시 예열 시간')
+
+@metrics.timed('lottopro_csv_load_seconds')
+def load_csv_data_completely(csv_path=None):
     """CSV 파일을 완전히 로드하고 검증"""
-    global csv_dataframe, latest_round_info, PANDAS_AVAILABLE
-    
+    csv_path = csv_path or CSV_PATH
     safe_log("=== CSV 완전 로드 시작 ===")
     
     if not PANDAS_AVAILABLE:
         safe_log("pandas 없음 - 텍스트 모드로 시도")
-        return load_csv_as_text()
+        return load_csv_as_text(csv_path)
     
     try:
-        csv_path = 'new_1196.csv'
         
         if not os.path.exists(csv_path):
             safe_log(f"❌ CSV 파일 없음: {csv_path}")
             return None
         
         # CSV 로드
+        import pandas as pd
         df = pd.read_csv(csv_path)
         safe_log(f"✅ CSV 로드 성공: {len(df)}회차, {len(df.columns)}개 컬럼")
         
@@ -76,6 +480,7 @@ def load_csv_data_completely():
                 ],
                 'bonus': int(latest_row['bonus num'])
             }
+            df.attrs['latest_round_info'] = latest_round_info
             safe_log(f"✅ 최신 회차: {latest_round_info['round']}회차 ({latest_round_info['draw_date']})")
             safe_log(f"   당첨번호: {latest_round_info['numbers']}, 보너스: {latest_round_info['bonus']}")
         except Exception as e:
@@ -85,15 +490,13 @@ def load_csv_data_completely():
         
     except Exception as e:
         safe_log(f"❌ CSV 로드 실패: {str(e)}")
-        return load_csv_as_text()
+        return load_csv_as_text(csv_path)
 
-def load_csv_as_text():
+def load_csv_as_text(csv_path=None):
     """pandas 없을 때 텍스트로 CSV 로드 (마지막 행이 최신)"""
-    global latest_round_info
-    
     try:
         safe_log("텍스트 모드로 CSV 로드 시도")
-        csv_path = 'new_1196.csv'
+        csv_path = csv_path or CSV_PATH
         
         if not os.path.exists(csv_path):
             safe_log(f"❌ CSV 파일 없음: {csv_path}")
@@ -131,7 +534,8 @@ def load_csv_as_text():
                 return {
                     'data': lines[1:],  # 헤더 제외한 모든 데이터
                     'length': len(lines) - 1,
-                    'mode': 'text'
+                    'mode': 'text',
+                    'latest_round_info': latest_round_info
                 }
             except Exception as e:
                 safe_log(f"텍스트 파싱 실패: {str(e)}")
@@ -142,70 +546,213 @@ def load_csv_as_text():
         safe_log(f"텍스트 모드 로드 실패: {str(e)}")
         return None
 
+class DrawStore:
+    """회차별 당첨번호 컬럼형 저장소
+
+    전체 이력을 (N, 6) uint8 행렬 하나로 보관하고 보너스/회차/추첨일은
+    같은 길이의 벡터로 둔다. 행은 회차 오름차순(마지막 행이 최신)이다.
+    버퍼는 여유 용량을 두고 잡아서 append는 분할상환 O(1)이다.
+    fork()로 만든 버전들은 버퍼를 공유한다. 버퍼 끝에는 가장 긴 버전만 행을 덧붙이고,
+    각 버전은 자기 길이(_size)까지만 읽으므로 이전 버전이 보는 내용은 바뀌지 않는다.
+    """
+
+    def __init__(self, rounds, dates, numbers, bonus):
+        rounds = np.asarray(rounds, dtype=np.int32)
+        order = np.argsort(rounds, kind='stable')
+
+        self._rounds = np.ascontiguousarray(rounds[order])
+        self._dates = np.asarray(dates, dtype='U10')[order]
+        # 각 행은 오름차순 정렬해서 보관 (패턴 분석이 정렬된 번호를 사용)
+        self._numbers = np.ascontiguousarray(
+            np.sort(np.asarray(numbers, dtype=np.uint8).reshape(-1, 6)[order], axis=1)
+        )
+        self._bonus = np.ascontiguousarray(np.asarray(bonus, dtype=np.uint8)[order])
+        self._size = len(self._rounds)
+        # 버퍼를 공유하는 버전들 중 가장 긴 길이 (fork 참고)
+        self._tail = [self._size]
+
+        # 회차 → 행 위치 O(1) 조회 테이블
+        max_round = int(self._rounds[-1]) if self._size else 0
+        self._row_by_round = np.full(max_round + 1, -1, dtype=np.int32)
+        self._row_by_round[self._rounds] = np.arange(self._size, dtype=np.int32)
+
+    @property
+    def rounds(self):
+        return self._rounds[:self._size]
+
+    @property
+    def dates(self):
+        return self._dates[:self._size]
+
+    @property
+    def numbers(self):
+        return self._numbers[:self._size]
+
+    @property
+    def bonus(self):
+        return self._bonus[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def latest_round(self):
+        return int(self._rounds[self._size - 1]) if self._size else 0
+
+    def append(self, round_no, draw_date, numbers, bonus):
+        """최신 회차 한 건 추가 (분할상환 O(1))"""
+        if round_no <= self.latest_round:
+            raise ValueError(f"회차는 증가해야 합니다: {round_no} <= {self.latest_round}")
+
+        if self._tail[0] != self._size:
+            # 버퍼를 공유하는 다른 버전이 이미 뒤에 행을 덧붙임 → 이 버전만의 버퍼로 분리
+            self._rounds = self._rounds[:self._size].copy()
+            self._dates = self._dates[:self._size].copy()
+            self._numbers = self._numbers[:self._size].copy()
+            self._bonus = self._bonus[:self._size].copy()
+            # 조회 표에는 다른 버전이 덧붙인 회차도 들어 있으므로 이 버전 행만으로 다시 만든다
+            self._row_by_round = np.where(self._row_by_round < self._size, self._row_by_round, -1).astype(np.int32)
+            self._tail = [self._size]
+
+        if self._size == len(self._rounds):
+            capacity = max(16, self._size * 2)
+            self._rounds = np.resize(self._rounds, capacity)
+            self._dates = np.resize(self._dates, capacity)
+            self._numbers = np.resize(self._numbers, (capacity, 6))
+            self._bonus = np.resize(self._bonus, capacity)
+
+        if round_no >= len(self._row_by_round):
+            grown = np.full(max(round_no + 1, len(self._row_by_round) * 2), -1, dtype=np.int32)
+            grown[:len(self._row_by_round)] = self._row_by_round
+            self._row_by_round = grown
+
+        row = self._size
+        self._rounds[row] = round_no
+        self._dates[row] = str(draw_date)
+        self._numbers[row] = np.sort(np.asarray(numbers, dtype=np.uint8))
+        self._bonus[row] = bonus
+        self._row_by_round[round_no] = row
+        self._size += 1
+        self._tail[0] = self._size
+        return row
+
+    def fork(self):
+        """버퍼를 공유하는 새 버전 (복사 없음). 이후 어느 쪽에 append해도 다른 쪽은 그대로다"""
+        return copy.copy(self)
+
+    def row_of(self, round_no):
+        """회차 번호의 행 위치 (없으면 -1)"""
+        if 0 <= round_no < len(self._row_by_round):
+            row = int(self._row_by_round[round_no])
+            # 조회 표는 더 긴 버전과 공유하므로 이 버전 길이 밖의 행은 없는 회차다
+            return row if row < self._size else -1
+        return -1
+
+    def get_draw(self, round_no):
+        """회차 번호로 당첨 정보 조회"""
+        row = self.row_of(round_no)
+        if row < 0:
+            return None
+        return {
+            'round': int(self._rounds[row]),
+            'draw_date': str(self._dates[row]),
+            'numbers': self._numbers[row].tolist(),
+            'bonus': int(self._bonus[row])
+        }
+
+    def last(self, k):
+        """최근 k회차 당첨번호 (복사 없는 뷰)"""
+        k = max(0, min(int(k), self._size))
+        return self._numbers[self._size - k:self._size]
+
+    @classmethod
+    def from_arrays(cls, rounds, dates, numbers, bonus):
+        """이미 정렬된 배열(스냅샷 mmap 등)을 복사 없이 감싸기"""
+        store = cls.__new__(cls)
+        store._rounds = rounds
+        store._dates = dates
+        store._numbers = numbers
+        store._bonus = bonus
+        store._size = len(rounds)
+        store._tail = [store._size]
+        
+        max_round = int(rounds[-1]) if len(rounds) else 0
+        store._row_by_round = np.full(max_round + 1, -1, dtype=np.int32)
+        store._row_by_round[rounds] = np.arange(len(rounds), dtype=np.int32)
+        return store
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(
+            df['round'].to_numpy(),
+            df['draw date'].astype(str).to_numpy(),
+            df[['num1', 'num2', 'num3', 'num4', 'num5', 'num6']].to_numpy(),
+            df['bonus num'].to_numpy()
+        )
+
+    @classmethod
+    def from_lines(cls, lines):
+        rounds, dates, numbers, bonus = [], [], [], []
+        for i, line in enumerate(lines):
+            try:
+                parts = line.strip().split(',')
+                if len(parts) >= 9:
+                    row = [int(p) for p in parts[2:9]]
+                    rounds.append(int(parts[0]))
+                    dates.append(parts[1])
+                    numbers.append(row[:6])
+                    bonus.append(row[6])
+            except Exception as e:
+                safe_log(f"텍스트 행 변환 실패 (라인 {i}): {str(e)}")
+                continue
+        return cls(rounds, dates, np.array(numbers, dtype=np.uint8).reshape(-1, 6), bonus)
+
+    @classmethod
+    def from_records(cls, records):
+        """기존 딕셔너리 형식 ('회차', '당첨번호1' …) 데이터 변환"""
+        return cls(
+            [r['회차'] for r in records],
+            [r['추첨일'] for r in records],
+            [[r[f'당첨번호{i}'] for i in range(1, 7)] for r in records],
+            [r['보너스번호'] for r in records]
+        )
+
 def convert_csv_to_sample_data(df_or_text):
-    """CSV 데이터를 sample_data 형식으로 변환"""
+    """CSV 데이터를 DrawStore 형식으로 변환"""
     if df_or_text is None:
-        return []
+        return None
     
     try:
-        safe_log("CSV → sample_data 변환 시작")
-        sample_data = []
+        safe_log("CSV → DrawStore 변환 시작")
+        store = None
         
         # pandas DataFrame인 경우
         if hasattr(df_or_text, 'iterrows'):
-            for index, row in df_or_text.iterrows():
-                try:
-                    data_row = {
-                        '회차': int(row['round']),
-                        '추첨일': str(row['draw date']),
-                        '당첨번호1': int(row['num1']),
-                        '당첨번호2': int(row['num2']),
-                        '당첨번호3': int(row['num3']),
-                        '당첨번호4': int(row['num4']),
-                        '당첨번호5': int(row['num5']),
-                        '당첨번호6': int(row['num6']),
-                        '보너스번호': int(row['bonus num'])
-                    }
-                    sample_data.append(data_row)
-                except Exception as e:
-                    safe_log(f"행 변환 실패 (인덱스 {index}): {str(e)}")
-                    continue
+            store = DrawStore.from_dataframe(df_or_text)
         
         # 텍스트 모드인 경우
         elif isinstance(df_or_text, dict) and df_or_text.get('mode') == 'text':
-            for i, line in enumerate(df_or_text['data']):  # 모든 데이터 처리
-                try:
-                    parts = line.strip().split(',')
-                    if len(parts) >= 9:
-                        data_row = {
-                            '회차': int(parts[0]),
-                            '추첨일': str(parts[1]),
-                            '당첨번호1': int(parts[2]),
-                            '당첨번호2': int(parts[3]),
-                            '당첨번호3': int(parts[4]),
-                            '당첨번호4': int(parts[5]),
-                            '당첨번호5': int(parts[6]),
-                            '당첨번호6': int(parts[7]),
-                            '보너스번호': int(parts[8])
-                        }
-                        sample_data.append(data_row)
-                except Exception as e:
-                    safe_log(f"텍스트 행 변환 실패 (라인 {i}): {str(e)}")
-                    continue
+            store = DrawStore.from_lines(df_or_text['data'])
         
-        # 회차순 정렬 (최신순)
-        if sample_data:
-            sample_data.sort(key=lambda x: x.get('회차', 0), reverse=True)
-            safe_log(f"✅ 변환 완료: {len(sample_data)}회차")
-            safe_log(f"   최신: {sample_data[0]['회차']}회차, 최구: {sample_data[-1]['회차']}회차")
+        if store is not None and len(store) > 0:
+            safe_log(f"✅ 변환 완료: {len(store)}회차")
+            safe_log(f"   최신: {store.latest_round}회차, 최구: {int(store.rounds[0])}회차")
         
-        return sample_data
+        return store
         
     except Exception as e:
         safe_log(f"❌ CSV 변환 실패: {str(e)}")
-        return []
+        return None
+
+def source_latest_round_info(source):
+    """CSV 로드 결과에 붙여 둔 최신 회차 정보 (없으면 None)"""
+    if source is None:
+        return None
+    if isinstance(source, dict):
+        return source.get('latest_round_info')
+    return getattr(source, 'attrs', {}).get('latest_round_info')
 
-def create_minimal_fallback_data():
+def create_minimal_fallback_data(latest_round_info=None, csv_path=None):
     """최후의 수단: CSV에서 직접 읽어서 실제 데이터 사용"""
     try:
         safe_log("⚠️ 최후의 수단: CSV에서 직접 실제 데이터 읽기")
@@ -227,7 +774,7 @@ def create_minimal_fallback_data():
         
         # 2단계: CSV 파일에서 직접 첫 번째 실제 데이터 읽기
         try:
-            csv_path = 'new_1196.csv'
+            csv_path = csv_path or CSV_PATH
             if os.path.exists(csv_path):
                 safe_log("CSV 파일에서 직접 실제 데이터 읽기 시도")
                 with open(csv_path, 'r', encoding='utf-8') as f:
@@ -284,40 +831,79 @@ def create_minimal_fallback_data():
             '보너스번호': 14
         }]
 
-def analyze_frequency_patterns():
-    """빈도 분석: 각 번호의 출현 빈도 계산"""
-    global frequency_analysis
+TREND_WINDOW = 50
+
+def count_numbers(numbers):
+    """당첨번호 행렬의 번호별 출현 횟수 (길이 46, 인덱스 = 번호)"""
+    return np.bincount(numbers.ravel(), minlength=46).astype(np.int64)
+
+def counts_to_counter(counts):
+    """번호별 출현 횟수 배열 → Counter (출현한 번호만)"""
+    return Counter({num: int(counts[num]) for num in range(1, 46) if counts[num] > 0})
+
+def draw_pattern_stats(numbers):
+    """정렬된 (N, 6) 행렬의 회차별 (연속번호 수, 합계, 짝수 개수)"""
+    numbers = np.asarray(numbers, dtype=np.int16).reshape(-1, 6)
+    consecutive = (np.diff(numbers, axis=1) == 1).sum(axis=1)
+    sums = numbers.sum(axis=1)
+    even_counts = (numbers % 2 == 0).sum(axis=1)
+    return consecutive, sums, even_counts
+
+def frequency_weight_vector(counts, total_draws):
+    """빈도 기반 가중치 계산 (정규화된 가중치 0.5 ~ 1.5 범위)"""
+    return 0.5 + counts[1:] / total_draws
+
+def trend_weight_vector(recent_counts, window_draws):
+    """최근 출현 빈도에 따른 트렌드 가중치"""
+    return 0.7 + (recent_counts[1:] / window_draws) * 0.6
+
+def build_frequency_analysis(counts, total_draws):
+    """출현 횟수 → frequency_analysis 딕셔너리"""
+    frequency_counter = counts_to_counter(counts)
+    weight_vector = frequency_weight_vector(counts, total_draws)
+    
+    return {
+        'counter': frequency_counter,
+        'weights': {num: float(weight_vector[num - 1]) for num in range(1, 46)},
+        'weight_vector': weight_vector,
+        'hot_numbers': frequency_counter.most_common(10),
+        'cold_numbers': frequency_counter.most_common()[-10:]
+    }
+
+def build_trend_analysis(recent_counts, window_draws):
+    """최근 구간 출현 횟수 → trend_analysis 딕셔너리"""
+    recent_counter = counts_to_counter(recent_counts)
+    weight_vector = trend_weight_vector(recent_counts, window_draws)
     
-    if not sample_data:
+    return {
+        'recent_counter': recent_counter,
+        'weights': {num: float(weight_vector[num - 1]) for num in range(1, 46)},
+        'weight_vector': weight_vector,
+        'trending_up': recent_counter.most_common(10),
+        'trending_down': recent_counter.most_common()[-10:]
+    }
+
+def build_pattern_analysis(total_draws, consecutive_total, sum_total, sum_sq_total, even_total, sum_min, sum_max, even_histogram):
+    """패턴 누적합 → pattern_analysis 딕셔너리"""
+    avg_sum = sum_total / total_draws
+    return {
+        'avg_consecutive': consecutive_total / total_draws,
+        'avg_sum': avg_sum,
+        'sum_std': float(np.sqrt(max(sum_sq_total / total_draws - avg_sum * avg_sum, 0.0))),
+        'avg_even_count': even_total / total_draws,
+        'sum_range': (int(sum_min), int(sum_max)),
+        'common_even_count': int(np.argmax(even_histogram))
+    }
+
+@metrics.timed('lottopro_analysis_seconds', (('analysis', 'frequency'),))
+def analyze_frequency_patterns(store=None):
+    """빈도 분석: 각 번호의 출현 빈도 계산 (store 기본값: 게시된 데이터셋)"""
+    store = store if store is not None else current_dataset().store
+    if not store:
         return None
     
     try:
-        all_numbers = []
-        for draw in sample_data:
-            numbers = [
-                draw['당첨번호1'], draw['당첨번호2'], draw['당첨번호3'],
-                draw['당첨번호4'], draw['당첨번호5'], draw['당첨번호6']
-            ]
-            all_numbers.extend(numbers)
-        
-        frequency_counter = Counter(all_numbers)
-        
-        # 빈도 기반 가중치 계산
-        total_draws = len(sample_data)
-        frequency_weights = {}
-        
-        for num in range(1, 46):
-            count = frequency_counter.get(num, 0)
-            # 정규화된 가중치 (0.5 ~ 1.5 범위)
-            weight = 0.5 + (count / total_draws)
-            frequency_weights[num] = weight
-        
-        frequency_analysis = {
-            'counter': frequency_counter,
-            'weights': frequency_weights,
-            'hot_numbers': frequency_counter.most_common(10),
-            'cold_numbers': frequency_counter.most_common()[-10:]
-        }
+        frequency_analysis = build_frequency_analysis(count_numbers(store.numbers), len(store))
         
         safe_log(f"✅ 빈도 분석 완료: 가장 많이 나온 번호는 {frequency_analysis['hot_numbers'][0]}")
         return frequency_analysis
@@ -326,41 +912,17 @@ def analyze_frequency_patterns():
         safe_log(f"❌ 빈도 분석 실패: {str(e)}")
         return None
 
-def analyze_trend_patterns():
+@metrics.timed('lottopro_analysis_seconds', (('analysis', 'trend'),))
+def analyze_trend_patterns(store=None):
     """트렌드 분석: 최근 패턴 가중치"""
-    global trend_analysis
-    
-    if not sample_data:
+    store = store if store is not None else current_dataset().store
+    if not store:
         return None
     
     try:
         # 최근 50회차 데이터에 더 높은 가중치
-        recent_data = sample_data[:50] if len(sample_data) >= 50 else sample_data
-        
-        recent_numbers = []
-        for draw in recent_data:
-            numbers = [
-                draw['당첨번호1'], draw['당첨번호2'], draw['당첨번호3'],
-                draw['당첨번호4'], draw['당첨번호5'], draw['당첨번호6']
-            ]
-            recent_numbers.extend(numbers)
-        
-        recent_counter = Counter(recent_numbers)
-        
-        # 트렌드 가중치 계산
-        trend_weights = {}
-        for num in range(1, 46):
-            recent_count = recent_counter.get(num, 0)
-            # 최근 출현 빈도에 따른 가중치
-            weight = 0.7 + (recent_count / len(recent_data)) * 0.6
-            trend_weights[num] = weight
-        
-        trend_analysis = {
-            'recent_counter': recent_counter,
-            'weights': trend_weights,
-            'trending_up': recent_counter.most_common(10),
-            'trending_down': recent_counter.most_common()[-10:]
-        }
+        recent_data = store.last(TREND_WINDOW)
+        trend_analysis = build_trend_analysis(count_numbers(recent_data), len(recent_data))
         
         safe_log("✅ 트렌드 분석 완료")
         return trend_analysis
@@ -369,52 +931,27 @@ def analyze_trend_patterns():
         safe_log(f"❌ 트렌드 분석 실패: {str(e)}")
         return None
 
-def analyze_pattern_relationships():
+@metrics.timed('lottopro_analysis_seconds', (('analysis', 'pattern'),))
+def analyze_pattern_relationships(store=None):
     """패턴 분석: 번호 조합 패턴"""
-    global pattern_analysis
-    
-    if not sample_data:
+    store = store if store is not None else current_dataset().store
+    if not store:
         return None
     
     try:
-        # 연속번호 패턴 분석
-        consecutive_patterns = []
-        sum_patterns = []
-        even_odd_patterns = []
-        
-        for draw in sample_data:
-            numbers = sorted([
-                draw['당첨번호1'], draw['당첨번호2'], draw['당첨번호3'],
-                draw['당첨번호4'], draw['당첨번호5'], draw['당첨번호6']
-            ])
-            
-            # 연속번호 카운트
-            consecutive_count = 0
-            for i in range(len(numbers)-1):
-                if numbers[i+1] - numbers[i] == 1:
-                    consecutive_count += 1
-            consecutive_patterns.append(consecutive_count)
-            
-            # 합계 패턴
-            total_sum = sum(numbers)
-            sum_patterns.append(total_sum)
-            
-            # 홀짝 패턴
-            even_count = sum(1 for n in numbers if n % 2 == 0)
-            even_odd_patterns.append(even_count)
-        
-        # 패턴 통계
-        avg_consecutive = np.mean(consecutive_patterns)
-        avg_sum = np.mean(sum_patterns)
-        avg_even_count = np.mean(even_odd_patterns)
-        
-        pattern_analysis = {
-            'avg_consecutive': avg_consecutive,
-            'avg_sum': avg_sum,
-            'avg_even_count': avg_even_count,
-            'sum_range': (min(sum_patterns), max(sum_patterns)),
-            'common_even_count': Counter(even_odd_patterns).most_common(1)[0][0]
-        }
+        # 연속번호 / 합계 / 홀짝 패턴을 행렬 전체에서 한 번에 계산
+        consecutive_patterns, sum_patterns, even_odd_patterns = draw_pattern_stats(store.numbers)
+        
+        pattern_analysis = build_pattern_analysis(
+            len(store),
+            int(consecutive_patterns.sum()),
+            int(sum_patterns.sum()),
+            int((sum_patterns.astype(np.int64) ** 2).sum()),
+            int(even_odd_patterns.sum()),
+            sum_patterns.min(),
+            sum_patterns.max(),
+            np.bincount(even_odd_patterns, minlength=7)
+        )
         
         safe_log("✅ 패턴 분석 완료")
         return pattern_analysis
@@ -423,144 +960,2267 @@ def analyze_pattern_relationships():
         safe_log(f"❌ 패턴 분석 실패: {str(e)}")
         return None
 
-def generate_ai_prediction(model_type, user_numbers=None):
-    """AI 모델별 예측 생성"""
-    try:
-        if user_numbers is None:
-            user_numbers = []
+class CumulativeCounts:
+    """번호별 누적 출현 횟수 (회차 방향 prefix sum)
+
+    prefix[i, n]은 앞 i개 회차(행 0..i-1)에서 번호 n이 나온 횟수다. 임의 구간
+    [start, end) 행의 번호별 빈도는 prefix[end] - prefix[start] 뺄셈 한 번(O(45))으로
+    구한다. 버퍼는 DrawStore처럼 여유 용량을 두고 잡아 append가 분할상환 O(1)이며,
+    fork()한 버전들도 DrawStore와 같은 방식으로 버퍼를 공유한다.
+    """
+
+    def __init__(self, prefix):
+        self._prefix = prefix
+        self._size = len(prefix) - 1
+        self._tail = [self._size]
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        numbers = np.asarray(numbers).reshape(-1, 6)
+        prefix = np.zeros((len(numbers) + 1, 46), dtype=np.int32)
+        prefix[np.repeat(np.arange(1, len(numbers) + 1), 6), numbers.ravel()] = 1
+        np.cumsum(prefix, axis=0, out=prefix)
+        return cls(prefix)
+
+    @property
+    def prefix(self):
+        return self._prefix[:self._size + 1]
+
+    def __len__(self):
+        return self._size
+
+    def fork(self):
+        """버퍼를 공유하는 새 버전 (복사 없음)"""
+        return copy.copy(self)
+
+    def append(self, numbers):
+        """최신 회차 한 건 추가"""
+        if self._tail[0] != self._size:
+            self._prefix = self._prefix[:self._size + 1].copy()
+            self._tail = [self._size]
+        if self._size + 1 == len(self._prefix):
+            self._prefix = np.resize(self._prefix, (max(16, (self._size + 1) * 2), 46))
+        row = self._size + 1
+        self._prefix[row] = self._prefix[row - 1]
+        self._prefix[row, numbers] += 1
+        self._size = row
+        self._tail[0] = row
+
+    def range_counts(self, start_row, end_row):
+        """[start_row, end_row) 행 구간의 번호별 출현 횟수 (길이 46)"""
+        return (self._prefix[end_row] - self._prefix[start_row]).astype(np.int64)
+
+# 6개 번호 안의 2개/3개 조합 위치
+PAIR_POSITIONS = np.array(list(combinations(range(6), 2)), dtype=np.intp)
+TRIPLE_POSITIONS = np.array(list(combinations(range(6), 3)), dtype=np.intp)
+
+# 번호 3개 (순서 무관) → 3-조합 일련번호 [0, C(45,3)) 조회 테이블
+TRIPLE_COUNT = 14190
+TRIPLE_RANK = np.full((46, 46, 46), -1, dtype=np.int32)
+for _rank, _triple in enumerate(combinations(range(1, 46), 3)):
+    for _a, _b, _c in permutations(_triple):
+        TRIPLE_RANK[_a, _b, _c] = _rank
+
+class CooccurrenceIndex:
+    """번호 동반출현 인덱스
+
+    46x46 쌍 카운트 행렬(인덱스 = 번호)과 3-조합 일련번호별 삼중 카운트
+    배열을 유지한다. 조회는 모두 테이블 인덱싱이라 이력 길이와 무관하다.
+    """
+
+    def __init__(self, pair_counts, triple_counts):
+        self.pair_counts = pair_counts
+        self.triple_counts = triple_counts
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        """(N, 6) 당첨번호 행렬에서 벡터 연산으로 생성"""
+        numbers = np.asarray(numbers, dtype=np.intp).reshape(-1, 6)
         
-        # 사용자 번호 검증
-        safe_numbers = []
-        if isinstance(user_numbers, list):
-            for num in user_numbers:
-                try:
-                    n = int(num)
-                    if 1 <= n <= 45 and n not in safe_numbers:
-                        safe_numbers.append(n)
-                except:
-                    continue
-        
-        numbers = safe_numbers.copy()
-        
-        # 모델별 예측 로직
-        if model_type == "빈도분석 모델" and frequency_analysis:
-            # 빈도 기반 가중 선택
-            while len(numbers) < 6:
-                weights = []
-                candidates = []
-                for num in range(1, 46):
-                    if num not in numbers:
-                        candidates.append(num)
-                        weights.append(frequency_analysis['weights'].get(num, 0.5))
-                
-                if candidates:
-                    selected = np.random.choice(candidates, p=np.array(weights)/sum(weights))
-                    numbers.append(int(selected))
-                else:
-                    numbers.append(random.randint(1, 45))
-        
-        elif model_type == "트렌드분석 모델" and trend_analysis:
-            # 트렌드 기반 가중 선택
-            while len(numbers) < 6:
-                weights = []
-                candidates = []
-                for num in range(1, 46):
-                    if num not in numbers:
-                        candidates.append(num)
-                        weights.append(trend_analysis['weights'].get(num, 0.5))
-                
-                if candidates:
-                    selected = np.random.choice(candidates, p=np.array(weights)/sum(weights))
-                    numbers.append(int(selected))
-                else:
-                    numbers.append(random.randint(1, 45))
-        
-        elif model_type == "패턴분석 모델" and pattern_analysis:
-            # 패턴 기반 선택 (합계 범위 고려)
-            while len(numbers) < 6:
-                remaining_slots = 6 - len(numbers)
-                current_sum = sum(numbers)
-                target_sum = pattern_analysis['avg_sum']
-                
-                # 목표 합계에 맞는 범위 계산
-                min_needed = max(1, int((target_sum - current_sum - (remaining_slots-1)*45) / remaining_slots))
-                max_needed = min(45, int((target_sum - current_sum) / remaining_slots))
-                
-                candidates = [n for n in range(min_needed, max_needed+1) if n not in numbers]
-                if candidates:
-                    numbers.append(random.choice(candidates))
-                else:
-                    # 백업: 사용하지 않은 번호 중 랜덤
-                    available = [n for n in range(1, 46) if n not in numbers]
-                    if available:
-                        numbers.append(random.choice(available))
+        pairs = numbers[:, PAIR_POSITIONS]
+        pair_keys = (pairs[..., 0] * 46 + pairs[..., 1]).ravel()
+        pair_counts = np.bincount(pair_keys, minlength=46 * 46).reshape(46, 46).astype(np.int64)
+        pair_counts += pair_counts.T
+        
+        triples = numbers[:, TRIPLE_POSITIONS]
+        triple_ranks = TRIPLE_RANK[triples[..., 0], triples[..., 1], triples[..., 2]].ravel()
+        triple_counts = np.bincount(triple_ranks, minlength=TRIPLE_COUNT).astype(np.int64)
         
+        return cls(pair_counts, triple_counts)
+
+    def fork(self):
+        return CooccurrenceIndex(self.pair_counts.copy(), self.triple_counts.copy())
+
+    def add_draw(self, numbers):
+        """새 회차 한 건 반영 (쌍 15개 + 삼중 20개 갱신)"""
+        numbers = np.asarray(numbers, dtype=np.intp)
+        self.pair_counts[np.ix_(numbers, numbers)] += 1
+        self.pair_counts[numbers, numbers] -= 1
+        
+        triples = numbers[TRIPLE_POSITIONS]
+        self.triple_counts[TRIPLE_RANK[triples[:, 0], triples[:, 1], triples[:, 2]]] += 1
+
+    def pair_count(self, a, b):
+        return int(self.pair_counts[a, b]) if a != b else 0
+
+    def triple_count(self, a, b, c):
+        rank = TRIPLE_RANK[a, b, c]
+        return int(self.triple_counts[rank]) if rank >= 0 else 0
+
+    def top_partners(self, number, top=10):
+        """number와 함께 가장 많이 나온 번호 top개 [[번호, 횟수], ...]"""
+        row = self.pair_counts[number, 1:]
+        order = np.argsort(-row, kind='stable')[:top]
+        return [[int(i) + 1, int(row[i])] for i in order]
+
+    def top_third_numbers(self, a, b, top=10):
+        """쌍 (a, b)와 함께 가장 많이 나온 세 번째 번호 top개"""
+        ranks = TRIPLE_RANK[a, b, 1:]
+        counts = np.where(ranks >= 0, self.triple_counts[np.maximum(ranks, 0)], -1)
+        order = np.argsort(-counts, kind='stable')[:top]
+        return [[int(i) + 1, int(counts[i])] for i in order if counts[i] >= 0]
+
+    def conditional_weights(self, picked):
+        """이미 고른 번호 배치 (K, m)에 대한 다음 번호 가중치 (K, 46)
+
+        1 + Σ 쌍 카운트 + Σ 삼중 카운트. 고른 번호와 0번은 가중치 0.
+        """
+        picked = np.asarray(picked, dtype=np.intp)
+        batch, chosen = picked.shape
+        weights = np.ones((batch, 46), dtype=np.float64)
+        
+        if chosen:
+            weights += self.pair_counts[picked].sum(axis=1)
+        for i, j in combinations(range(chosen), 2):
+            ranks = TRIPLE_RANK[picked[:, i, None], picked[:, j, None], np.arange(46)]
+            weights += np.where(ranks >= 0, self.triple_counts[np.maximum(ranks, 0)], 0)
+        
+        weights[:, 0] = 0
+        np.put_along_axis(weights, picked, 0, axis=1)
+        return weights
+
+class GapIndex:
+    """번호별 미출현 간격 인덱스
+
+    번호마다 마지막 출현 행, 완료된 간격(연속한 두 출현 사이에 빠진 회차 수)의
+    개수/합계/최댓값과 간격 길이별 히스토그램을 유지한다. 새 회차는 당첨번호
+    6개의 간격만 갱신하고, 조회는 번호 45개에 대한 배열 연산이다.
+    """
+
+    def __init__(self, last_seen, gap_count, gap_sum, gap_max, histogram, draws):
+        self.last_seen = last_seen
+        self.gap_count = gap_count
+        self.gap_sum = gap_sum
+        self.gap_max = gap_max
+        self.histogram = histogram
+        self.draws = draws
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        """(N, 6) 당첨번호 행렬에서 생성"""
+        numbers = np.asarray(numbers, dtype=np.intp).reshape(-1, 6)
+        draws = len(numbers)
+        present = np.zeros((draws, 46), dtype=bool)
+        present[np.repeat(np.arange(draws), 6), numbers.ravel()] = True
+        
+        last_seen = np.full(46, -1, dtype=np.int64)
+        gap_count = np.zeros(46, dtype=np.int64)
+        gap_sum = np.zeros(46, dtype=np.int64)
+        gap_max = np.zeros(46, dtype=np.int64)
+        gaps_by_number = {}
+        for number in range(1, 46):
+            rows = np.flatnonzero(present[:, number])
+            if len(rows) == 0:
+                continue
+            gaps = np.diff(rows) - 1
+            last_seen[number] = rows[-1]
+            gap_count[number] = len(gaps)
+            gap_sum[number] = int(gaps.sum())
+            gap_max[number] = int(gaps.max()) if len(gaps) else 0
+            gaps_by_number[number] = gaps
+        
+        histogram = np.zeros((46, max(16, int(gap_max.max()) + 1)), dtype=np.int64)
+        for number, gaps in gaps_by_number.items():
+            histogram[number, :len(np.bincount(gaps))] = np.bincount(gaps)
+        return cls(last_seen, gap_count, gap_sum, gap_max, histogram, draws)
+
+    def state(self):
+        """스냅샷 저장용 배열 (gap_stats, gap_histogram)"""
+        return np.stack([self.last_seen, self.gap_count, self.gap_sum, self.gap_max]), self.histogram
+
+    @classmethod
+    def from_state(cls, gap_stats, histogram, draws):
+        gap_stats = np.array(gap_stats, dtype=np.int64)
+        return cls(gap_stats[0], gap_stats[1], gap_stats[2], gap_stats[3], np.array(histogram, dtype=np.int64), draws)
+
+    def fork(self):
+        return GapIndex(
+            self.last_seen.copy(), self.gap_count.copy(), self.gap_sum.copy(), self.gap_max.copy(),
+            self.histogram.copy(), self.draws
+        )
+
+    def add_draw(self, numbers):
+        """새 회차 한 건 반영 (당첨번호 6개의 간격만 갱신)"""
+        row = self.draws
+        for number in numbers:
+            number = int(number)
+            previous = self.last_seen[number]
+            if previous >= 0:
+                gap = row - int(previous) - 1
+                if gap >= self.histogram.shape[1]:
+                    grown = np.zeros((46, max(gap + 1, self.histogram.shape[1] * 2)), dtype=np.int64)
+                    grown[:, :self.histogram.shape[1]] = self.histogram
+                    self.histogram = grown
+                self.histogram[number, gap] += 1
+                self.gap_count[number] += 1
+                self.gap_sum[number] += gap
+                self.gap_max[number] = max(int(self.gap_max[number]), gap)
+            self.last_seen[number] = row
+        self.draws = row + 1
+
+    def current_gaps(self):
+        """번호별 현재 미출현 회차 수 (길이 46, 최신 회차에 나왔으면 0, 한 번도 안 나왔으면 전체 회차 수)"""
+        return np.where(self.last_seen >= 0, self.draws - 1 - self.last_seen, self.draws)
+
+    def mean_gaps(self):
+        return np.where(self.gap_count > 0, self.gap_sum / np.maximum(self.gap_count, 1), 0.0)
+
+    def gap_percentiles(self):
+        """현재 간격이 그 번호의 과거 간격들보다 긴 비율 (0~1, 과거 간격이 없으면 0.5)"""
+        current = self.current_gaps()
+        cdf = np.cumsum(self.histogram, axis=1)
+        column = np.minimum(current, self.histogram.shape[1]) - 1
+        shorter = np.where(column >= 0, cdf[np.arange(46), np.maximum(column, 0)], 0)
+        return np.where(self.gap_count > 0, shorter / np.maximum(self.gap_count, 1), 0.5)
+
+    def overdue_weight_vector(self):
+        """미출현 가중치 (0.5 ~ 1.5): 과거 간격 대비 오래 안 나온 번호일수록 높음"""
+        return 0.5 + self.gap_percentiles()[1:]
+
+class TransitionMatrix:
+    """회차 → 다음 회차 번호 전이 행렬
+
+    counts[a, b]는 번호 a가 나온 회차의 바로 다음 회차에 번호 b가 나온 횟수이다
+    (46x46, 인덱스 = 번호). 새 회차는 직전 회차 6개 x 새 회차 6개 칸만 갱신한다.
+    다음 회차 가중치는 최신 회차 지시 벡터와 전이 확률 행렬의 곱이다.
+    """
+
+    CHUNK_ROWS = 100000
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        """(N, 6) 당첨번호 행렬의 연속한 두 행에서 벡터 연산으로 생성"""
+        numbers = np.asarray(numbers, dtype=np.intp).reshape(-1, 6)
+        counts = np.zeros(46 * 46, dtype=np.int64)
+        for start in range(0, max(len(numbers) - 1, 0), cls.CHUNK_ROWS):
+            previous = numbers[start:start + cls.CHUNK_ROWS]
+            following = numbers[start + 1:start + 1 + cls.CHUNK_ROWS]
+            previous = previous[:len(following)]
+            keys = previous[:, :, None] * 46 + following[:, None, :]
+            counts += np.bincount(keys.ravel(), minlength=46 * 46)
+        return cls(counts.reshape(46, 46))
+
+    def fork(self):
+        return TransitionMatrix(self.counts.copy())
+
+    def add_draw(self, previous_numbers, numbers):
+        """직전 회차 → 새 회차 전이 한 건 반영 (36칸 갱신)"""
+        previous_numbers = np.asarray(previous_numbers, dtype=np.intp)
+        numbers = np.asarray(numbers, dtype=np.intp)
+        self.counts[np.ix_(previous_numbers, numbers)] += 1
+
+    def next_weight_vector(self, latest_numbers):
+        """최신 회차 다음에 나올 번호 가중치 (길이 45, 평균 1)
+
+        전이 확률은 행마다 라플라스 평활 (counts + 1) / (행 합 + 45)이고,
+        최신 회차 6개 번호의 행을 평균한다 (지시 벡터 x 전이 행렬 / 6).
+        """
+        rows = self.counts[np.asarray(latest_numbers, dtype=np.intp), 1:]
+        probabilities = (rows + 1) / (rows.sum(axis=1, keepdims=True) + 45)
+        scores = probabilities.mean(axis=0)
+        return scores * (45 / scores.sum())
+
+# 6/45 조합 ↔ 정수 일련번호 (조합 수 체계, colex 순서)
+COMBINATION_COUNT = 8145060
+BINOMIAL_TABLE = np.array(
+    [[comb(n, k) for k in range(7)] for n in range(46)], dtype=np.int64
+)
+
+def rank_tickets(tickets):
+    """정렬된 티켓 (..., 6) → uint32 일련번호 [0, 8,145,060)"""
+    zero_based = np.asarray(tickets, dtype=np.intp) - 1
+    return BINOMIAL_TABLE[zero_based, np.arange(1, 7)].sum(axis=-1).astype(np.uint32)
+
+def unrank_tickets(ranks):
+    """uint32 일련번호 (...) → 정렬된 티켓 (..., 6)"""
+    remaining = np.asarray(ranks, dtype=np.int64).copy()
+    tickets = np.empty(remaining.shape + (6,), dtype=np.int64)
+    for k in range(6, 0, -1):
+        # C(c, k) <= remaining 인 가장 큰 c
+        c = np.searchsorted(BINOMIAL_TABLE[:, k], remaining, side='right') - 1
+        tickets[..., k - 1] = c + 1
+        remaining -= BINOMIAL_TABLE[c, k]
+    return tickets
+
+def dedupe_tickets(tickets):
+    """티켓 배치 중복 제거 (처음 나온 순서 유지)"""
+    tickets = np.asarray(tickets).reshape(-1, 6)
+    _, first_rows = np.unique(rank_tickets(np.sort(tickets, axis=1)), return_index=True)
+    return tickets[np.sort(first_rows)]
+
+class WinningCombinationIndex:
+    """역대 1등 조합 인덱스
+
+    정렬된 일련번호 배열과 8,145,060비트(약 1MB) 비트셋을 함께 유지해
+    "이 조합이 1등에 당첨된 적 있는가"를 O(1)로 확인한다. 새 조합은 비트셋에
+    바로 반영하고 정렬 배열에는 추가 버퍼를 거쳐 모아서 병합하므로 add_draw는
+    분할상환 O(1)이다.
+    """
+
+    def __init__(self, numbers):
+        ranks = rank_tickets(np.asarray(numbers).reshape(-1, 6))
+        self._sorted_ranks = np.unique(ranks)
+        self._pending = []
+        self.bitset = np.zeros((COMBINATION_COUNT + 7) // 8, dtype=np.uint8)
+        np.bitwise_or.at(self.bitset, self._sorted_ranks >> 3, np.left_shift(1, self._sorted_ranks & 7).astype(np.uint8))
+
+    @property
+    def sorted_ranks(self):
+        """역대 1등 조합 일련번호 (오름차순, 중복 없음)"""
+        if self._pending:
+            self._merge_pending()
+        return self._sorted_ranks
+
+    def _merge_pending(self):
+        pending = np.array(self._pending, dtype=self._sorted_ranks.dtype)
+        self._sorted_ranks = np.sort(np.concatenate([self._sorted_ranks, pending]))
+        self._pending = []
+
+    def fork(self):
+        """비트셋(약 1MB)만 복사하는 새 버전. 정렬 배열은 병합 때마다 새로 만들므로 공유한다"""
+        index = copy.copy(self)
+        index._pending = list(self._pending)
+        index.bitset = self.bitset.copy()
+        return index
+
+    def add_draw(self, numbers):
+        rank = int(rank_tickets(np.sort(np.asarray(numbers))))
+        # 비트셋에 이미 있으면 정렬 배열에도 있음 (중복 조합)
+        if self.bitset[rank >> 3] >> (rank & 7) & 1:
+            return
+        self.bitset[rank >> 3] |= np.uint8(1 << (rank & 7))
+        self._pending.append(rank)
+        # 버퍼가 배열 길이의 1/8을 넘을 때만 병합 → 병합 비용이 추가 건수에 분할상환됨
+        if len(self._pending) > max(64, len(self._sorted_ranks) // 8):
+            self._merge_pending()
+
+    def contains_ranks(self, ranks):
+        """일련번호 배열의 역대 1등 여부 (bool 배열)"""
+        ranks = np.asarray(ranks, dtype=np.int64)
+        return (self.bitset[ranks >> 3] >> (ranks & 7)) & 1 == 1
+
+    def has_won(self, ticket):
+        """티켓 하나의 역대 1등 여부"""
+        return bool(self.contains_ranks(rank_tickets(np.sort(np.asarray(ticket)))))
+
+class AnalysisEngine:
+    """증분 분석 엔진
+
+    빈도 카운터, 최근 50회차 트렌드 윈도우, 패턴 누적합을 상태로 들고
+    새 회차가 들어올 때마다 O(1)로 갱신한다. 결과 딕셔너리는 전체
+    재계산(analyze_*)과 같은 build_* 함수로 만들어 값이 항상 일치한다.
+    """
+
+    def __init__(self, store, trend_window=TREND_WINDOW):
+        self.store = store
+        self.trend_window = trend_window
+        
+        numbers = store.numbers
+        self.frequency_counts = count_numbers(numbers)
+        self.trend_counts = count_numbers(store.last(trend_window))
+        
+        consecutive, sums, even_counts = draw_pattern_stats(numbers)
+        self.consecutive_total = int(consecutive.sum())
+        self.sum_total = int(sums.sum())
+        self.sum_sq_total = int((sums.astype(np.int64) ** 2).sum())
+        self.even_total = int(even_counts.sum())
+        self.sum_min = int(sums.min()) if len(sums) else 0
+        self.sum_max = int(sums.max()) if len(sums) else 0
+        self.even_histogram = np.bincount(even_counts, minlength=7).astype(np.int64)
+        
+        self.cumulative = CumulativeCounts.from_numbers(numbers)
+        self.gaps = GapIndex.from_numbers(numbers)
+        self.transitions = TransitionMatrix.from_numbers(numbers)
+        self._weight_cache = {}
+        self.cooccurrence = CooccurrenceIndex.from_numbers(numbers)
+        self.winning_combinations = WinningCombinationIndex(numbers)
+
+    def state(self):
+        """스냅샷 저장용 상태 (배열 딕셔너리 + 누적합 스칼라)"""
+        counts = np.zeros((3, 46), dtype=np.int64)
+        counts[0] = self.frequency_counts
+        counts[1] = self.trend_counts
+        counts[2, :7] = self.even_histogram
+        gap_stats, gap_histogram = self.gaps.state()
+        arrays = {
+            'analysis_counts': counts,
+            'pair_counts': self.cooccurrence.pair_counts,
+            'triple_counts': self.cooccurrence.triple_counts,
+            'cumulative_counts': self.cumulative.prefix,
+            'gap_stats': gap_stats,
+            'gap_histogram': gap_histogram,
+            'transition_counts': self.transitions.counts
+        }
+        scalars = {
+            'trend_window': self.trend_window,
+            'consecutive_total': self.consecutive_total,
+            'sum_total': self.sum_total,
+            'sum_sq_total': self.sum_sq_total,
+            'even_total': self.even_total,
+            'sum_min': self.sum_min,
+            'sum_max': self.sum_max
+        }
+        return arrays, scalars
+
+    @classmethod
+    def from_state(cls, store, arrays, scalars):
+        """저장된 상태로 엔진 복원 (재계산 없음)"""
+        counts = arrays['analysis_counts']
+        engine = cls.__new__(cls)
+        engine.store = store
+        engine.trend_window = int(scalars['trend_window'])
+        engine.frequency_counts = np.array(counts[0], dtype=np.int64)
+        engine.trend_counts = np.array(counts[1], dtype=np.int64)
+        engine.even_histogram = np.array(counts[2, :7], dtype=np.int64)
+        engine.consecutive_total = int(scalars['consecutive_total'])
+        engine.sum_total = int(scalars['sum_total'])
+        engine.sum_sq_total = int(scalars['sum_sq_total'])
+        engine.even_total = int(scalars['even_total'])
+        engine.sum_min = int(scalars['sum_min'])
+        engine.sum_max = int(scalars['sum_max'])
+        engine.cooccurrence = CooccurrenceIndex(
+            np.array(arrays['pair_counts'], dtype=np.int64),
+            np.array(arrays['triple_counts'], dtype=np.int64)
+        )
+        engine.cumulative = CumulativeCounts(arrays['cumulative_counts'])
+        engine.gaps = GapIndex.from_state(arrays['gap_stats'], arrays['gap_histogram'], len(store))
+        engine.transitions = TransitionMatrix(np.array(arrays['transition_counts'], dtype=np.int64))
+        engine._weight_cache = {}
+        engine.winning_combinations = WinningCombinationIndex(store.numbers)
+        return engine
+
+    def fork(self):
+        """이 엔진은 그대로 두고 append_draw를 반영할 수 있는 다음 버전 (copy-on-write)
+
+        이력 배열과 누적합 표는 버퍼를 공유하고, 크기가 이력 길이와 무관한 카운트 표만
+        복사하므로 비용이 이력 길이와 무관하다.
+        """
+        engine = copy.copy(self)
+        engine.store = self.store.fork()
+        engine.frequency_counts = self.frequency_counts.copy()
+        engine.trend_counts = self.trend_counts.copy()
+        engine.even_histogram = self.even_histogram.copy()
+        engine.cumulative = self.cumulative.fork()
+        engine.gaps = self.gaps.fork()
+        engine.transitions = self.transitions.fork()
+        engine.cooccurrence = self.cooccurrence.fork()
+        engine.winning_combinations = self.winning_combinations.fork()
+        engine._weight_cache = {}
+        return engine
+
+    def append_draw(self, round_no, draw_date, numbers, bonus):
+        """새 회차 한 건 반영 (이력 길이와 무관하게 O(1))"""
+        numbers = sorted(int(n) for n in numbers)
+        if len(set(numbers)) != 6 or not all(1 <= n <= 45 for n in numbers):
+            raise ValueError(f"당첨번호는 1~45 사이 서로 다른 6개여야 합니다: {numbers}")
+        if not 1 <= int(bonus) <= 45 or int(bonus) in numbers:
+            raise ValueError(f"보너스번호가 올바르지 않습니다: {bonus}")
+        
+        store = self.store
+        previous_numbers = store.numbers[-1].copy() if len(store) else None
+        store.append(int(round_no), draw_date, numbers, int(bonus))
+        
+        # 빈도 카운터
+        self.frequency_counts[numbers] += 1
+        
+        # 트렌드 윈도우: 최신 회차 추가, 윈도우 밖으로 밀려난 회차 제거
+        self.trend_counts[numbers] += 1
+        if len(store) > self.trend_window:
+            evicted = store.numbers[len(store) - 1 - self.trend_window]
+            self.trend_counts[evicted] -= 1
+        
+        # 패턴 누적합
+        consecutive, sums, even_counts = draw_pattern_stats(numbers)
+        draw_sum = int(sums[0])
+        self.consecutive_total += int(consecutive[0])
+        self.sum_total += draw_sum
+        self.sum_sq_total += draw_sum * draw_sum
+        self.even_total += int(even_counts[0])
+        self.even_histogram[int(even_counts[0])] += 1
+        if len(store) == 1:
+            self.sum_min = self.sum_max = draw_sum
+        else:
+            self.sum_min = min(self.sum_min, draw_sum)
+            self.sum_max = max(self.sum_max, draw_sum)
+        
+        # 누적 출현 횟수 / 미출현 간격 / 전이 행렬 / 동반출현 인덱스 / 역대 1등 조합
+        self.cumulative.append(numbers)
+        self.gaps.add_draw(numbers)
+        if previous_numbers is not None:
+            self.transitions.add_draw(previous_numbers, numbers)
+        self._weight_cache.clear()
+        self.cooccurrence.add_draw(numbers)
+        self.winning_combinations.add_draw(numbers)
+
+    def frequency_analysis(self):
+        return build_frequency_analysis(self.frequency_counts, len(self.store))
+
+    def frequency_weight_vector(self):
+        return frequency_weight_vector(self.frequency_counts, len(self.store))
+
+    def cached_weight_vector(self, key, builder):
+        """현재 이력 기준 가중치 벡터를 회차가 추가될 때까지 캐시"""
+        weights = self._weight_cache.get(key)
+        if weights is None:
+            weights = self._weight_cache[key] = builder()
+        return weights
+
+    def transition_weight_vector(self):
+        """머신러닝 모델 가중치: 최신 회차 기준 전이 가중치"""
+        if len(self.store) == 0:
+            return np.ones(45)
+        return self.cached_weight_vector(
+            'transition', lambda: self.transitions.next_weight_vector(self.store.numbers[-1])
+        )
+
+    def window_rows(self, window=None, from_round=None, to_round=None):
+        """조회 구간 → 행 범위 [start, end)
+
+        to_round(포함)까지의 이력에서 from_round(포함)부터, 또는 마지막 window회차.
+        회차 → 행 위치는 정렬된 회차 벡터의 이진 탐색이다.
+        """
+        rounds = self.store.rounds
+        end = len(rounds) if to_round is None else int(np.searchsorted(rounds, to_round, side='right'))
+        if window is not None:
+            start = max(0, end - int(window))
+        elif from_round is not None:
+            start = int(np.searchsorted(rounds, from_round, side='left'))
         else:
-            # 기본 랜덤 생성 (통계분석, 머신러닝 모델 등)
-            while len(numbers) < 6:
-                new_num = random.randint(1, 45)
-                if new_num not in numbers:
-                    numbers.append(new_num)
+            start = 0
+        return start, max(start, end)
+
+    def window_counts(self, window=None, from_round=None, to_round=None):
+        """구간의 번호별 출현 횟수와 회차 수 (누적합 뺄셈, 이력 길이와 무관)"""
+        start, end = self.window_rows(window, from_round, to_round)
+        return self.cumulative.range_counts(start, end), end - start
+
+    def trend_weight_vector(self, window=None):
+        if window is None or window == self.trend_window:
+            return trend_weight_vector(self.trend_counts, min(len(self.store), self.trend_window))
+        counts, draws = self.window_counts(window)
+        return trend_weight_vector(counts, max(draws, 1))
+
+    def avg_sum(self):
+        return self.sum_total / len(self.store)
+
+    def trend_analysis(self, window=None):
+        if window is None or window == self.trend_window:
+            return build_trend_analysis(self.trend_counts, min(len(self.store), self.trend_window))
+        counts, draws = self.window_counts(window)
+        return build_trend_analysis(counts, max(draws, 1))
+
+    def pattern_analysis(self):
+        return build_pattern_analysis(
+            len(self.store), self.consecutive_total, self.sum_total, self.sum_sq_total, self.even_total,
+            self.sum_min, self.sum_max, self.even_histogram
+        )
+
+# 통계분석 모델 특징 (열 순서가 아티팩트와 일치해야 함)
+STATISTICAL_FEATURES = ('frequency', 'trend', 'recent', 'log_gap', 'gap_percentile', 'transition')
+STATISTICAL_RECENT_WINDOW = 10
+STATISTICAL_MODEL_VERSION = 1
+
+def number_feature_matrix(engine):
+    """엔진의 현재 상태 → 다음 회차 예측용 번호별 특징 행렬 (45, len(STATISTICAL_FEATURES))
+
+    train_model.py의 학습 데이터와 요청 시 점수 계산이 같은 함수를 쓴다.
+    """
+    draws = max(len(engine.store), 1)
+    recent_counts, recent_draws = engine.window_counts(STATISTICAL_RECENT_WINDOW)
+    return np.column_stack([
+        engine.frequency_counts[1:] / draws,
+        engine.trend_counts[1:] / max(min(draws, engine.trend_window), 1),
+        recent_counts[1:] / max(recent_draws, 1),
+        np.log1p(engine.gaps.current_gaps()[1:]),
+        engine.gaps.gap_percentiles()[1:],
+        engine.transition_weight_vector()
+    ])
+
+class StatisticalModel:
+    """오프라인 학습된 번호별 로지스틱 모델 (train_model.py가 만든 .npz 아티팩트)
+
+    p(번호가 다음 회차에 나옴) = sigmoid(((x - mean) / scale) · coef + intercept)
+    """
+
+    def __init__(self, path, coef, intercept, mean, scale, dataset_hash, metrics, created,
+                 latest_round=0, history_hash=''):
+        self.path = path
+        self.coef = coef
+        self.intercept = intercept
+        self.mean = mean
+        self.scale = scale
+        self.dataset_hash = dataset_hash
+        self.metrics = metrics
+        self.created = created
+        # 학습에 쓴 마지막 회차와 그 회차까지의 이력 해시 (history_prefix_hash)
+        self.latest_round = latest_round
+        self.history_hash = history_hash
+
+    @classmethod
+    def load(cls, path):
+        """아티팩트 로드. 형식 버전이나 특징 목록이 다르면 ValueError"""
+        with np.load(path, allow_pickle=False) as artifact:
+            if int(artifact['format_version']) != STATISTICAL_MODEL_VERSION:
+                raise ValueError(f"아티팩트 형식 버전 불일치: {int(artifact['format_version'])}")
+            if tuple(artifact['feature_names'].tolist()) != STATISTICAL_FEATURES:
+                raise ValueError(f"특징 목록 불일치: {artifact['feature_names'].tolist()}")
+            return cls(
+                path,
+                np.array(artifact['coef'], dtype=np.float64),
+                float(artifact['intercept']),
+                np.array(artifact['mean'], dtype=np.float64),
+                np.array(artifact['scale'], dtype=np.float64),
+                str(artifact['dataset_hash']),
+                json.loads(str(artifact['metrics'])),
+                str(artifact['created']),
+                int(artifact['latest_round']) if 'latest_round' in artifact else 0,
+                str(artifact['history_hash']) if 'history_hash' in artifact else ''
+            )
+
+    def predict_proba(self, features):
+        """특징 행렬 (..., F) → 출현 확률 (...)"""
+        logits = ((features - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def weight_vector(self, engine):
+        """엔진 상태에서 번호 45개를 한 번의 행렬 연산으로 점수화 → 평균 1 가중치"""
+        probabilities = self.predict_proba(number_feature_matrix(engine))
+        return probabilities * (45 / probabilities.sum())
+
+    def trained_on_prefix_of(self, store):
+        """학습 이력이 store 이력의 앞부분(같은 회차·당첨번호)인지"""
+        if not self.history_hash:
+            return False
+        row = store.row_of(self.latest_round)
+        return row >= 0 and history_prefix_hash(store, row + 1) == self.history_hash
+
+def history_prefix_hash(store, rows):
+    """앞 rows개 회차의 회차 번호·당첨번호·보너스 SHA-256 (CSV 서식과 무관한 이력 식별자)"""
+    digest = hashlib.sha256()
+    for array in (store.rounds[:rows], store.numbers[:rows], store.bonus[:rows]):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def load_statistical_model(dataset, model_dir=MODEL_DIR):
+    """model_dir에서 dataset에 맞는 가장 최신 아티팩트(statistical-*.npz, 이름 = 생성 시각)를 로드. 없으면 None
+
+    CSV 해시가 같거나, 학습 이력이 현재 이력의 앞부분인 아티팩트만 쓴다. 특징은 요청 시
+    현재 엔진에서 계산하므로 이전 이력으로 학습한 계수도 그대로 쓸 수 있다 (새 회차 수는
+    lottopro_statistical_model_stale_rounds로 노출). 다른 이력(더 긴 이력, 수정된 회차)으로
+    학습된 아티팩트는 건너뛴다. 결과는 build_dataset이 Dataset에 담아 데이터셋과 함께 게시한다.
+    """
+    try:
+        names = sorted((n for n in os.listdir(model_dir) if n.startswith('statistical-') and n.endswith('.npz')), reverse=True)
+    except FileNotFoundError:
+        names = []
+    
+    for name in names:
+        path = os.path.join(model_dir, name)
+        try:
+            model = StatisticalModel.load(path)
+        except Exception as e:
+            safe_log(f"⚠️ 통계분석 모델 아티팩트 건너뜀 ({name}): {str(e)}")
+            continue
+        store = dataset.store if dataset is not None else None
+        if not store or not (dataset.hash and model.dataset_hash == dataset.hash or model.trained_on_prefix_of(store)):
+            safe_log(f"⚠️ 통계분석 모델 아티팩트 건너뜀 ({name}): 학습 이력이 현재 이력의 앞부분이 아님")
+            continue
+        stale_rounds = store.latest_round - model.latest_round
+        if stale_rounds > 0:
+            safe_log(f"⚠️ 통계분석 모델이 {model.latest_round}회차까지로 학습됨 ({stale_rounds}회차 뒤처짐) - train_model.py 재학습 권장")
+        safe_log(f"✅ 통계분석 모델 로드: {name}")
+        return model
+    
+    safe_log("사용할 통계분석 모델 아티팩트 없음 - 균등 가중치 사용")
+    return None
+
+class Dataset(namedtuple('Dataset', [
+    'store', 'engine', 'source', 'frequency_analysis', 'trend_analysis', 'pattern_analysis', 'latest_round_info', 'hash',
+    'statistical_model', 'base_round'
+], defaults=(None, None))):
+    """게시된 데이터셋 한 버전 (불변)
+
+    이력 저장소, 분석 엔진, 분석 결과, CSV 해시, 통계분석 모델을 한 객체로 묶는다. 새 버전은 요청
+    경로 밖에서 완성한 뒤 active_dataset 참조 하나만 바꿔 게시하고, 요청은 시작할 때
+    참조를 고정하므로 처리 도중 일부만 바뀐 상태를 보지 않는다.
+    source는 pandas DataFrame / 텍스트·스냅샷 모드 딕셔너리 / None(최소 데이터)이다.
+    base_round는 CSV에서 만든 마지막 회차이고, 그 뒤 회차는 append_draw로 추가된 것이다.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_engine(cls, engine, source, csv_hash, statistical_model=None, base_round=None):
+        """엔진 상태에서 분석 결과를 만들어 Dataset 생성"""
+        store = engine.store
+        return cls(
+            store, engine, source, engine.frequency_analysis(), engine.trend_analysis(), engine.pattern_analysis(),
+            store.get_draw(store.latest_round), csv_hash, statistical_model, base_round
+        )
+
+    def append_draws(self, draws):
+        """(회차, 추첨일, 번호 6개, 보너스) 목록을 반영한 다음 버전. 이 버전의 엔진은 그대로 둔다"""
+        engine = self.engine.fork()
+        for round_no, draw_date, numbers, bonus in draws:
+            engine.append_draw(round_no, draw_date, numbers, bonus)
+        return Dataset.from_engine(engine, self.source, self.hash, self.statistical_model, self.base_round)
+
+    def appended_draws(self):
+        """CSV 이후 append_draw로 추가된 회차 목록 (append_draws에 그대로 넘길 수 있는 형태)"""
+        store = self.store
+        if self.base_round is None or store.latest_round <= self.base_round:
+            return []
+        start = store.row_of(self.base_round) + 1
+        return [
+            (int(store.rounds[row]), str(store.dates[row]), store.numbers[row].tolist(), int(store.bonus[row]))
+            for row in range(start, len(store))
+        ]
+
+    @property
+    def version(self):
+        """데이터셋 버전: 최신 회차 + CSV 해시 앞부분"""
+        latest_round = self.store.latest_round if self.store else 0
+        return f"{latest_round}-{(self.hash or 'nohash')[:12]}"
+
+def current_dataset():
+    """요청 중이면 요청이 고정한 데이터셋, 아니면 현재 게시된 데이터셋 (없으면 초기화)"""
+    in_request = has_request_context()
+    if in_request and g.get('dataset') is not None:
+        return g.dataset
+    
+    dataset = active_dataset
+    if dataset is None:
+        initialize_data_system()
+        dataset = active_dataset
+    if in_request:
+        g.dataset = dataset
+    return dataset
+
+def publish_dataset(dataset):
+    """새 Dataset을 참조 하나의 교체로 게시 (진행 중인 요청은 고정한 이전 버전을 계속 사용)"""
+    global active_dataset
+    previous, active_dataset = active_dataset, dataset
+    if previous is None or previous.version != dataset.version:
+        invalidate_response_cache()
+    return dataset
+
+def append_draw(round_no, draw_date, numbers, bonus):
+    """새 회차를 재시작 없이 반영해 새 Dataset으로 게시
+
+    진행 중인 요청이 보고 있는 엔진은 건드리지 않도록 fork()한 다음 버전에 반영한다.
+    응답 캐시와 가중치는 데이터셋 버전별로 첫 요청 때 만들어지므로 여기서 예열하지 않는다.
+    """
+    with data_lock:
+        dataset = active_dataset
+        if dataset is None or dataset.engine is None:
+            raise RuntimeError("데이터 시스템이 초기화되지 않았습니다")
+        
+        dataset = publish_dataset(dataset.append_draws([(round_no, draw_date, numbers, bonus)]))
+    
+    safe_log(f"✅ {round_no}회차 증분 반영 완료 (총 {len(dataset.store)}회차)")
+    return dataset.latest_round_info
+
+def compute_file_hash(path):
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_draw_snapshot(engine, csv_hash, snapshot_dir=SNAPSHOT_DIR):
+    """당첨번호 행렬과 분석 테이블을 .npy 스냅샷으로 저장
+
+    배열 파일을 먼저 교체하고 meta.json을 마지막에 교체하므로,
+    meta.json의 해시가 일치하면 배열도 같은 CSV에서 만들어진 것이다.
+    """
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        store = engine.store
+        engine_arrays, scalars = engine.state()
+        arrays = {
+            'rounds': store.rounds,
+            'dates': store.dates,
+            'numbers': store.numbers,
+            'bonus': store.bonus
+        }
+        arrays.update(engine_arrays)
+        for name, array in arrays.items():
+            tmp_path = os.path.join(snapshot_dir, f'.{name}.{os.getpid()}.npy')
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, os.path.join(snapshot_dir, f'{name}.npy'))
+        
+        meta = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'csv_sha256': csv_hash,
+            'rows': len(store),
+            'latest_round': store.latest_round,
+            'analysis': scalars
+        }
+        tmp_path = os.path.join(snapshot_dir, f'.meta.{os.getpid()}.json')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(snapshot_dir, 'meta.json'))
         
-        return sorted(numbers[:6])
+        safe_log(f"✅ 스냅샷 저장: {snapshot_dir} ({len(store)}회차)")
+        return True
         
     except Exception as e:
-        safe_log(f"❌ 예측 생성 실패 ({model_type}): {str(e)}")
-        return sorted(random.sample(range(1, 46), 6))
+        safe_log(f"⚠️ 스냅샷 저장 실패: {str(e)}")
+        return False
 
-def initialize_data_system():
-    """완전한 데이터 시스템 초기화"""
-    global sample_data, csv_dataframe
-    
+def load_draw_snapshot(csv_hash, snapshot_dir=SNAPSHOT_DIR):
+    """CSV 해시가 일치하는 스냅샷을 mmap으로 로드. 없거나 오래됐으면 None"""
     try:
-        safe_log("=== 완전한 데이터 시스템 초기화 시작 ===")
+        meta_path = os.path.join(snapshot_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
         
-        # 1단계: CSV 파일 완전 로드
-        csv_dataframe = load_csv_data_completely()
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
         
-        if csv_dataframe is not None:
-            safe_log("✅ CSV 로드 성공")
-            
-            # 2단계: CSV 데이터 변환
-            sample_data = convert_csv_to_sample_data(csv_dataframe)
-            
-            if len(sample_data) > 0:
-                safe_log(f"✅ 실제 CSV 데이터 사용: {len(sample_data)}회차")
-                
-                # 3단계: 실제 데이터 분석
-                safe_log("🔍 실제 CSV 데이터 분석 시작...")
-                analyze_frequency_patterns()
-                analyze_trend_patterns()
-                analyze_pattern_relationships()
-                
-                safe_log("✅ 실제 CSV 데이터 분석 완료")
-                safe_log(f"  - 빈도분석: {frequency_analysis is not None}")
-                safe_log(f"  - 트렌드분석: {trend_analysis is not None}")
-                safe_log(f"  - 패턴분석: {pattern_analysis is not None}")
+        if meta.get('format_version') != SNAPSHOT_FORMAT_VERSION or meta.get('csv_sha256') != csv_hash:
+            safe_log("스냅샷이 CSV와 다름 - 재생성 필요")
+            return None
+        
+        arrays = {
+            name: np.load(os.path.join(snapshot_dir, f'{name}.npy'), mmap_mode='r')
+            for name in SNAPSHOT_ARRAYS
+        }
+        if len(arrays['rounds']) != meta['rows'] or len(arrays['rounds']) == 0:
+            safe_log("스냅샷 행 수 불일치 - 재생성 필요")
+            return None
+        
+        store = DrawStore.from_arrays(arrays['rounds'], arrays['dates'], arrays['numbers'], arrays['bonus'])
+        engine = AnalysisEngine.from_state(store, arrays, meta['analysis'])
+        
+        safe_log(f"✅ 스냅샷 로드: {len(store)}회차 (mmap)")
+        return engine
+        
+    except Exception as e:
+        safe_log(f"⚠️ 스냅샷 로드 실패: {str(e)}")
+        return None
+
+def _bind_shared_arrays(shm, layout):
+    """공유 메모리 블록 위에 읽기 전용 배열 뷰를 만들어 게시된 데이터셋의 DrawStore로 교체
+
+    fork 직전(마스터)과 직후(워커), 요청을 받기 전에만 호출된다.
+    """
+    views = {}
+    for name, (offset, dtype, shape) in layout.items():
+        view = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        view.flags.writeable = False
+        views[name] = view
+    
+    store = DrawStore.from_arrays(views['rounds'], views['dates'], views['numbers'], views['bonus'])
+    dataset = active_dataset
+    if dataset.engine is not None:
+        dataset.engine.store = store
+    publish_dataset(dataset._replace(store=store))
+    return store
+
+def publish_shared_dataset():
+    """마스터 프로세스: 당첨번호 배열을 공유 메모리 한 블록으로 옮긴다
+
+    gunicorn preload 모드에서 fork 전에 한 번 호출한다. 워커는
+    attach_shared_dataset()으로 같은 블록을 읽기 전용으로 연결하므로
+    워커 수가 늘어나도 이력 데이터는 메모리에 한 벌만 존재한다.
+    """
+    global shared_dataset
+    
+    store = active_dataset.store if active_dataset is not None else None
+    if not store:
+        safe_log("⚠️ 공유할 데이터 없음 - 공유 메모리 생략")
+        return None
+    
+    try:
+        arrays = {
+            'rounds': np.ascontiguousarray(store.rounds),
+            'dates': np.ascontiguousarray(store.dates),
+            'numbers': np.ascontiguousarray(store.numbers),
+            'bonus': np.ascontiguousarray(store.bonus)
+        }
+        
+        # 8바이트 정렬로 배열을 한 블록에 이어 붙임
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = (offset + 7) & ~7
+            layout[name] = (offset, array.dtype.str, array.shape)
+            offset += array.nbytes
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, array in arrays.items():
+            start = layout[name][0]
+            shm.buf[start:start + array.nbytes] = array.tobytes()
+        
+        shared_dataset = {'name': shm.name, 'layout': layout, 'handle': shm, 'owner': os.getpid()}
+        _bind_shared_arrays(shm, layout)
+        
+        safe_log(f"✅ 공유 메모리 게시: {shm.name} ({offset:,} bytes, {len(store)}회차)")
+        return shm.name
+        
+    except Exception as e:
+        safe_log(f"⚠️ 공유 메모리 게시 실패: {str(e)}")
+        return None
+
+def attach_shared_dataset():
+    """워커 프로세스: 마스터가 게시한 공유 메모리 블록에 읽기 전용으로 연결"""
+    global shared_dataset
+    
+    if shared_dataset is None:
+        return False
+    
+    try:
+        # fork된 워커는 마스터의 resource_tracker를 공유하므로 블록 수명은 마스터가 관리
+        shm = shared_memory.SharedMemory(name=shared_dataset['name'])
+        
+        # 게시된 데이터셋이 아직 마스터에서 상속한 매핑을 보고 있으므로,
+        # 새 뷰로 교체한 뒤에 이전 핸들을 놓아야 한다
+        _bind_shared_arrays(shm, shared_dataset['layout'])
+        shared_dataset = dict(shared_dataset, handle=shm)
+        
+        safe_log(f"✅ 워커 {os.getpid()}: 공유 메모리 연결 ({shm.name})")
+        return True
+        
+    except Exception as e:
+        safe_log(f"⚠️ 공유 메모리 연결 실패: {str(e)}")
+        return False
+
+def release_shared_dataset():
+    """마스터 프로세스 종료 시 공유 메모리 블록 해제"""
+    global shared_dataset
+    
+    if shared_dataset is None or shared_dataset.get('owner') != os.getpid():
+        return
+    
+    try:
+        shm = shared_dataset['handle']
+        shared_dataset = None
+        shm.unlink()
+        safe_log(f"공유 메모리 해제: {shm.name}")
+    except Exception as e:
+        safe_log(f"⚠️ 공유 메모리 해제 실패: {str(e)}")
+
+_rng_root = None
+_rng_pid = None
+_rng_local = threading.local()
+_rng_lock = threading.Lock()
+
+def reset_rng_streams():
+    """현재 프로세스의 루트 SeedSequence를 OS 엔트로피로 새로 만든다 (fork 직후 등)"""
+    global _rng_root, _rng_pid, _rng_local
+    with _rng_lock:
+        _rng_root = np.random.SeedSequence()
+        _rng_pid = os.getpid()
+        _rng_local = threading.local()
+
+def thread_rng():
+    """현재 스레드 전용 PCG64 Generator
+
+    프로세스마다 루트 SeedSequence 하나를 두고 스레드별 스트림을 spawn 한다.
+    스트림끼리 상태를 공유하지 않으므로 스레드 워커에서도 잠금 경합이 없고,
+    fork로 복제된 프로세스는 pid가 바뀐 것을 보고 루트를 새로 만든다.
+    """
+    if _rng_pid != os.getpid():
+        reset_rng_streams()
+    local = _rng_local
+    rng = getattr(local, 'rng', None)
+    if rng is None:
+        with _rng_lock:
+            child = _rng_root.spawn(1)[0]
+        rng = np.random.Generator(np.random.PCG64(child))
+        local.rng = rng
+    return rng
+
+def request_rng(seed=None):
+    """요청용 Generator: seed가 있으면 그 seed의 독립 스트림 (재현 가능), 없으면 스레드 스트림"""
+    if seed is None:
+        return thread_rng()
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed)))
+
+def parse_seed(value):
+    """요청의 seed 값 → 0 이상 정수 또는 None (잘못된 값이면 ValueError)"""
+    if value in (None, ''):
+        return None
+    seed = int(value)
+    if seed < 0:
+        raise ValueError("seed는 0 이상이어야 합니다")
+    return seed
+
+# 당첨 등수 (일치 개수 / 보너스 조건)
+PRIZE_TIERS = ['1등', '2등', '3등', '4등', '5등']
+
+# 0~255 바이트별 1비트 개수
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def numbers_to_masks(numbers):
+    """번호 행렬 (..., k) → 번호 n이 bit n인 uint64 마스크 (...)"""
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), numbers), axis=-1)
+
+def popcount64(masks):
+    """uint64 배열의 원소별 1비트 개수"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.uint8)
+    return _POPCOUNT_TABLE[masks.view(np.uint8).reshape(masks.shape + (8,))].sum(axis=-1, dtype=np.uint8)
+
+def prize_tiers(ticket_masks, draw_mask, bonus_mask):
+    """티켓 마스크와 당첨 마스크 비교 → 등수 인덱스 (0=1등 … 4=5등, -1=낙첨)"""
+    matches = popcount64(np.bitwise_and(ticket_masks, draw_mask))
+    has_bonus = np.bitwise_and(ticket_masks, bonus_mask) != 0
+    tiers = np.full(matches.shape, -1, dtype=np.int8)
+    tiers[matches == 3] = 4
+    tiers[matches == 4] = 3
+    tiers[matches == 5] = 2
+    tiers[(matches == 5) & has_bonus] = 1
+    tiers[matches == 6] = 0
+    return tiers
+
+MAX_CHECK_TICKETS = 100000
+CHECK_CHUNK_TICKETS = 4096
+MAX_CHECK_TOP_HITS = 1000
+
+def parse_tickets(value):
+    """티켓 목록 ([[1,2,3,4,5,6], ...] 또는 "1,2,3,4,5,6" 줄 단위 텍스트) → (T, 6) 정렬된 정수 배열
+
+    형식이 틀리면 몇 번째 티켓인지 담은 ValueError.
+    """
+    if isinstance(value, str):
+        value = [line.replace(' ', '').split(',') for line in value.splitlines() if line.strip()]
+        if value and not value[0][0].lstrip('-').isdigit():
+            value = value[1:]  # 헤더 줄
+    if not isinstance(value, list) or not value:
+        raise ValueError("티켓 목록이 비어 있습니다")
+    if len(value) > MAX_CHECK_TICKETS:
+        raise ValueError(f"티켓은 최대 {MAX_CHECK_TICKETS:,}장까지 확인할 수 있습니다")
+    
+    for i, ticket in enumerate(value):
+        if not isinstance(ticket, (list, tuple)) or len(ticket) != 6:
+            raise ValueError(f"{i + 1}번째 티켓은 번호 6개여야 합니다")
+    try:
+        tickets = np.sort(np.array(value, dtype=np.int64), axis=1)
+    except (TypeError, ValueError):
+        raise ValueError("티켓 번호는 정수여야 합니다")
+    
+    invalid = ((tickets < 1) | (tickets > 45)).any(axis=1) | (np.diff(tickets, axis=1) == 0).any(axis=1)
+    if invalid.any():
+        raise ValueError(f"{int(np.argmax(invalid)) + 1}번째 티켓은 1~45 사이 서로 다른 번호 6개여야 합니다")
+    return tickets
+
+def draw_match_tables(draw_masks):
+    """당첨 마스크 (D,) → (6, 256, D) uint8 표: [k, v, d] = popcount(v & 회차 d 마스크의 k번째 바이트)
+
+    번호는 bit 1~45라 마스크의 하위 6바이트만 쓰인다. 티켓 마스크를 바이트 6개로
+    나누면 (티켓 × 회차) 격자의 AND + popcount가 표 행 6개를 더하는 연산이 된다.
+    """
+    draw_masks = np.asarray(draw_masks, dtype='<u8')
+    draw_bytes = draw_masks.view(np.uint8).reshape(-1, 8)[:, :6]
+    values = np.arange(256, dtype=np.uint8)
+    return _POPCOUNT_TABLE[np.bitwise_and(values[None, :, None], draw_bytes.T[:, None, :])]
+
+def match_count_grid(ticket_masks, tables):
+    """티켓 마스크 (T,) × 회차 → 맞힌 번호 수 (T, D) uint8"""
+    ticket_bytes = np.asarray(ticket_masks, dtype='<u8').view(np.uint8).reshape(-1, 8)
+    grid = tables[0].take(ticket_bytes[:, 0], axis=0)
+    for k in range(1, 6):
+        grid += tables[k].take(ticket_bytes[:, k], axis=0)
+    return grid
+
+def check_tickets(tickets, round_no=None, store=None):
+    """티켓을 한 회차(round_no) 또는 전체 이력과 대조한 결과 딕셔너리
+
+    한 회차: 티켓별 등수 (1~5, 낙첨 0)와 등수별 당첨 수.
+    전체 이력: (티켓 × 회차) 전체의 등수별 당첨 수와 1~3등 당첨 목록.
+    티켓 CHECK_CHUNK_TICKETS장씩 격자를 만들어 메모리는 티켓 수와 무관하게 일정하다.
+    """
+    store = store if store is not None else current_dataset().store
+    tickets = np.asarray(tickets)
+    ticket_masks = numbers_to_masks(tickets)
+    
+    if round_no is not None:
+        row = store.row_of(int(round_no))
+        if row < 0:
+            raise KeyError(f"{round_no}회차 데이터가 없습니다")
+        draw = store.get_draw(int(round_no))
+        tiers = prize_tiers(ticket_masks, numbers_to_masks(store.numbers[row]), np.uint64(1) << np.uint64(store.bonus[row]))
+        hits = np.bincount(tiers[tiers >= 0], minlength=len(PRIZE_TIERS))
+        return {
+            'round': draw['round'],
+            'draw': draw,
+            'tickets': len(tickets),
+            'tiers': (tiers.astype(np.int16) + 1).tolist(),
+            'hits': dict(zip(PRIZE_TIERS, hits.tolist()))
+        }
+    
+    draw_masks = numbers_to_masks(store.numbers)
+    bonus_masks = np.left_shift(np.uint64(1), store.bonus.astype(np.uint64))
+    tables = draw_match_tables(draw_masks)
+    rounds = store.rounds
+    
+    # 맞힌 수 3/4/5(보너스 제외)/6 → 5등/4등/3등/1등, 5개 + 보너스 → 2등
+    hits = np.zeros(len(PRIZE_TIERS), dtype=np.int64)
+    top_hits = []
+    winning_tickets = 0
+    for start in range(0, len(tickets), CHECK_CHUNK_TICKETS):
+        chunk_masks = ticket_masks[start:start + CHECK_CHUNK_TICKETS]
+        grid = match_count_grid(chunk_masks, tables)
+        best = grid.max(axis=1)
+        winning_tickets += int(np.count_nonzero(best >= 3))
+        hits[4] += np.count_nonzero(grid == 3)
+        hits[3] += np.count_nonzero(grid == 4)
+        
+        # 5개 이상 맞힌 칸은 드물므로 그런 티켓 행만 골라 위치를 찾는다
+        rare_rows = np.flatnonzero(best >= 5)
+        rare_grid = grid[rare_rows]
+        for matched in (6, 5):
+            rare_idx, draw_idx = np.nonzero(rare_grid == matched)
+            ticket_idx = rare_rows[rare_idx]
+            if matched == 6:
+                tier_idx = np.zeros(len(ticket_idx), dtype=np.int64)
+            else:
+                with_bonus = np.bitwise_and(chunk_masks[ticket_idx], bonus_masks[draw_idx]) != 0
+                tier_idx = np.where(with_bonus, 1, 2)
+            hits += np.bincount(tier_idx, minlength=len(PRIZE_TIERS))
+            top_hits.extend(zip(tier_idx.tolist(), (start + ticket_idx).tolist(), draw_idx.tolist()))
+    
+    # 1~3등 당첨 목록은 높은 등수부터 MAX_CHECK_TOP_HITS건까지
+    pairs = len(tickets) * len(store)
+    top_hits = [
+        {'ticket': t, 'round': int(rounds[d]), 'tier': PRIZE_TIERS[tier]}
+        for tier, t, d in sorted(top_hits)[:MAX_CHECK_TOP_HITS]
+    ]
+    return {
+        'tickets': len(tickets),
+        'rounds': len(store),
+        'from_round': int(rounds[0]),
+        'to_round': int(rounds[-1]),
+        'hits': dict(zip(PRIZE_TIERS, hits.tolist())),
+        'hit_rates': dict(zip(PRIZE_TIERS, (hits / max(pairs, 1)).tolist())),
+        'winning_tickets': winning_tickets,
+        'top_hits': top_hits
+    }
+
+DEFAULT_MODEL_NAMES = ['빈도분석 모델', '트렌드분석 모델', '패턴분석 모델', '통계분석 모델', '머신러닝 모델']
+SUPPORTED_MODEL_NAMES = DEFAULT_MODEL_NAMES + ['동반출현 모델', '미출현 모델']
+
+def sanitize_user_numbers(user_numbers):
+    """사용자 번호 검증: 1~45 범위의 중복 없는 정수만 유지"""
+    safe_numbers = []
+    if isinstance(user_numbers, list):
+        for num in user_numbers:
+            try:
+                n = int(num)
+                if 1 <= n <= 45 and n not in safe_numbers:
+                    safe_numbers.append(n)
+            except:
+                continue
+    return safe_numbers[:6]
+
+def get_model_weights(model_type, engine=None, trend_window=None, statistical_model=None):
+    """모델별 번호 가중치 벡터 (길이 45, 인덱스 = 번호-1)
+
+    engine을 주면 게시된 전역 분석 대신 그 엔진의 상태를 사용한다 (백테스트 등). 이때
+    통계분석 모델은 데이터셋의 모델이 아니라 statistical_model(없으면 균등)을 쓴다.
+    데이터셋 모델은 전체 이력으로 학습되어 과거 상태에 쓰면 미래 데이터가 섞이기 때문이다.
+    trend_window를 주면 트렌드 모델이 그 회차 수만큼의 최근 구간을 쓴다 (누적합 뺄셈).
+    """
+    dataset = current_dataset()
+    if engine is None:
+        statistical_model = dataset.statistical_model
+    if engine is None and (model_type in ("미출현 모델", "머신러닝 모델", "통계분석 모델") or (trend_window is not None and model_type == "트렌드분석 모델")):
+        engine = dataset.engine
+    if engine is not None:
+        if model_type == "빈도분석 모델":
+            return engine.frequency_weight_vector()
+        if model_type == "트렌드분석 모델":
+            return engine.trend_weight_vector(trend_window)
+        if model_type == "미출현 모델":
+            return engine.gaps.overdue_weight_vector()
+        if model_type == "머신러닝 모델":
+            return engine.transition_weight_vector()
+        if model_type == "통계분석 모델" and statistical_model is not None:
+            model = statistical_model
+            return engine.cached_weight_vector(('statistical', model.path), lambda: model.weight_vector(engine))
+        return np.ones(45)
+    
+    if model_type == "빈도분석 모델" and dataset.frequency_analysis:
+        return dataset.frequency_analysis['weight_vector']
+    if model_type == "트렌드분석 모델" and dataset.trend_analysis:
+        return dataset.trend_analysis['weight_vector']
+    # 기본 균등 가중치 (학습된 아티팩트가 없는 통계분석 모델 등)
+    return np.ones(45)
+
+ALIAS_CACHE_SIZE = int(os.environ.get('ALIAS_CACHE_SIZE', '1024'))
+# 티켓당 한 번에 뽑는 후보 수 (6개 모두 뽑아도 중복으로 모자랄 확률이 작도록)
+CANDIDATES_PER_TICKET = 12
+_EARLIER_CANDIDATES = np.tri(CANDIDATES_PER_TICKET, k=-1, dtype=bool)
+
+@lru_cache(maxsize=ALIAS_CACHE_SIZE)
+def build_alias_table(weight_bytes, fixed_numbers=()):
+    """가중치 벡터(번호 1~45)에서 고정 번호를 뺀 조건부 분포의 Vose 별칭 표
+
+    키가 가중치 바이트 + 고정 번호 집합이므로 데이터셋 버전(=가중치)과 사용자 번호
+    조합마다 한 번만 만들고, 같은 번호 조합이 반복되는 요청은 LRU 캐시를 그대로 쓴다.
+    반환: (prob, alias, 양수 가중치 번호 수)
+    """
+    weights = np.frombuffer(weight_bytes, dtype=np.float64).copy()
+    if fixed_numbers:
+        weights[np.asarray(fixed_numbers, dtype=np.intp) - 1] = 0.0
+    
+    size = len(weights)
+    scaled = weights * (size / weights.sum())
+    prob = np.ones(size, dtype=np.float64)
+    alias = np.arange(size, dtype=np.int64)
+    small = [i for i in range(size) if scaled[i] < 1.0]
+    large = [i for i in range(size) if scaled[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] += scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    # 남은 항목은 부동소수 오차로 1 근처 → 자기 자신 (prob = 1)
+    
+    prob.flags.writeable = False
+    alias.flags.writeable = False
+    return prob, alias, int(np.count_nonzero(weights > 0))
+
+def alias_sample(prob, alias, size, rng):
+    """별칭 표에서 size(정수 또는 shape)개 추출 (번호 1~45, 원소당 균등 난수 1개로 O(1))
+
+    u * 45의 정수부를 칸, 소수부를 칸 안의 동전으로 쓴다.
+    """
+    scaled = rng.random(size) * len(prob)
+    slots = scaled.astype(np.int64)
+    return np.where(scaled - slots < prob[slots], slots, alias[slots]) + 1
+
+def sample_weighted_tickets(weights, fixed_numbers, count, rng):
+    """가중치 비례 비복원 추출 (count, 6) 배치
+
+    고정 번호를 뺀 조건부 분포의 별칭 표(LRU 캐시)에서 티켓마다 후보를 독립적으로
+    여러 개 뽑고, 처음 나온 서로 다른 번호부터 필요한 개수만큼 쓴다. 중복을 버리는
+    것은 남은 번호의 가중치로 다시 정규화해 뽑는 것과 분포가 같으므로 순차 비복원
+    추출과 정확히 일치한다. 후보가 모자란 티켓(드묾)만 다시 뽑는다.
+    """
+    fixed = tuple(sorted(int(n) for n in fixed_numbers))
+    needed = 6 - len(fixed)
+    if needed <= 0:
+        return np.tile(np.asarray(fixed[:6], dtype=np.int64), (count, 1))
+    
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    prob, alias, support = build_alias_table(weights.tobytes(), fixed)
+    if support < needed:
+        raise ValueError(f"가중치가 양수인 번호가 {support}개뿐입니다")
+    
+    tickets = np.empty((count, 6), dtype=np.int64)
+    tickets[:, :len(fixed)] = fixed
+    drawn = alias_sample(prob, alias, (count, CANDIDATES_PER_TICKET), rng)
+    # 앞 후보와 같은 번호는 버리고, 남은 첫 번호들 중 needed개 사용
+    repeated = ((drawn[:, :, None] == drawn[:, None, :]) & _EARLIER_CANDIDATES).any(axis=2)
+    keep = ~repeated & (np.cumsum(~repeated, axis=1) <= needed)
+    complete = keep.sum(axis=1) == needed
+    tickets[complete, len(fixed):] = drawn[complete][keep[complete]].reshape(-1, needed)
+    
+    # 후보가 모자란 티켓은 같은 추출 순서를 이어서 계속 뽑는다 (처음부터 다시 뽑으면 분포가 틀어짐)
+    for row in np.flatnonzero(~complete):
+        picks = drawn[row][keep[row]].tolist()
+        while len(picks) < needed:
+            number = int(alias_sample(prob, alias, 1, rng)[0])
+            if number not in picks:
+                picks.append(number)
+        tickets[row, len(fixed):] = picks
+    
+    tickets.sort(axis=1)
+    return tickets
+
+# 합계 DP 테이블 차원: 6개 번호 합계 최대 40+41+…+45 = 255
+MAX_TICKET_SUM = 255
+
+def next_fixed_limits(fixed_numbers):
+    """limits[i]: i보다 큰 가장 작은 고정 번호 (없으면 45) - 다음 번호는 이를 넘을 수 없다"""
+    limits = np.full(47, 45, dtype=np.intp)
+    for i in range(47):
+        later = [f for f in fixed_numbers if f > i]
+        if later:
+            limits[i] = later[0]
+    return limits
+
+@lru_cache(maxsize=16)
+def build_sum_table(fixed_numbers=(), track_even=False, track_consecutive=False):
+    """6/45 조합 개수 DP 테이블
+
+    table[k, i, s, e, c] = 최솟값이 i인 k개 번호 조합 중 합계 s, 짝수 e개,
+    연속 쌍 c개이고 i 이상의 고정 번호를 모두 포함하는 조합의 수.
+    짝수/연속 차원은 추적할 때만 크기를 갖고 아니면 1로 접힌다.
+    """
+    fixed = sorted(fixed_numbers)
+    sums = MAX_TICKET_SUM + 1
+    evens = 7 if track_even else 1
+    consecutives = 6 if track_consecutive else 1
+    table = np.zeros((7, 47, sums, evens, consecutives), dtype=np.int32)
+    
+    next_fixed = next_fixed_limits(fixed)
+    
+    for i in range(1, 46):
+        if not any(f > i for f in fixed):
+            table[1, i, i, (1 - i % 2) if track_even else 0, 0] = 1
+    
+    for k in range(2, 7):
+        # suffix[j] = Σ_{j' >= j} table[k-1, j']
+        suffix = np.zeros((48, sums, evens, consecutives), dtype=np.int64)
+        suffix[1:47] = np.cumsum(table[k - 1, 46:0:-1], axis=0, dtype=np.int64)[::-1]
+        
+        for i in range(45, 0, -1):
+            limit = next_fixed[i]
+            if limit <= i:
+                continue
+            # 다음 번호 j ∈ [i+2, limit]: 연속 쌍 증가 없음
+            rest = suffix[i + 2] - suffix[limit + 1] if limit >= i + 2 else np.zeros_like(suffix[0])
+            # 다음 번호 j = i+1: 연속 쌍 +1
+            if track_consecutive:
+                rest[:, :, 1:] += table[k - 1, i + 1, :, :, :-1]
+            else:
+                rest += table[k - 1, i + 1]
+            
+            shifted = rest[:sums - i]
+            if track_even and i % 2 == 0:
+                table[k, i, i:, 1:] = shifted[:, :-1]
+            else:
+                table[k, i, i:] = shifted
+    
+    return table
+
+def sample_sum_constrained_tickets(rng, count, sum_range, fixed_numbers=(), even_counts=None, consecutive_counts=None):
+    """합계 구간(및 선택적 짝수 개수/연속 쌍 개수) 조건을 만족하는 조합에서 균등 추출
+
+    DP 테이블로 (시작 번호, 최종 상태)를 한 번에 뽑은 뒤 번호 6개를 순서대로
+    테이블 비율대로 고른다. 거절 루프 없이 조건을 만족하는 조합이 정확히 균등하게 나온다.
+    """
+    fixed = tuple(sorted(int(n) for n in fixed_numbers))
+    track_even = even_counts is not None
+    track_consecutive = consecutive_counts is not None
+    table = build_sum_table(fixed, track_even, track_consecutive)
+    _, _, sums, evens, consecutives = table.shape
+    
+    # 1단계: 시작 번호 i와 최종 (합계, 짝수, 연속) 상태를 조합 수에 비례해 선택
+    start_limit = fixed[0] if fixed else 45
+    low, high = max(int(sum_range[0]), 0), min(int(sum_range[1]), MAX_TICKET_SUM)
+    mask = np.zeros((sums, evens, consecutives), dtype=bool)
+    mask[low:high + 1] = True
+    if track_even:
+        allowed = np.zeros(evens, dtype=bool)
+        allowed[[e for e in even_counts if 0 <= e <= 6]] = True
+        mask &= allowed[None, :, None]
+    if track_consecutive:
+        allowed = np.zeros(consecutives, dtype=bool)
+        allowed[[c for c in consecutive_counts if 0 <= c <= 5]] = True
+        mask &= allowed[None, None, :]
+    
+    start_weights = np.where(mask, table[6, 1:start_limit + 1], 0).astype(np.float64).ravel()
+    total = start_weights.sum()
+    if total <= 0:
+        raise ValueError(f"조건을 만족하는 조합이 없습니다: 합계 {sum_range}")
+    
+    picks = np.searchsorted(np.cumsum(start_weights), rng.random(count) * total, side='right')
+    current, remaining_sum, remaining_even, consecutive = np.unravel_index(picks, (start_limit, sums, evens, consecutives))
+    current = current + 1
+    
+    tickets = np.empty((count, 6), dtype=np.int64)
+    tickets[:, 0] = current
+    candidates = np.arange(1, 46)
+    next_fixed = next_fixed_limits(fixed)
+    
+    # 2단계: 남은 상태로 다음 번호를 하나씩 선택 (각 단계 O(45) 테이블 조회)
+    for k in range(6, 1, -1):
+        remaining_sum = remaining_sum - current
+        if track_even:
+            remaining_even = remaining_even - (current % 2 == 0)
+        
+        is_next = candidates[None, :] == current[:, None] + 1
+        state_c = consecutive[:, None] - is_next if track_consecutive else np.zeros((count, 45), dtype=np.intp)
+        limits = next_fixed[current]
+        valid = (candidates[None, :] > current[:, None]) & (candidates[None, :] <= limits[:, None]) & (state_c >= 0)
+        
+        weights = table[
+            k - 1,
+            candidates[None, :],
+            np.clip(remaining_sum, 0, sums - 1)[:, None],
+            np.clip(remaining_even, 0, evens - 1)[:, None],
+            np.maximum(state_c, 0)
+        ].astype(np.float64)
+        weights[~valid] = 0
+        
+        cumulative = np.cumsum(weights, axis=1)
+        targets = rng.random((count, 1)) * cumulative[:, -1:]
+        chosen = (cumulative <= targets).sum(axis=1)
+        
+        if track_consecutive:
+            consecutive = consecutive - (chosen == current)
+        current = chosen + 1
+        tickets[:, 7 - k] = current
+    
+    return tickets
+
+def sample_cooccurrence_tickets(index, base_counts, fixed_numbers, count, rng):
+    """동반출현 모델: 이미 고른 번호 기준 조건부 가중치로 한 번호씩 순차 추출
+
+    가중치는 모두 CooccurrenceIndex 테이블 조회로 얻고 이력은 다시 훑지 않는다.
+    """
+    picked = np.tile(np.asarray(fixed_numbers, dtype=np.intp), (count, 1)).reshape(count, len(fixed_numbers))
+    
+    while picked.shape[1] < 6:
+        if picked.shape[1] == 0:
+            # 첫 번호는 전체 출현 빈도 기준
+            weights = np.tile(base_counts + 1.0, (count, 1))
+            weights[:, 0] = 0
+        else:
+            weights = index.conditional_weights(picked)
+        
+        cumulative = np.cumsum(weights, axis=1)
+        targets = rng.random((count, 1)) * cumulative[:, -1:]
+        selected = (cumulative <= targets).sum(axis=1)
+        picked = np.column_stack([picked, selected])
+    
+    return np.sort(picked, axis=1).astype(np.int64)
+
+def generate_ticket_batch(model_type, user_numbers=None, count=1, engine=None, rng=None, trend_window=None,
+                          statistical_model=None):
+    """AI 모델별 예측 배치 생성: (count, 6) 정수 배열
+
+    engine을 주면 그 AnalysisEngine 상태로 예측한다 (백테스트 등). 그때 통계분석 모델은
+    statistical_model을 쓴다 (get_model_weights 참고).
+    rng를 주면 그 Generator로 추출하고 (seed 재현 등), 없으면 현재 스레드 전용 Generator를 쓴다.
+    trend_window를 주면 트렌드 모델이 그 회차 수의 최근 구간으로 가중치를 만든다.
+    """
+    safe_numbers = sanitize_user_numbers(user_numbers)
+    if rng is None:
+        rng = thread_rng()
+    
+    labels = (('model_type', model_type),)
+    metrics.inc('lottopro_generate_tickets_total', labels, count)
+    with metrics.timer('lottopro_generate_seconds', labels):
+        try:
+            patterns = None
+            if model_type == "패턴분석 모델":
+                patterns = engine.pattern_analysis() if engine is not None else current_dataset().pattern_analysis
+            if patterns:
+                # 역대 합계 평균 ± 표준편차 구간의 조합에서 균등 추출
+                sum_range = (
+                    int(round(patterns['avg_sum'] - patterns['sum_std'])),
+                    int(round(patterns['avg_sum'] + patterns['sum_std']))
+                )
+                return sample_sum_constrained_tickets(rng, count, sum_range, safe_numbers)
+        
+            cooccurrence_engine = engine if engine is not None else current_dataset().engine
+            if model_type == "동반출현 모델" and cooccurrence_engine is not None:
+                return sample_cooccurrence_tickets(
+                    cooccurrence_engine.cooccurrence, cooccurrence_engine.frequency_counts, safe_numbers, count, rng
+                )
+        
+            weights = get_model_weights(model_type, engine, trend_window, statistical_model)
+            return sample_weighted_tickets(weights, safe_numbers, count, rng)
+        
+        except Exception as e:
+            safe_log(f"❌ 배치 예측 생성 실패 ({model_type}): {str(e)}")
+            return sample_weighted_tickets(np.ones(45), safe_numbers, count, rng)
+
+COVERAGE_TIME_BUDGET_SECONDS = float(os.environ.get('COVERAGE_TIME_BUDGET_SECONDS', '0.05'))
+COVERAGE_MIN_CANDIDATES = 2000
+PREDICT_STRATEGIES = ('independent', 'coverage')
+MAX_PREDICT_TICKETS = 1000
+COVERAGE_MAX_CANDIDATES = 20000
+
+def optimize_ticket_coverage(candidates, weights, count, level=2, deadline=None):
+    """후보 티켓 중 서로 다른 count장을 골라 가중 쌍(level=2) / 삼중(level=3) 커버리지를 최대화
+
+    티켓 하나는 번호 쌍 15개(삼중 20개)를 덮고, 쌍의 가중치는 두 번호 가중치의 곱이다.
+    아직 덮이지 않은 가중치 합(이득)이 가장 큰 후보를 하나씩 고르는 탐욕법이며,
+    고를 때마다 새로 덮인 쌍을 가진 후보의 이득만 역색인으로 빼서 갱신한다.
+    모든 쌍이 덮였거나 deadline(perf_counter 기준)을 넘기면 남은 자리는 아직 고르지
+    않은 후보를 원래(무작위 추출) 순서대로 채운다. 이득 순으로 한꺼번에 채우면 서로
+    같은 쌍을 노린 비슷한 티켓만 모이므로 독립 추출보다도 커버리지가 나빠진다.
+    deadline이 None이면 시간과 무관하게 항상 같은 결과를 낸다 (seed 재현).
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    _, first = np.unique(numbers_to_masks(candidates), return_index=True)
+    candidates = candidates[np.sort(first)]
+    if len(candidates) <= count:
+        return candidates
+    
+    number_weights = np.concatenate([[0.0], np.asarray(weights, dtype=np.float64)])
+    if level == 3:
+        subsets = candidates[:, TRIPLE_POSITIONS]
+        keys = TRIPLE_RANK[subsets[..., 0], subsets[..., 1], subsets[..., 2]].astype(np.int64)
+        key_space = TRIPLE_COUNT
+    else:
+        subsets = candidates[:, PAIR_POSITIONS]
+        keys = subsets[..., 0] * 46 + subsets[..., 1]
+        key_space = 46 * 46
+    subset_weights = number_weights[subsets].prod(axis=-1)
+    key_weights = np.zeros(key_space)
+    key_weights[keys.ravel()] = subset_weights.ravel()
+    gains = subset_weights.sum(axis=1)
+    
+    # 역색인: 쌍 key → 그 쌍을 가진 후보 행 (CSR)
+    flat_keys = keys.ravel()
+    order = np.argsort(flat_keys, kind='stable')
+    rows_by_key = order // keys.shape[1]
+    offsets = np.searchsorted(flat_keys[order], np.arange(key_space + 1))
+    
+    covered = np.zeros(key_space, dtype=bool)
+    # 부동소수 뺄셈 오차 이하의 이득은 0으로 본다
+    tolerance = key_weights.max() * 1e-9
+    chosen = []
+    while len(chosen) < count:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        best = int(np.argmax(gains))
+        if gains[best] <= tolerance:
+            break
+        chosen.append(best)
+        gains[best] = -np.inf
+        
+        new_keys = keys[best][~covered[keys[best]]]
+        covered[new_keys] = True
+        lengths = offsets[new_keys + 1] - offsets[new_keys]
+        rows = np.concatenate([rows_by_key[offsets[k]:offsets[k + 1]] for k in new_keys.tolist()] or [np.empty(0, np.int64)])
+        np.subtract.at(gains, rows, np.repeat(key_weights[new_keys], lengths))
+    
+    if len(chosen) < count:
+        unchosen = np.ones(len(candidates), dtype=bool)
+        unchosen[chosen] = False
+        chosen.extend(np.flatnonzero(unchosen)[:count - len(chosen)].tolist())
+    return candidates[chosen]
+
+def generate_coverage_tickets(model_type, user_numbers=None, count=10, rng=None, trend_window=None,
+                              time_budget=COVERAGE_TIME_BUDGET_SECONDS):
+    """모델 분포에서 뽑은 후보 풀로 커버리지 최적화된 서로 다른 티켓 count장 (count, 6)
+
+    time_budget은 후보 생성을 뺀 최적화 시간만 센다. None이면 시간 제한 없이 탐욕 선택을
+    끝까지 수행하므로 (최대 count번 반복) 같은 rng 상태면 항상 같은 티켓이 나온다.
+    """
+    pool_size = min(max(COVERAGE_MIN_CANDIDATES, count * 8), COVERAGE_MAX_CANDIDATES)
+    candidates = generate_ticket_batch(model_type, user_numbers, pool_size, rng=rng, trend_window=trend_window)
+    weights = get_model_weights(model_type, trend_window=trend_window)
+    
+    with metrics.timer('lottopro_coverage_seconds', (('model_type', model_type),)):
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        return optimize_ticket_coverage(candidates, weights, count, deadline=deadline)
+
+def generate_ai_prediction(model_type, user_numbers=None, rng=None):
+    """AI 모델별 예측 생성"""
+    try:
+        return generate_ticket_batch(model_type, user_numbers, 1, rng=rng)[0].tolist()
+        
+    except Exception as e:
+        safe_log(f"❌ 예측 생성 실패 ({model_type}): {str(e)}")
+        return sorted((rng or thread_rng()).choice(np.arange(1, 46), 6, replace=False).tolist())
+
+def build_dataset(csv_path=None, snapshot_dir=None, model_dir=None):
+    """CSV(또는 해시가 일치하는 스냅샷)에서 새 Dataset을 만든다. 게시된 데이터셋은 건드리지 않는다
+
+    통계분석 모델도 여기서 로드해 Dataset에 담으므로, 참조 하나를 교체하면 이력과 모델이 함께 바뀐다.
+    """
+    dataset = build_draw_dataset(csv_path, snapshot_dir)
+    return dataset._replace(
+        statistical_model=load_statistical_model(dataset, model_dir or MODEL_DIR),
+        base_round=dataset.store.latest_round
+    )
+
+def build_draw_dataset(csv_path=None, snapshot_dir=None):
+    """CSV(또는 해시가 일치하는 스냅샷)에서 이력과 분석 결과만 담은 Dataset (통계분석 모델 없음)"""
+    csv_path = csv_path or CSV_PATH
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    
+    try:
+        # 0단계: CSV 해시가 같으면 바이너리 스냅샷 사용 (pandas 불필요)
+        csv_hash = compute_file_hash(csv_path) if os.path.exists(csv_path) else None
+        engine = load_draw_snapshot(csv_hash, snapshot_dir) if csv_hash else None
+        
+        if engine is not None:
+            safe_log(f"✅ 스냅샷 데이터 사용: {len(engine.store)}회차")
+            return Dataset.from_engine(engine, {'data': None, 'length': len(engine.store), 'mode': 'snapshot'}, csv_hash)
+        
+        # 1단계: CSV 파일 완전 로드
+        source = load_csv_data_completely(csv_path)
+        
+        if source is not None:
+            safe_log("✅ CSV 로드 성공")
+            
+            # 2단계: CSV 데이터 변환
+            store = convert_csv_to_sample_data(source)
+            
+            if store is not None and len(store) > 0:
+                safe_log(f"✅ 실제 CSV 데이터 사용: {len(store)}회차")
+                
+                # 3단계: 실제 데이터 분석
+                safe_log("🔍 실제 CSV 데이터 분석 시작...")
+                frequency_analysis = analyze_frequency_patterns(store)
+                trend_analysis = analyze_trend_patterns(store)
+                pattern_analysis = analyze_pattern_relationships(store)
+                engine = AnalysisEngine(store)
+                if csv_hash:
+                    save_draw_snapshot(engine, csv_hash, snapshot_dir)
                 
-                return sample_data
+                safe_log("✅ 실제 CSV 데이터 분석 완료")
+                safe_log(f"  - 빈도분석: {frequency_analysis is not None}")
+                safe_log(f"  - 트렌드분석: {trend_analysis is not None}")
+                safe_log(f"  - 패턴분석: {pattern_analysis is not None}")
+                
+                return Dataset(
+                    store, engine, source, frequency_analysis, trend_analysis, pattern_analysis,
+                    store.get_draw(store.latest_round), csv_hash
+                )
         
         # 실패 시 최소 데이터
         safe_log("⚠️ CSV 로드 실패 - 최소 데이터로 대체")
-        sample_data = create_minimal_fallback_data()
+        store = DrawStore.from_records(create_minimal_fallback_data(source_latest_round_info(source), csv_path))
         
         # 최소 데이터라도 분석 시도
-        if len(sample_data) > 0:
+        frequency_analysis = trend_analysis = pattern_analysis = engine = None
+        if len(store) > 0:
             safe_log("🔍 최소 데이터 분석 시작...")
-            analyze_frequency_patterns()
-            analyze_trend_patterns()
-            analyze_pattern_relationships()
+            frequency_analysis = analyze_frequency_patterns(store)
+            trend_analysis = analyze_trend_patterns(store)
+            pattern_analysis = analyze_pattern_relationships(store)
+            engine = AnalysisEngine(store)
         
-        safe_log(f"✅ 최소 데이터 초기화 완료: {len(sample_data)}회차")
-        return sample_data
+        safe_log(f"✅ 최소 데이터 초기화 완료: {len(store)}회차")
+        return Dataset(
+            store, engine, None, frequency_analysis, trend_analysis, pattern_analysis,
+            source_latest_round_info(source), csv_hash
+        )
         
     except Exception as e:
         safe_log(f"❌ 데이터 시스템 초기화 전체 실패: {str(e)}")
         
         # 절대 실패하지 않는 최후 방어선
-        sample_data = create_minimal_fallback_data()
-        safe_log(f"⚠️ 최후 방어선 작동: {len(sample_data)}회차")
-        return sample_data
+        store = DrawStore.from_records(create_minimal_fallback_data(csv_path=csv_path))
+        safe_log(f"⚠️ 최후 방어선 작동: {len(store)}회차")
+        return Dataset(store, None, None, None, None, None, None, None)
+
+def initialize_data_system():
+    """완전한 데이터 시스템 초기화: 새 Dataset(통계분석 모델 포함)을 만들어 게시하고 캐시 예열"""
+    with data_lock:
+        safe_log("=== 완전한 데이터 시스템 초기화 시작 ===")
+        dataset = publish_dataset(build_dataset(CSV_PATH, SNAPSHOT_DIR))
+        warm_dataset_caches()
+    return dataset.store
+
+def warm_dataset_caches():
+    """게시된 데이터셋의 응답 캐시(진단/통계/간격/회차 메타)와 모델별 가중치·별칭 표를 미리 만든다
+
+    한 번이라도 끝나면 /readyz가 통과한다. 반환: 예열한 데이터셋 버전 (실패 시 이전 값)
+    """
+    global warmed_version
+    
+    dataset = active_dataset
+    if dataset is None:
+        return warmed_version
+    
+    try:
+        with metrics.timer('lottopro_cache_warm_seconds'):
+            get_cached_entry('health', build_health_payload)
+            get_cached_entry('stats', build_stats_payload)
+            get_cached_entry('example-numbers:meta', build_round_metadata)
+            if dataset.engine is not None:
+                get_cached_entry('gaps', build_gaps_payload)
+            for model_name in SUPPORTED_MODEL_NAMES:
+                weights = np.ascontiguousarray(get_model_weights(model_name), dtype=np.float64)
+                build_alias_table(weights.tobytes())
+        warmed_version = dataset.version
+        safe_log(f"✅ 캐시 예열 완료: {warmed_version}")
+    except Exception as e:
+        safe_log(f"⚠️ 캐시 예열 실패: {str(e)}")
+    return warmed_version
+
+def file_signature(path):
+    """변경 감지용 파일 서명 (mtime_ns, size). 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def reload_dataset(rebuild=False, allow_shrink=False):
+    """CSV 내용이 바뀌었으면 (rebuild=True면 항상) 새 Dataset을 만들어 게시
+
+    빌드는 호출한 스레드(감시 스레드 / 관리 요청)에서 끝낸 뒤 참조 하나만 교체하므로
+    요청 처리는 멈추지 않는다. CSV를 읽지 못해 최소 데이터로 대체됐거나, 회차 수가
+    줄어든 경우(allow_shrink가 아니면)는 기존 데이터셋을 유지한다.
+    반환: (게시 여부, 결과: published / unchanged / fallback / shrink)
+    """
+    with data_lock:
+        previous = active_dataset
+        if not rebuild and previous is not None:
+            csv_hash = compute_file_hash(CSV_PATH) if os.path.exists(CSV_PATH) else None
+            if csv_hash == previous.hash:
+                metrics.inc('lottopro_dataset_reloads_total', (('result', 'unchanged'),))
+                return False, 'unchanged'
+        
+        with metrics.timer('lottopro_dataset_reload_seconds'):
+            dataset = build_dataset(CSV_PATH, SNAPSHOT_DIR)
+            if previous is not None and (dataset.source is None or dataset.engine is None):
+                result = 'fallback'
+            elif previous is not None and len(dataset.store) < len(previous.store) and not allow_shrink:
+                result = 'shrink'
+            else:
+                publish_dataset(dataset)
+                warm_dataset_caches()
+                result = 'published'
+    
+    metrics.inc('lottopro_dataset_reloads_total', (('result', result),))
+    if result == 'published':
+        previous_version = previous.version if previous is not None else None
+        safe_log(f"✅ 데이터셋 리로드: {previous_version} → {dataset.version} ({len(dataset.store)}회차)")
+    else:
+        safe_log(f"⚠️ 데이터셋 리로드 보류 ({result}): 새 데이터 {len(dataset.store)}회차 - 기존 데이터셋 유지")
+    return result == 'published', result
+
+def touch_reload_trigger():
+    """다른 워커 프로세스에 리로드를 알리는 트리거 파일 갱신"""
+    with open(RELOAD_TRIGGER_PATH, 'w', encoding='utf-8') as f:
+        f.write(f"{datetime.now().isoformat()} {os.getpid()}\n")
+
+class DatasetWatcher:
+    """CSV와 리로드 트리거 파일을 interval초마다 확인해 바뀌면 reload_dataset()
+
+    프로세스마다 데몬 스레드 하나로 돌며 (gunicorn은 post_fork에서 시작), os.stat만
+    하다가 서명이 바뀌었을 때만 해시를 계산한다. 트리거 파일이 바뀌면 CSV가 같아도
+    다시 빌드하므로 /admin/reload를 받은 워커 외의 워커도 interval초 안에 따라온다.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pid = None
+        self._stop = threading.Event()
+        self._csv_signature = None
+        self._trigger_signature = None
+
+    def start(self):
+        """이 프로세스에서 감시 시작 (interval <= 0이거나 이미 실행 중이면 무시)"""
+        if self.interval <= 0 or self._pid == os.getpid():
+            return False
+        self._pid = os.getpid()
+        self._stop = threading.Event()
+        # CSV 서명은 비워 두어 첫 확인에서 해시를 비교 (fork 이후 바뀐 CSV도 반영)
+        self._csv_signature = None
+        self._trigger_signature = file_signature(RELOAD_TRIGGER_PATH)
+        threading.Thread(target=self._run, name='dataset-watcher', daemon=True).start()
+        safe_log(f"데이터셋 감시 시작: {CSV_PATH} ({self.interval:g}초 간격)")
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._pid = None
+
+    def acknowledge_trigger(self):
+        """이 프로세스가 직접 갱신한 트리거는 다시 처리하지 않음"""
+        self._trigger_signature = file_signature(RELOAD_TRIGGER_PATH)
+
+    def check(self):
+        """한 번 확인. 바뀐 것이 없으면 None, 있으면 reload_dataset() 결과"""
+        csv_signature = file_signature(CSV_PATH)
+        trigger_signature = file_signature(RELOAD_TRIGGER_PATH)
+        triggered = trigger_signature != self._trigger_signature
+        if csv_signature == self._csv_signature and not triggered:
+            return None
+        self._csv_signature, self._trigger_signature = csv_signature, trigger_signature
+        return reload_dataset(rebuild=triggered)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                safe_log(f"⚠️ 데이터셋 감시 실패: {str(e)}")
+
+dataset_watcher = DatasetWatcher(DATASET_WATCH_INTERVAL)
+
+PREDICTION_POOL_WORKERS = int(os.environ.get('PREDICTION_POOL_WORKERS', '2'))
+PREDICTION_QUEUE_SIZE = int(os.environ.get('PREDICTION_QUEUE_SIZE', '8'))
+PREDICTION_DEADLINE_SECONDS = float(os.environ.get('PREDICTION_DEADLINE_SECONDS', '10'))
+PREDICTION_RETRY_AFTER_SECONDS = int(os.environ.get('PREDICTION_RETRY_AFTER_SECONDS', '2'))
+
+class PredictionPoolSaturated(Exception):
+    """예측 실행 대기열이 가득 참 (503으로 응답)"""
+
+class WorkerDatasetMismatch(Exception):
+    """예측 워커가 요청의 데이터셋 버전을 만들 수 없음 (그 사이 CSV가 다시 바뀜 등)"""
+
+def _init_prediction_worker():
+    """예측 워커 프로세스 초기화: fork로 복제된 난수 스트림을 프로세스마다 새로 생성"""
+    reset_rng_streams()
+
+def dataset_ref(dataset):
+    """예측 워커에 작업과 함께 보내는 데이터셋 참조: (버전, CSV 해시, 기준 회차, 이후 추가된 회차)"""
+    return dataset.version, dataset.hash, dataset.base_round, dataset.appended_draws()
+
+def sync_worker_dataset(ref):
+    """예측 워커: 작업의 데이터셋 참조와 같은 버전을 게시 (워커 풀을 다시 만들지 않음)
+
+    같은 CSV에서 만든 버전이면 빠진 증분 회차만 덧붙이고, CSV가 바뀌었으면 스냅샷/CSV에서
+    다시 만든 뒤 덧붙인다. 그래도 버전이 다르면 WorkerDatasetMismatch.
+    """
+    global active_dataset
+    version, csv_hash, base_round, appended = ref
+    dataset = active_dataset
+    if dataset is not None and dataset.version == version:
+        return
+    
+    known_rounds = {base_round} | {draw[0] for draw in appended}
+    if dataset is None or dataset.engine is None or dataset.hash != csv_hash or dataset.base_round != base_round \
+            or dataset.store.latest_round not in known_rounds:
+        dataset = build_dataset(CSV_PATH, SNAPSHOT_DIR)
+    if dataset.engine is not None:
+        missing = [draw for draw in appended if draw[0] > dataset.store.latest_round]
+        if missing:
+            dataset = dataset.append_draws(missing)
+    if dataset.version != version:
+        raise WorkerDatasetMismatch(f"{dataset.version} != {version}")
+    # 워커 프로세스는 요청 스레드가 없으므로 응답 캐시 무효화 없이 참조만 교체
+    active_dataset = dataset
+
+def _run_prediction_task(ref, fn, *args):
+    """예측 워커 프로세스: 데이터셋 버전을 맞춘 뒤 fn 실행"""
+    sync_worker_dataset(ref)
+    return _call_with_metrics(fn, *args)
+
+def compute_prediction_models(model_names, user_numbers, rng=None, trend_window=None,
+                              strategy='independent', count=10):
+    """모델별 count개 예측 + TOP 추천 5개 계산 (예측 워커 프로세스에서 실행)
+
+    strategy='coverage'면 모델별로 서로 다른 티켓을 번호 쌍 커버리지가 최대가 되게 고르며,
+    모델마다 최적화 시간 COVERAGE_TIME_BUDGET_SECONDS를 쓴다. rng를 주면 (seed 요청)
+    결과가 실행 시간에 따라 달라지지 않도록 시간 예산 없이 끝까지 고른다.
+    """
+    time_budget = COVERAGE_TIME_BUDGET_SECONDS if rng is None else None
+    
+    def generate(model_name, size, window=None):
+        if strategy == 'coverage':
+            return generate_coverage_tickets(model_name, user_numbers, size, rng=rng, trend_window=window,
+                                             time_budget=time_budget)
+        return generate_ticket_batch(model_name, user_numbers, size, rng=rng, trend_window=window)
+    
+    models = {}
+    for model_name in model_names:
+        try:
+            predictions = generate(model_name, count, trend_window).tolist()
+            
+            models[model_name] = {
+                'description': f'{model_name} 기반 실제 데이터 분석 예측',
+                'predictions': predictions
+            }
+            safe_log(f"✅ {model_name} 완료", level='debug')
+        except Exception as e:
+            safe_log(f"❌ {model_name} 실패: {str(e)}")
+            models[model_name] = {
+                'description': f'{model_name} 기반 예측',
+                'predictions': [[1, 7, 13, 25, 31, 42]]
+            }
+    
+    # TOP 추천
+    try:
+        top_recommendations = generate("빈도분석 모델", 5).tolist()
+        safe_log("✅ TOP 추천 완료", level='debug')
+    except Exception as e:
+        safe_log(f"❌ TOP 추천 실패: {str(e)}")
+        top_recommendations = [[1, 7, 13, 25, 31, 42]]
+    
+    return models, top_recommendations
+
+def _call_with_metrics(fn, *args):
+    """예측 워커 프로세스에서 fn 실행 후 그 동안 기록된 지표를 결과와 함께 반환"""
+    metrics.take_local()
+    result = fn(*args)
+    return result, metrics.take_local()
+
+def compute_ticket_batch(model_type, user_numbers, count, rng=None):
+    """스트리밍용 티켓 배치 계산 (예측 워커 프로세스에서 실행). 이어서 쓸 rng도 함께 반환"""
+    return generate_ticket_batch(model_type, user_numbers, count, rng=rng), rng
+
+class PredictionExecutor:
+    """CPU 연산용 고정 크기 프로세스 풀 + 고정 크기 대기열
+
+    동시에 받아들이는 작업은 workers + queue_size개까지이고, 그 이상은
+    기다리지 않고 PredictionPoolSaturated로 즉시 거절한다. 마감 시간을 넘겨
+    요청이 포기한 작업도 워커에서 실제로 끝날 때까지 슬롯을 차지하므로,
+    밀린 작업이 풀 내부 대기열에 쌓이지 않는다. 포기한 작업이 워커를 모두
+    차지하고 있는 동안에는 새 요청을 대기열에 넣지 않고 503으로 거절한다.
+
+    풀은 한 번만 만든다. gunicorn에서는 post_fork에서 다른 스레드가 생기기 전에
+    start()로 워커를 fork하고, 그 외(개발 서버, 깨진 풀 복구)에는 스레드가 있어도
+    안전한 forkserver 방식으로 만든다. 데이터셋 버전은 작업마다 dataset_ref로 보내고
+    워커가 sync_worker_dataset으로 맞추므로 버전이 바뀌어도 풀을 다시 만들지 않는다.
+    workers=0이면 요청 스레드에서 직접 실행하되 동시 실행 수 제한은 그대로 적용한다.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = max(0, workers)
+        self.capacity = max(1, self.workers) + max(0, queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._abandoned = 0
+        self._pool = None
+        self.rejected = 0
+        self.timed_out = 0
+
+    def acquire(self):
+        """슬롯 하나 확보. 대기열이 가득 찼거나 모든 워커가 포기한 작업을 실행 중이면 즉시 PredictionPoolSaturated"""
+        with self._lock:
+            # 워커가 모두 포기한 작업에 묶여 있으면 대기열에 넣어도 마감 시간 안에 시작할 수 없다
+            if self._in_flight + self._abandoned >= self.capacity or self._abandoned >= max(1, self.workers):
+                self.rejected += 1
+                raise PredictionPoolSaturated()
+            self._in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _abandoned_done(self, future):
+        """포기한 작업이 끝나거나 취소되면 붙잡고 있던 슬롯 반납"""
+        with self._lock:
+            self._abandoned -= 1
+
+    def _new_pool(self, method):
+        try:
+            context = multiprocessing.get_context(method)
+        except ValueError:
+            context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_prediction_worker)
+
+    def start(self):
+        """워커 프로세스를 지금 fork한다. 스레드가 하나뿐일 때(gunicorn post_fork 첫 단계)만 호출
+
+        fork 방식 풀은 첫 작업 때 워커를 한꺼번에 만들므로 빈 작업 하나로 워커를 띄운다.
+        다른 스레드가 잡고 있던 잠금(로그, 난수)이 워커에 잠긴 채 복제되는 일이 없다.
+        """
+        if self.workers == 0:
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool('fork')
+            pool = self._pool
+        pool.submit(int).result()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool('forkserver')
+            return self._pool
+
+    def call(self, fn, *args, timeout=None):
+        """확보한 슬롯으로 fn(*args) 실행 후 결과 반환 (timeout 초과 시 TimeoutError)
+
+        timeout을 넘기면 요청의 슬롯은 호출자가 release()로 반납하고, 대신 아직
+        끝나지 않은 작업이 별도 슬롯을 붙잡아 작업이 끝나는 시점(done 콜백)에 반납한다.
+        """
+        if self.workers == 0:
+            return fn(*args)
+        
+        # 워커 프로세스의 지표는 결과와 함께 돌려받아 이 프로세스에 합친다
+        ref = dataset_ref(current_dataset())
+        try:
+            future = self._get_pool().submit(_run_prediction_task, ref, fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            future = self._get_pool().submit(_run_prediction_task, ref, fn, *args)
+        
+        try:
+            result, worker_metrics = future.result(timeout=timeout)
+            metrics.merge(worker_metrics)
+            return result
+        except WorkerDatasetMismatch as e:
+            safe_log(f"⚠️ 예측 워커 데이터셋 불일치 ({e}) - 요청 스레드에서 실행")
+            return fn(*args)
+        except FutureTimeoutError:
+            # 아직 시작 전이면 취소되고 (콜백 즉시 실행), 실행 중이면 끝날 때 콜백이 실행된다
+            with self._lock:
+                self.timed_out += 1
+                self._abandoned += 1
+            future.cancel()
+            future.add_done_callback(self._abandoned_done)
+            raise
+
+    def stats(self):
+        """활성 / 대기 게이지 (포기했지만 아직 실행 중인 작업 포함)"""
+        with self._lock:
+            in_flight = self._in_flight + self._abandoned
+            abandoned = self._abandoned
+        running_slots = max(1, self.workers)
+        return {
+            'workers': self.workers,
+            'queue_size': self.capacity - running_slots,
+            'active': min(in_flight, running_slots),
+            'queued': max(0, in_flight - running_slots),
+            'abandoned': abandoned,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
+
+prediction_executor = PredictionExecutor(PREDICTION_POOL_WORKERS, PREDICTION_QUEUE_SIZE)
+
+def saturated_response():
+    """대기열 포화 시 503 + Retry-After"""
+    response = jsonify({
+        'success': False,
+        'error': '요청이 많아 잠시 후 다시 시도해주세요.',
+        'retry_after': PREDICTION_RETRY_AFTER_SECONDS
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(PREDICTION_RETRY_AFTER_SECONDS)
+    return response
+
+def timeout_response():
+    """작업 마감 시간 초과 시 504"""
+    return jsonify({'success': False, 'error': '예측 생성 시간이 초과되었습니다.'}), 504
+
+def dataset_version():
+    """데이터셋 버전: 최신 회차 + CSV 해시 앞부분 (요청 중이면 요청이 고정한 데이터셋 기준)"""
+    return current_dataset().version
+
+def invalidate_response_cache():
+    """데이터셋이 바뀌면 캐시된 응답을 모두 버린다"""
+    response_cache.clear()
+
+def get_cached_entry(key, builder):
+    """데이터셋 버전별로 builder() 결과를 JSON 바이트로 직렬화해 캐시"""
+    version = dataset_version()
+    entry = response_cache.get(key)
+    if entry is None or entry['version'] != version:
+        metrics.inc('lottopro_response_cache_requests_total', (('result', 'miss'),))
+        payload = builder()
+        body = app.json.dumps(payload).encode('utf-8')
+        entry = {
+            'version': version,
+            'payload': payload,
+            'body': body,
+            'etag': hashlib.sha1(body).hexdigest()
+        }
+        response_cache[key] = entry
+    else:
+        metrics.inc('lottopro_response_cache_requests_total', (('result', 'hit'),))
+    return entry
+
+def response_cache_hit_ratio():
+    totals = metrics.counter_totals('lottopro_response_cache_requests_total')
+    hits = totals.get((('result', 'hit'),), 0)
+    lookups = hits + totals.get((('result', 'miss'),), 0)
+    return hits / lookups if lookups else None
+
+def statistical_model_stale_rounds():
+    dataset = active_dataset
+    if dataset is None or dataset.statistical_model is None:
+        return -1
+    return dataset.store.latest_round - dataset.statistical_model.latest_round
+
+def prediction_pool_gauges():
+    return [((('state', key),), value) for key, value in prediction_executor.stats().items()]
+
+metrics.gauge('lottopro_dataset_draws', '적재된 회차 수', lambda: len(active_dataset.store) if active_dataset else 0)
+metrics.gauge('lottopro_dataset_latest_round', '최신 회차 번호', lambda: active_dataset.store.latest_round if active_dataset else 0)
+metrics.gauge('lottopro_statistical_model_stale_rounds', '통계분석 모델 학습 이후 추가된 회차 수 (모델 없으면 -1)', statistical_model_stale_rounds)
+metrics.gauge('lottopro_response_cache_hit_ratio', '응답 캐시 적중률', response_cache_hit_ratio)
+metrics.gauge('lottopro_prediction_pool', '예측 프로세스 풀 상태', prediction_pool_gauges)
+metrics.gauge('lottopro_log_dropped', '로그 큐가 가득 차 버린 로그 수', lambda: log_dropped)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def assign_request_id():
+    """요청 ID (클라이언트가 보낸 X-Request-ID가 올바르면 그대로 사용) + debug 로그 샘플링 여부"""
+    request_id = request.headers.get('X-Request-ID', '')
+    if not (0 < len(request_id) <= 64 and request_id.replace('-', '').replace('_', '').isalnum() and request_id.isascii()):
+        request_id = uuid.uuid4().hex
+    g.request_id = request_id
+    g.log_sampled = LOG_DEBUG_SAMPLE_RATE > 0 and thread_rng().random() < LOG_DEBUG_SAMPLE_RATE
+
+@app.before_request
+def pin_dataset():
+    """요청 동안 쓸 데이터셋을 고정 (처리 도중 리로드가 게시돼도 이 요청은 같은 버전을 본다)
+
+    생존/준비 확인 요청은 초기화를 일으키지 않도록 건너뛴다.
+    """
+    if request.endpoint in PROBE_ENDPOINTS:
+        return
+    current_dataset()
+
+@app.after_request
+def record_request_metrics(response):
+    """라우트 템플릿별 요청 수 / 처리 시간 기록 (알 수 없는 경로는 하나로 묶음)"""
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe('lottopro_http_request_duration_seconds', (('route', route),), time.perf_counter() - started)
+        metrics.inc('lottopro_http_requests_total', (
+            ('route', route), ('method', request.method), ('status', str(response.status_code))
+        ))
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+def cached_json_response(key, builder):
+    """캐시된 JSON 바이트로 응답 (ETag / If-None-Match → 304)"""
+    entry = get_cached_entry(key, builder)
+    headers = {
+        'ETag': f'"{entry["etag"]}"',
+        'Cache-Control': f'public, max-age={RESPONSE_CACHE_MAX_AGE}'
+    }
+    if request.if_none_match.contains(entry['etag']):
+        return Response(status=304, headers=headers)
+    return Response(entry['body'], mimetype='application/json', headers=headers)
+
+def build_data_source():
+    dataset = current_dataset()
+    return f"실제 CSV {len(dataset.store)}회차 데이터" if dataset.source is not None else f"최소 {len(dataset.store)}회차 데이터"
+
+def build_round_metadata():
+    """예시번호/예측 응답에 공통으로 붙는 데이터셋 메타데이터"""
+    latest_round_info = current_dataset().latest_round_info
+    current_round_info = latest_round_info if latest_round_info else {'round': 1196}
+    return {
+        'data_source': build_data_source(),
+        'current_round': current_round_info['round'],
+        'next_round': current_round_info['round'] + 1
+    }
+
+def parse_window(value):
+    """요청의 window 값 → 1 이상 정수 또는 None (잘못된 값이면 ValueError)"""
+    if value in (None, ''):
+        return None
+    window = int(value)
+    if window < 1:
+        raise ValueError("window는 1 이상이어야 합니다")
+    return window
+
+def parse_stats_query(args):
+    """/api/stats의 window / from_round / to_round → window_counts 인자 (없으면 None)"""
+    query = {
+        'window': parse_window(args.get('window')),
+        'from_round': int(args['from_round']) if args.get('from_round') else None,
+        'to_round': int(args['to_round']) if args.get('to_round') else None
+    }
+    if query['window'] is not None and query['from_round'] is not None:
+        raise ValueError("window와 from_round는 함께 쓸 수 없습니다")
+    if query['from_round'] is not None and query['to_round'] is not None and query['from_round'] > query['to_round']:
+        raise ValueError("from_round가 to_round보다 큽니다")
+    if all(value is None for value in query.values()):
+        return None
+    return query
+
+def build_window_stats_payload(query):
+    """구간 통계 응답 본문: 누적합 뺄셈으로 구간 빈도를 구하므로 구간 길이와 무관하게 O(45)
+
+    짧은 구간에서는 한 번도 안 나온 번호가 많으므로, 번호 45개 전체 카운트(0 포함)로
+    빈도와 hot/cold 목록을 만든다 (cold는 적게 나온 순, 동률은 번호 순).
+    """
+    engine = current_dataset().engine
+    start, end = engine.window_rows(**query)
+    counts = engine.cumulative.range_counts(start, end)[1:]
+    hot = np.argsort(-counts, kind='stable')[:10]
+    cold = np.argsort(counts, kind='stable')[:10]
+    rounds = engine.store.rounds
+    
+    payload = {
+        'frequency': {num: int(counts[num - 1]) for num in range(1, 46)},
+        'hot_numbers': [[int(i) + 1, int(counts[i])] for i in hot],
+        'cold_numbers': [[int(i) + 1, int(counts[i])] for i in cold],
+        'total_draws': end - start,
+        'window': {
+            'from_round': int(rounds[start]) if end > start else None,
+            'to_round': int(rounds[end - 1]) if end > start else None,
+            'draws': end - start
+        }
+    }
+    payload.update(build_round_metadata())
+    return payload
+
+def build_gaps_payload():
+    """미출현 간격 API 응답 본문 (번호 45개 배열 연산)"""
+    engine = current_dataset().engine
+    gaps = engine.gaps
+    rounds = engine.store.rounds
+    current = gaps.current_gaps()
+    mean = gaps.mean_gaps()
+    percentiles = gaps.gap_percentiles()
+    
+    numbers = []
+    for number in range(1, 46):
+        last_row = int(gaps.last_seen[number])
+        numbers.append({
+            'number': number,
+            'current_gap': int(current[number]),
+            'last_seen_round': int(rounds[last_row]) if last_row >= 0 else None,
+            'max_gap': int(gaps.gap_max[number]),
+            'mean_gap': round(float(mean[number]), 2),
+            'gap_percentile': round(float(percentiles[number]) * 100, 1),
+            'completed_gaps': int(gaps.gap_count[number])
+        })
+    
+    most_overdue = sorted(numbers, key=lambda n: (-n['gap_percentile'], -n['current_gap']))[:10]
+    payload = {
+        'success': True,
+        'numbers': numbers,
+        'most_overdue': [[n['number'], n['current_gap']] for n in most_overdue],
+        'total_draws': len(rounds)
+    }
+    payload.update(build_round_metadata())
+    return payload
+
+def build_stats_payload():
+    """통계 API 응답 본문"""
+    dataset = current_dataset()
+    frequency_analysis = dataset.frequency_analysis
+    
+    # 실제 분석 데이터 사용
+    if frequency_analysis:
+        hot_numbers = frequency_analysis['hot_numbers']
+        cold_numbers = list(reversed(frequency_analysis['cold_numbers']))
+    else:
+        hot_numbers = [[7, 15], [13, 14], [22, 13], [31, 12], [42, 11]]
+        cold_numbers = [[45, 8], [44, 9], [43, 10], [2, 11], [3, 12]]
+    
+    payload = {
+        'frequency': frequency_analysis['counter'] if frequency_analysis else {},
+        'hot_numbers': hot_numbers,
+        'cold_numbers': cold_numbers,
+        'total_draws': len(dataset.store) if dataset.store else 0,
+        'analysis_status': {
+            'frequency_analysis': frequency_analysis is not None,
+            'trend_analysis': dataset.trend_analysis is not None,
+            'pattern_analysis': dataset.pattern_analysis is not None
+        }
+    }
+    payload.update(build_round_metadata())
+    return payload
 
 @app.route('/')
 def index():
@@ -575,14 +3235,10 @@ def index():
 def get_example_numbers():
     """실시간 예시번호 생성 API"""
     try:
-        safe_log("example-numbers API 호출")
-        
-        # 데이터 초기화 확인
-        if sample_data is None:
-            initialize_data_system()
+        safe_log("example-numbers API 호출", level='debug')
         
         # AI 예측으로 예시번호 생성
-        example_numbers = generate_ai_prediction("빈도분석 모델", [])
+        example_numbers = generate_ticket_batch("빈도분석 모델", [], 1)[0].tolist()
         
         # 분석 정보 계산
         analysis = {
@@ -591,17 +3247,15 @@ def get_example_numbers():
             'odd_count': sum(1 for n in example_numbers if n % 2 != 0)
         }
         
-        # 현재 최신 회차 정보 포함
-        current_round_info = latest_round_info if latest_round_info else {'round': 1196}
-        
-        return jsonify({
+        # 현재 최신 회차 정보 포함 (데이터셋 버전별 캐시)
+        response = {
             'success': True,
             'example_numbers': example_numbers,
-            'analysis': analysis,
-            'data_source': f"실제 CSV {len(sample_data)}회차 데이터" if csv_dataframe is not None else f"최소 {len(sample_data)}회차 데이터",
-            'current_round': current_round_info['round'],
-            'next_round': current_round_info['round'] + 1
-        })
+            'analysis': analysis
+        }
+        response.update(get_cached_entry('example-numbers:meta', build_round_metadata)['payload'])
+        
+        return jsonify(response)
         
     except Exception as e:
         safe_log(f"example-numbers API 실패: {str(e)}")
@@ -617,18 +3271,17 @@ def get_example_numbers():
 def predict():
     """AI 예측 API"""
     try:
-        safe_log("=== predict API 호출 시작 ===")
+        safe_log("=== predict API 호출 시작 ===", level='debug')
         
-        # 데이터 초기화 확인
-        if sample_data is None:
-            initialize_data_system()
+        # 요청 동안 쓸 데이터셋 (요청 시작 시 고정)
+        dataset = current_dataset()
         
         # 요청 데이터 파싱
         try:
             data = request.get_json()
             if data is None:
                 data = {}
-            safe_log(f"요청 데이터: {data}")
+            safe_log(f"요청 데이터: {data}", level='debug')
         except Exception as e:
             safe_log(f"JSON 파싱 실패: {str(e)}")
             data = {}
@@ -636,56 +3289,72 @@ def predict():
         # 사용자 번호 추출
         try:
             user_numbers = data.get('user_numbers', [])
-            safe_log(f"사용자 번호: {user_numbers}")
+            safe_log(f"사용자 번호: {user_numbers}", level='debug')
         except Exception as e:
             safe_log(f"사용자 번호 추출 실패: {str(e)}")
             user_numbers = []
         
-        # 5개 모델 예측
-        models = {}
-        model_names = ['빈도분석 모델', '트렌드분석 모델', '패턴분석 모델', '통계분석 모델', '머신러닝 모델']
+        # 5개 기본 모델 예측 (요청의 models 목록으로 추가 모델 선택 가능)
+        model_names = DEFAULT_MODEL_NAMES
+        requested_models = data.get('models')
+        if isinstance(requested_models, list):
+            model_names = [m for m in requested_models if m in SUPPORTED_MODEL_NAMES] or DEFAULT_MODEL_NAMES
         
-        for model_name in model_names:
-            try:
-                predictions = []
-                for i in range(10):
-                    pred = generate_ai_prediction(model_name, user_numbers)
-                    predictions.append(pred)
-                
-                models[model_name] = {
-                    'description': f'{model_name} 기반 실제 데이터 분석 예측',
-                    'predictions': predictions
-                }
-                safe_log(f"✅ {model_name} 완료")
-            except Exception as e:
-                safe_log(f"❌ {model_name} 실패: {str(e)}")
-                models[model_name] = {
-                    'description': f'{model_name} 기반 예측',
-                    'predictions': [[1, 7, 13, 25, 31, 42]]
-                }
+        # seed가 있으면 같은 요청에 항상 같은 결과
+        try:
+            seed = parse_seed(data.get('seed'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'seed는 0 이상의 정수여야 합니다'}), 400
+        rng = request_rng(seed) if seed is not None else None
         
-        # TOP 추천
+        # 트렌드 모델 구간 (기본: 최근 TREND_WINDOW회차)
         try:
-            top_recommendations = []
-            for i in range(5):
-                rec = generate_ai_prediction("빈도분석 모델", user_numbers)
-                top_recommendations.append(rec)
-            safe_log("✅ TOP 추천 완료")
-        except Exception as e:
-            safe_log(f"❌ TOP 추천 실패: {str(e)}")
-            top_recommendations = [[1, 7, 13, 25, 31, 42]]
+            trend_window = parse_window(data.get('trend_window'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'trend_window는 1 이상의 정수여야 합니다'}), 400
+        
+        # 생성 전략 (independent: 모델 분포에서 독립 추출, coverage: 쌍 커버리지 최적화) / 모델당 티켓 수
+        strategy = data.get('strategy') or 'independent'
+        if strategy not in PREDICT_STRATEGIES:
+            return jsonify({'success': False, 'error': f"strategy는 {', '.join(PREDICT_STRATEGIES)} 중 하나여야 합니다"}), 400
+        try:
+            count = parse_window(data.get('count')) or 10
+            if count > MAX_PREDICT_TICKETS:
+                raise ValueError(count)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': f'count는 1~{MAX_PREDICT_TICKETS} 사이의 정수여야 합니다'}), 400
+        
+        # 예측 연산은 프로세스 풀에서 실행 (대기열이 가득 차면 즉시 503)
+        try:
+            prediction_executor.acquire()
+        except PredictionPoolSaturated:
+            safe_log("⚠️ 예측 대기열 포화 - 503 응답")
+            return saturated_response()
+        try:
+            models, top_recommendations = prediction_executor.call(
+                compute_prediction_models, model_names, user_numbers, rng, trend_window, strategy, count,
+                timeout=PREDICTION_DEADLINE_SECONDS
+            )
+        except FutureTimeoutError:
+            safe_log("⚠️ 예측 마감 시간 초과 - 504 응답")
+            return timeout_response()
+        finally:
+            prediction_executor.release()
         
         # 응답 생성
         try:
             total_combinations = sum(len(model.get('predictions', [])) for model in models.values())
-            data_source = f"실제 CSV {len(sample_data)}회차 데이터" if csv_dataframe is not None else f"최소 {len(sample_data)}회차 데이터"
+            data_source = build_data_source()
             
             # 현재 회차 정보 포함
-            current_round_info = latest_round_info if latest_round_info else {'round': 1196}
+            current_round_info = dataset.latest_round_info if dataset.latest_round_info else {'round': 1196}
             
             response = {
                 'success': True,
                 'user_numbers': user_numbers,
+                'seed': seed,
+                'trend_window': trend_window or TREND_WINDOW,
+                'strategy': strategy,
                 'models': models,
                 'top_recommendations': top_recommendations,
                 'total_combinations': total_combinations,
@@ -693,13 +3362,13 @@ def predict():
                 'current_round': current_round_info['round'],
                 'next_round': current_round_info['round'] + 1,
                 'analysis_applied': {
-                    'frequency_analysis': frequency_analysis is not None,
-                    'trend_analysis': trend_analysis is not None,
-                    'pattern_analysis': pattern_analysis is not None
+                    'frequency_analysis': dataset.frequency_analysis is not None,
+                    'trend_analysis': dataset.trend_analysis is not None,
+                    'pattern_analysis': dataset.pattern_analysis is not None
                 }
             }
             
-            safe_log("✅ 응답 생성 완료")
+            safe_log("✅ 응답 생성 완료", level='debug')
             return jsonify(response)
             
         except Exception as e:
@@ -709,7 +3378,7 @@ def predict():
     except Exception as e:
         safe_log(f"❌ predict API 전체 실패: {str(e)}")
         import traceback
-        safe_log(f"Traceback: {traceback.format_exc()}")
+        safe_log(f"Traceback: {traceback.format_exc()}", level='error')
         
         return jsonify({
             'success': False,
@@ -717,40 +3386,176 @@ def predict():
             'debug_info': str(e)
         }), 500
 
+STREAM_BATCH_SIZE = 4096
+MAX_STREAM_TICKETS = 1000000
+
+def parse_user_numbers_param(value):
+    """쿼리 문자열 "3,7,21" 또는 JSON 리스트 → 번호 리스트"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value.strip():
+        return [p for p in value.split(',') if p.strip()]
+    return []
+
+def stream_ticket_lines(model_type, user_numbers, count, output_format, rng, executor=None):
+    """고정 크기 배치로 티켓을 만들어 NDJSON/CSV 줄 묶음으로 내보내는 제너레이터
+
+    한 번에 STREAM_BATCH_SIZE장만 메모리에 두므로 count와 무관하게 메모리가 일정하다.
+    클라이언트 연결이 끊기면 WSGI 서버가 제너레이터를 닫아(GeneratorExit) 생성이 바로 멈춘다.
+    executor를 주면 배치 연산을 예측 프로세스 풀에서 실행한다.
+    """
+    produced = 0
+    try:
+        if output_format == 'csv':
+            yield b'n1,n2,n3,n4,n5,n6\n'
+        
+        while produced < count:
+            batch_size = min(STREAM_BATCH_SIZE, count - produced)
+            if executor is not None:
+                batch, rng = executor.call(
+                    compute_ticket_batch, model_type, user_numbers, batch_size, rng, timeout=PREDICTION_DEADLINE_SECONDS
+                )
+            else:
+                batch = generate_ticket_batch(model_type, user_numbers, batch_size, rng=rng)
+            
+            if output_format == 'csv':
+                lines = [f"{a},{b},{c},{d},{e},{f}" for a, b, c, d, e, f in batch.tolist()]
+            else:
+                lines = [f"[{a},{b},{c},{d},{e},{f}]" for a, b, c, d, e, f in batch.tolist()]
+            
+            produced += batch_size
+            yield ('\n'.join(lines) + '\n').encode('ascii')
+    finally:
+        if produced < count:
+            safe_log(f"스트리밍 중단: {produced}/{count}장 ({model_type})", level='warning')
+
+@app.route('/api/predict/stream', methods=['GET', 'POST'])
+def predict_stream():
+    """대량 티켓 스트리밍 API (NDJSON 또는 CSV)
+
+    파라미터 (쿼리 또는 JSON 본문): model, count, user_numbers, seed, format(ndjson|csv)
+    """
+    try:
+        params = dict(request.args)
+        if request.method == 'POST':
+            body = request.get_json(silent=True)
+            if isinstance(body, dict):
+                params.update(body)
+        
+        model_type = params.get('model') or '빈도분석 모델'
+        if model_type not in SUPPORTED_MODEL_NAMES:
+            return jsonify({'success': False, 'error': f'지원하지 않는 모델: {model_type}'}), 400
+        
+        try:
+            count = int(params.get('count', 1000))
+            seed = parse_seed(params.get('seed'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'count와 seed는 정수여야 합니다'}), 400
+        
+        if not 1 <= count <= MAX_STREAM_TICKETS:
+            return jsonify({'success': False, 'error': f'count는 1~{MAX_STREAM_TICKETS:,} 범위여야 합니다'}), 400
+        
+        output_format = params.get('format', 'ndjson')
+        if output_format not in ('ndjson', 'csv'):
+            return jsonify({'success': False, 'error': 'format은 ndjson 또는 csv'}), 400
+        
+        user_numbers = parse_user_numbers_param(params.get('user_numbers'))
+        rng = request_rng(seed) if seed is not None else None
+        
+        try:
+            prediction_executor.acquire()
+        except PredictionPoolSaturated:
+            safe_log("⚠️ 예측 대기열 포화 - 503 응답")
+            return saturated_response()
+        
+        safe_log(f"predict/stream 시작: {model_type}, {count}장, {output_format}", level='debug')
+        headers = {'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}
+        if output_format == 'csv':
+            headers['Content-Disposition'] = 'attachment; filename="lottopro_tickets.csv"'
+        
+        response = Response(
+            stream_ticket_lines(model_type, user_numbers, count, output_format, rng, prediction_executor),
+            mimetype='text/csv' if output_format == 'csv' else 'application/x-ndjson',
+            headers=headers
+        )
+        # 스트림이 끝나거나 연결이 끊겨 응답이 닫힐 때 슬롯 반납
+        response.call_on_close(prediction_executor.release)
+        return response
+        
+    except Exception as e:
+        safe_log(f"predict/stream API 실패: {str(e)}")
+        return jsonify({'success': False, 'error': '스트리밍 생성 실패'}), 500
+
+@app.route('/api/check', methods=['POST'])
+def check_ticket_list():
+    """티켓 대량 당첨 확인 API
+
+    JSON 본문 {"tickets": [[1,2,3,4,5,6], ...], "round": 1196} 또는 한 줄에 한 장씩
+    "1,2,3,4,5,6" 텍스트 본문 (?round=1196). round가 없으면 전체 이력과 대조한다.
+    """
+    try:
+        store = current_dataset().store
+        
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            raw_tickets, round_param = body.get('tickets'), body.get('round')
+        else:
+            raw_tickets, round_param = request.get_data(as_text=True), request.args.get('round')
+        
+        try:
+            tickets = parse_tickets(raw_tickets)
+            round_no = int(round_param) if round_param not in (None, '') else None
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if round_no is not None and store.row_of(round_no) < 0:
+            return jsonify({'success': False, 'error': f'{round_no}회차 데이터가 없습니다'}), 404
+        
+        try:
+            prediction_executor.acquire()
+        except PredictionPoolSaturated:
+            safe_log("⚠️ 예측 대기열 포화 - 503 응답")
+            return saturated_response()
+        try:
+            result = prediction_executor.call(check_tickets, tickets, round_no, timeout=PREDICTION_DEADLINE_SECONDS)
+        except FutureTimeoutError:
+            safe_log("⚠️ 당첨 확인 마감 시간 초과 - 504 응답")
+            return timeout_response()
+        finally:
+            prediction_executor.release()
+        
+        result['success'] = True
+        return jsonify(result)
+        
+    except Exception as e:
+        safe_log(f"check API 실패: {str(e)}")
+        return jsonify({'success': False, 'error': '당첨 확인 실패'}), 500
+
 @app.route('/api/stats')
 def get_stats():
-    """통계 API"""
+    """통계 API
+
+    ?window=100                    → 최근 100회차 빈도
+    ?from_round=900&to_round=1000  → 900~1000회차 빈도 (한쪽만 줘도 됨)
+    파라미터가 없으면 전체 기간 통계 (데이터셋 버전별 캐시)
+    """
     try:
-        safe_log("stats API 호출")
+        safe_log("stats API 호출", level='debug')
         
-        if sample_data is None:
-            initialize_data_system()
+        try:
+            query = parse_stats_query(request.args)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'잘못된 구간 파라미터: {e}'}), 400
         
-        # 실제 분석 데이터 사용
-        if frequency_analysis:
-            hot_numbers = frequency_analysis['hot_numbers']
-            cold_numbers = list(reversed(frequency_analysis['cold_numbers']))
-        else:
-            hot_numbers = [[7, 15], [13, 14], [22, 13], [31, 12], [42, 11]]
-            cold_numbers = [[45, 8], [44, 9], [43, 10], [2, 11], [3, 12]]
+        if query is None:
+            return cached_json_response('stats', build_stats_payload)
         
-        # 현재 회차 정보 포함
-        current_round_info = latest_round_info if latest_round_info else {'round': 1196}
+        if current_dataset().engine is None:
+            return jsonify({'success': False, 'error': '구간 통계 준비 중'}), 503
         
-        return jsonify({
-            'frequency': frequency_analysis['counter'] if frequency_analysis else {},
-            'hot_numbers': hot_numbers,
-            'cold_numbers': cold_numbers,
-            'total_draws': len(sample_data) if sample_data else 0,
-            'data_source': f"실제 CSV {len(sample_data)}회차 데이터" if csv_dataframe is not None else f"최소 {len(sample_data)}회차 데이터",
-            'current_round': current_round_info['round'],
-            'next_round': current_round_info['round'] + 1,
-            'analysis_status': {
-                'frequency_analysis': frequency_analysis is not None,
-                'trend_analysis': trend_analysis is not None,
-                'pattern_analysis': pattern_analysis is not None
-            }
-        })
+        payload = build_window_stats_payload(query)
+        if payload['total_draws'] == 0:
+            return jsonify({'success': False, 'error': '해당 구간에 회차가 없습니다'}), 404
+        return jsonify(payload)
         
     except Exception as e:
         safe_log(f"stats API 실패: {str(e)}")
@@ -762,50 +3567,139 @@ def get_stats():
             'data_source': '기본 데이터'
         })
 
-@app.route('/api/health')
-def health_check():
-    """상세한 헬스 체크"""
-    try:
-        status = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'version': '4.0.0 (Pure CSV Management)',
-            'pandas_available': PANDAS_AVAILABLE,
-            'csv_loaded': csv_dataframe is not None,
-            'sample_data_count': len(sample_data) if sample_data else 0,
-            'current_directory': os.getcwd(),
-            'csv_file_exists': os.path.exists('new_1196.csv'),
-            'latest_round_info': latest_round_info,
-            'analysis_status': {
-                'frequency_analysis': frequency_analysis is not None,
-                'trend_analysis': trend_analysis is not None,
-                'pattern_analysis': pattern_analysis is not None
-            }
-        }
+@app.route('/api/cooccurrence')
+def get_cooccurrence():
+    """번호 동반출현 조회 API
+
+    ?number=7&top=10  → 7과 함께 가장 많이 나온 번호
+    ?pair=7,13&top=10 → 쌍 (7, 13)의 동반출현 횟수와 함께 나온 세 번째 번호
+    """
+    try:
+        dataset = current_dataset()
+        if dataset.engine is None:
+            return jsonify({'success': False, 'error': '동반출현 인덱스 준비 중'}), 503
         
-        if csv_dataframe is not None:
-            if hasattr(csv_dataframe, '__len__'):
-                status['csv_rows'] = len(csv_dataframe)
-            else:
-                status['csv_rows'] = csv_dataframe.get('length', 0)
-            status['data_source'] = 'CSV 실제 데이터'
-        else:
-            status['data_source'] = '최소 백업 데이터'
+        index = dataset.engine.cooccurrence
+        top = max(1, min(request.args.get('top', 10, type=int) or 10, 44))
+        pair = request.args.get('pair')
+        number = request.args.get('number', type=int)
         
-        # 파일 목록
-        try:
-            status['files_in_directory'] = os.listdir('.')
-        except:
-            status['files_in_directory'] = ['확인 불가']
+        if pair:
+            try:
+                a, b = [int(p) for p in pair.split(',')]
+            except ValueError:
+                return jsonify({'success': False, 'error': 'pair는 "a,b" 형식이어야 합니다'}), 400
+            if a == b or not (1 <= a <= 45 and 1 <= b <= 45):
+                return jsonify({'success': False, 'error': '서로 다른 1~45 번호 2개가 필요합니다'}), 400
+            
+            return jsonify({
+                'success': True,
+                'pair': sorted([a, b]),
+                'count': index.pair_count(a, b),
+                'third_numbers': index.top_third_numbers(a, b, top),
+                'total_draws': len(dataset.store)
+            })
         
-        # CSV 파일 첫 번째 줄 미리보기 (디버깅용)
-        try:
-            if os.path.exists('new_1196.csv'):
-                with open('new_1196.csv', 'r', encoding='utf-8') as f:
-                    status['csv_preview'] = f.readline().strip()[:100]
-        except:
-            status['csv_preview'] = '읽기 실패'
+        if number is None or not 1 <= number <= 45:
+            return jsonify({'success': False, 'error': 'number(1~45) 또는 pair 파라미터가 필요합니다'}), 400
         
+        return jsonify({
+            'success': True,
+            'number': number,
+            'partners': index.top_partners(number, top),
+            'total_draws': len(dataset.store)
+        })
+        
+    except Exception as e:
+        safe_log(f"cooccurrence API 실패: {str(e)}")
+        return jsonify({'success': False, 'error': '동반출현 조회 실패'}), 500
+
+@app.route('/api/gaps')
+def get_gaps():
+    """번호별 미출현 간격 API (현재 간격, 최대/평균 간격, 현재 간격의 백분위)"""
+    try:
+        if current_dataset().engine is None:
+            return jsonify({'success': False, 'error': '미출현 인덱스 준비 중'}), 503
+        
+        return cached_json_response('gaps', build_gaps_payload)
+        
+    except Exception as e:
+        safe_log(f"gaps API 실패: {str(e)}")
+        return jsonify({'success': False, 'error': '미출현 간격 조회 실패'}), 500
+
+LIVEZ_BODY = b'ok\n'
+PROBE_ENDPOINTS = frozenset({'livez', 'readyz'})
+
+@app.route('/livez')
+def livez():
+    """생존 확인: 항상 같은 응답 (파일 / 데이터셋 접근 없음)"""
+    return Response(LIVEZ_BODY, mimetype='text/plain')
+
+@app.route('/readyz')
+def readyz():
+    """준비 확인: 데이터셋과 분석 엔진이 게시되고 캐시 예열이 한 번 끝났으면 200, 아니면 503"""
+    dataset = active_dataset
+    ready = dataset is not None and dataset.engine is not None and warmed_version is not None
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'dataset_version': dataset.version if dataset is not None else None,
+        'warmed_version': warmed_version
+    }), 200 if ready else 503
+
+def build_health_payload():
+    """상세 진단 정보 (데이터셋 버전별로 한 번 만들어 캐시, 파일 확인은 이때만)"""
+    dataset = current_dataset()
+    csv_dataframe = dataset.source
+    status = {
+        'status': 'healthy',
+        'version': '4.0.0 (Pure CSV Management)',
+        'pandas_available': PANDAS_AVAILABLE,
+        'csv_loaded': csv_dataframe is not None,
+        'sample_data_count': len(dataset.store) if dataset.store else 0,
+        'dataset_version': dataset.version,
+        'diagnostics_built_at': datetime.now().isoformat(),
+        'current_directory': os.getcwd(),
+        'csv_file_exists': os.path.exists(CSV_PATH),
+        'latest_round_info': dataset.latest_round_info,
+        'analysis_status': {
+            'frequency_analysis': dataset.frequency_analysis is not None,
+            'trend_analysis': dataset.trend_analysis is not None,
+            'pattern_analysis': dataset.pattern_analysis is not None
+        }
+    }
+    
+    if csv_dataframe is not None:
+        if isinstance(csv_dataframe, dict):
+            status['csv_rows'] = csv_dataframe.get('length', 0)
+        else:
+            status['csv_rows'] = len(csv_dataframe)
+        status['data_source'] = 'CSV 실제 데이터'
+    else:
+        status['data_source'] = '최소 백업 데이터'
+    
+    # 파일 목록
+    try:
+        status['files_in_directory'] = os.listdir('.')
+    except:
+        status['files_in_directory'] = ['확인 불가']
+    
+    # CSV 파일 첫 번째 줄 미리보기 (디버깅용)
+    try:
+        if os.path.exists(CSV_PATH):
+            with open(CSV_PATH, 'r', encoding='utf-8') as f:
+                status['csv_preview'] = f.readline().strip()[:100]
+    except:
+        status['csv_preview'] = '읽기 실패'
+    
+    return status
+
+@app.route('/api/health')
+def health_check():
+    """상세한 헬스 체크: 데이터셋 버전별 캐시된 진단 정보 + 현재 시각 / 예측 풀 상태"""
+    try:
+        status = dict(get_cached_entry('health', build_health_payload)['payload'])
+        status['timestamp'] = datetime.now().isoformat()
+        status['prediction_pool'] = prediction_executor.stats()
         return jsonify(status)
         
     except Exception as e:
@@ -816,6 +3710,52 @@ def health_check():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 지표 (text exposition format 0.0.4)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def admin_token_valid():
+    """Authorization: Bearer <토큰> 또는 X-Admin-Token 헤더를 ADMIN_TOKEN과 상수 시간 비교"""
+    authorization = request.headers.get('Authorization', '')
+    supplied = authorization[7:] if authorization.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(supplied.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """데이터셋 즉시 리로드 (ADMIN_TOKEN 인증)
+
+    이 워커에서 새 데이터셋을 만들어 게시한 뒤 트리거 파일을 갱신해 다른 워커도
+    DATASET_WATCH_INTERVAL초 안에 리로드하게 한다. ?force=1이면 회차 수가 줄어도 게시한다.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': '관리 API가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정)'}), 404
+    if not admin_token_valid():
+        safe_log("⚠️ 관리 API 인증 실패")
+        return jsonify({'success': False, 'error': '인증 실패'}), 401
+    
+    try:
+        previous_version = active_dataset.version if active_dataset is not None else None
+        started = time.perf_counter()
+        published, result = reload_dataset(rebuild=True, allow_shrink=request.args.get('force') in ('1', 'true'))
+        if published:
+            touch_reload_trigger()
+            dataset_watcher.acknowledge_trigger()
+        
+        dataset = active_dataset
+        return jsonify({
+            'success': published,
+            'result': result,
+            'previous_version': previous_version,
+            'version': dataset.version,
+            'total_draws': len(dataset.store),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }), 200 if published else 409
+        
+    except Exception as e:
+        safe_log(f"❌ 관리 리로드 실패: {str(e)}")
+        return jsonify({'success': False, 'error': '리로드 실패'}), 500
+
 @app.route('/sw.js')
 def service_worker():
     """서비스 워커 파일 제공"""
@@ -843,7 +3783,7 @@ def not_found(error):
 
 @app.errorhandler(500)
 def internal_error(error):
-    safe_log(f"500 에러 발생: {error}")
+    safe_log(f"500 에러 발생: {error}", level='error')
     return jsonify({'error': 'Internal server error', 'details': str(error)}), 500
 
 # 앱 시작 시 즉시 초기화
@@ -854,5 +3794,6 @@ except Exception as e:
     safe_log(f"=== 데이터 시스템 초기화 실패: {str(e)} ===")
 
 if __name__ == '__main__':
+    dataset_watcher.start()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -0,0 +1,179 @@
+"""LottoPro AI 워크포워드 백테스트
+
+모든 회차 r에 대해 1..r-1회차로 학습된 분석 상태로 모델별 M장을 생성하고
+r회차 당첨번호와 비교해 등수별 적중 횟수를 집계한다. 회차 구간을 프로세스
+풀에 나눠 주고, 각 워커는 구간 시작 시점의 AnalysisEngine을 한 번 만든 뒤
+append_draw로 한 회차씩 증분 갱신한다.
+
+통계분석 모델은 전체 이력으로 학습한 앱의 아티팩트 대신, 구간마다 구간 시작
+전 회차만으로 train_model.fit_model을 다시 학습해 쓴다 (구간 크기만큼씩 재학습하는
+워크포워드). 학습할 회차가 min_history 이하인 구간은 앱처럼 균등 가중치를 쓴다.
+
+    python backtest.py --tickets 1000 --workers 8 --output backtest_report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import app
+import train_model
+
+STATISTICAL_MODEL_NAME = '통계분석 모델'
+
+
+def fit_walk_forward_model(store, rows, min_history=100, l2=1.0):
+    """앞 rows개 회차만으로 통계분석 모델 학습. 학습 샘플이 없으면 None (균등 가중치)"""
+    if rows <= min_history:
+        return None
+    prefix = app.DrawStore(store.rounds[:rows], store.dates[:rows], store.numbers[:rows], store.bonus[:rows])
+    X, y, _ = train_model.build_training_set(prefix, min_history)
+    coef, intercept, mean, scale = train_model.fit_model(X, y, l2)
+    latest_round = prefix.latest_round
+    return app.StatisticalModel(f'walk-forward:{latest_round}', coef, intercept, mean, scale, None, {}, '',
+                                latest_round=latest_round)
+
+
+def backtest_chunk(start_round, end_round, model_names, tickets_per_round, seed, min_history=100, l2=1.0):
+    """[start_round, end_round] 구간 백테스트 (워커 프로세스)
+
+    반환: (평가 회차 수, 모델별 등수 카운트, 통계분석 모델이 균등 가중치였던 회차 수)
+    """
+    store = app.current_dataset().store
+    start_row = store.row_of(start_round)
+
+    rng = app.request_rng(seed)
+    engine = app.AnalysisEngine(app.DrawStore(
+        store.rounds[:start_row], store.dates[:start_row], store.numbers[:start_row], store.bonus[:start_row]
+    ))
+    statistical_model = None
+    if STATISTICAL_MODEL_NAME in model_names:
+        statistical_model = fit_walk_forward_model(store, start_row, min_history, l2)
+
+    tier_counts = {name: np.zeros(len(app.PRIZE_TIERS), dtype=np.int64) for name in model_names}
+    rounds = 0
+
+    for row in range(start_row, store.row_of(end_round) + 1):
+        draw_numbers = store.numbers[row]
+        draw_mask = app.numbers_to_masks(draw_numbers)
+        bonus_mask = np.uint64(1) << np.uint64(store.bonus[row])
+
+        for name in model_names:
+            tickets = app.generate_ticket_batch(name, [], tickets_per_round, engine=engine, rng=rng,
+                                                statistical_model=statistical_model)
+            tiers = app.prize_tiers(app.numbers_to_masks(tickets), draw_mask, bonus_mask)
+            tier_counts[name] += np.bincount(tiers[tiers >= 0], minlength=len(app.PRIZE_TIERS))
+
+        # 다음 회차 예측을 위해 이번 회차를 증분 반영
+        engine.append_draw(int(store.rounds[row]), store.dates[row], draw_numbers, int(store.bonus[row]))
+        rounds += 1
+
+    uniform_rounds = rounds if STATISTICAL_MODEL_NAME in model_names and statistical_model is None else 0
+    return rounds, {name: counts.tolist() for name, counts in tier_counts.items()}, uniform_rounds
+
+
+def run_backtest(model_names=None, tickets_per_round=1000, start_round=2, end_round=None,
+                 workers=None, seed=0, chunk_size=50, min_history=100, l2=1.0):
+    """워크포워드 백테스트 실행 후 보고서 딕셔너리 반환"""
+    store = app.current_dataset().store
+    model_names = model_names or app.DEFAULT_MODEL_NAMES
+    first_round = int(store.rounds[0])
+    start_round = max(start_round, first_round + 1)
+    end_round = min(end_round or store.latest_round, store.latest_round)
+    if start_round > end_round:
+        raise ValueError(f"백테스트 구간이 비어 있습니다: {start_round} > {end_round}")
+
+    chunks = []
+    for i, chunk_start in enumerate(range(start_round, end_round + 1, chunk_size)):
+        chunk_end = min(chunk_start + chunk_size - 1, end_round)
+        chunks.append((chunk_start, chunk_end, model_names, tickets_per_round, seed + i, min_history, l2))
+
+    started = time.perf_counter()
+    total_rounds = 0
+    uniform_rounds = 0
+    totals = {name: np.zeros(len(app.PRIZE_TIERS), dtype=np.int64) for name in model_names}
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for rounds, tier_counts, chunk_uniform_rounds in pool.map(backtest_chunk, *zip(*chunks)):
+            total_rounds += rounds
+            uniform_rounds += chunk_uniform_rounds
+            for name, counts in tier_counts.items():
+                totals[name] += counts
+
+    total_tickets = total_rounds * tickets_per_round
+    report = {
+        'start_round': start_round,
+        'end_round': end_round,
+        'rounds': total_rounds,
+        'tickets_per_round': tickets_per_round,
+        'seed': seed,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+        'models': {}
+    }
+    for name, counts in totals.items():
+        report['models'][name] = {
+            'tickets': total_tickets,
+            'hits': dict(zip(app.PRIZE_TIERS, counts.tolist())),
+            'hit_rates': dict(zip(app.PRIZE_TIERS, (counts / max(total_tickets, 1)).tolist()))
+        }
+    if STATISTICAL_MODEL_NAME in report['models']:
+        report['models'][STATISTICAL_MODEL_NAME]['walk_forward'] = {
+            'refit_every_rounds': chunk_size,
+            'min_history': min_history,
+            'l2': l2,
+            'uniform_rounds': uniform_rounds
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n=== 백테스트: {report['start_round']}~{report['end_round']}회차, "
+          f"회차당 {report['tickets_per_round']}장, {report['elapsed_seconds']}초 ===")
+    print(f"{'모델':<12}" + ''.join(f"{tier:>14}" for tier in app.PRIZE_TIERS))
+    for name, result in report['models'].items():
+        cells = ''.join(
+            f"{result['hits'][tier]:>6} ({result['hit_rates'][tier]:.1e})" for tier in app.PRIZE_TIERS
+        )
+        print(f"{name:<12}{cells}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LottoPro AI 워크포워드 백테스트')
+    parser.add_argument('--models', nargs='+', choices=app.SUPPORTED_MODEL_NAMES, help='대상 모델 (기본: 5개 모델)')
+    parser.add_argument('--tickets', type=int, default=1000, help='회차·모델당 생성 티켓 수')
+    parser.add_argument('--start', type=int, default=2, help='첫 평가 회차')
+    parser.add_argument('--end', type=int, help='마지막 평가 회차 (기본: 최신 회차)')
+    parser.add_argument('--workers', type=int, help='프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=50, help='워커 작업 단위 회차 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-history', type=int, default=100, help='통계분석 모델 재학습에 필요한 최소 회차 수')
+    parser.add_argument('--l2', type=float, default=1.0, help='통계분석 모델 재학습 L2 정규화 강도')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    args = parser.parse_args(argv)
+
+    report = run_backtest(
+        model_names=args.models,
+        tickets_per_round=args.tickets,
+        start_round=args.start,
+        end_round=args.end,
+        workers=args.workers,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        min_history=args.min_history,
+        l2=args.l2
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
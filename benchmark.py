@@ -0,0 +1,227 @@
+"""LottoPro AI 성능 벤치마크
+
+합성 당첨 이력(기본 1천~10만 회차, 최대 100만 회차)을 만들어 CSV 로드/변환,
+analyze_* 분석, 모델별 generate_ai_prediction, 모든 라우트(Flask test client)의
+실행 시간을 측정하고 JSON으로 저장한다. --baseline을 주면 같은 케이스의 중앙값이
+--threshold 비율 이상 느려진 경우 실패(종료 코드 1)한다.
+
+    python benchmark.py --sizes 1000 10000 100000 1000000 --output benchmark_report.json
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+import app
+
+SYNTHETIC_START_DATE = np.datetime64('2002-12-07')
+CHECK_TICKETS = 1000
+
+# 라우트별 요청 방법 (여기 없는 인자 없는 GET 라우트는 그대로 호출)
+ROUTE_REQUESTS = {
+    '/api/predict': ('POST', {'json': {'user_numbers': [7, 13]}}),
+    '/api/predict/stream': ('GET', {'query_string': {'count': 10000, 'model': '빈도분석 모델'}}),
+    '/api/cooccurrence': ('GET', {'query_string': {'number': 7, 'top': 10}}),
+    '/api/check': ('POST', {'json': {
+        'tickets': (np.argsort(np.random.default_rng(0).random((CHECK_TICKETS, 45)), axis=1)[:, :6] + 1).tolist()
+    }}),
+}
+
+
+def write_synthetic_history(path, draws, seed=0, chunk_size=100000):
+    """draws회차 분량의 무작위 당첨 이력을 new_1196.csv와 같은 형식으로 저장"""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('round,draw date,num1,num2,num3,num4,num5,num6,bonus num\n')
+        for start in range(0, draws, chunk_size):
+            size = min(chunk_size, draws - start)
+            # 행마다 1~45의 무작위 순열 앞 7개: 번호 6개 + 보너스
+            picks = np.argsort(rng.random((size, 45)), axis=1)[:, :7] + 1
+            picks[:, :6].sort(axis=1)
+            rounds = np.arange(start + 1, start + size + 1)
+            # 추첨일은 주 단위로 증가하되 연도가 4자리를 넘지 않게 순환
+            dates = SYNTHETIC_START_DATE + 7 * ((rounds - 1) % 400000)
+            date_strings = np.char.replace(np.datetime_as_string(dates, unit='D'), '-', '.')
+            lines = [
+                f"{r},{d},{a},{b},{c},{e},{g},{h},{bonus}"
+                for r, d, (a, b, c, e, g, h, bonus) in zip(rounds.tolist(), date_strings.tolist(), picks.tolist())
+            ]
+            f.write('\n'.join(lines) + '\n')
+
+
+def measure(fn, repeat, min_time):
+    """fn을 한 번 예열 후 최대 repeat번 (min_time초가 넘고 3번 이상이면 중단) 실행해 ms 통계 반환"""
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat:
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+        if len(samples) >= 3 and time.perf_counter() - started > min_time:
+            break
+    samples.sort()
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples), 4),
+        'min_ms': round(samples[0], 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(samples), 4)
+    }
+
+
+def route_cases(client):
+    """app.url_map의 모든 라우트 → (케이스 이름, 호출 함수)"""
+    cases = []
+    for rule in sorted(app.app.url_map.iter_rules(), key=lambda r: r.rule):
+        # 관리 라우트는 데이터셋을 다시 게시하므로 측정하지 않는다
+        if rule.endpoint == 'static' or rule.arguments or rule.rule.startswith('/admin/'):
+            continue
+        method, kwargs = ROUTE_REQUESTS.get(rule.rule, ('GET', {}))
+
+        def call(rule=rule.rule, method=method, kwargs=kwargs):
+            response = client.open(rule, method=method, **kwargs)
+            response.get_data()
+            response.close()
+            # 오류 응답의 시간을 정상 경로로 착각하지 않도록
+            if not (200 <= response.status_code < 300 or response.status_code == 304):
+                raise RuntimeError(f"{method} {rule} → {response.status_code}")
+
+        cases.append((f'route {method} {rule.rule}', call))
+    return cases
+
+
+def run_size(draws, workdir, repeat, min_time, seed):
+    """한 데이터 크기에 대한 모든 케이스 측정"""
+    csv_path = os.path.join(workdir, f'synthetic_{draws}.csv')
+    write_synthetic_history(csv_path, draws, seed)
+    app.CSV_PATH = csv_path
+    app.SNAPSHOT_DIR = os.path.join(workdir, f'synthetic_{draws}.snapshot')
+
+    results = {}
+
+    def record(name, fn, runs=repeat):
+        results[name] = measure(fn, runs, min_time)
+        print(f"  {draws:>9,}  {name:<40} {results[name]['median_ms']:>12.3f} ms")
+
+    # 1) CSV 로드 / 변환
+    record('load_csv_data_completely', app.load_csv_data_completely)
+    dataframe = app.load_csv_data_completely()
+    record('convert_csv_to_sample_data', lambda: app.convert_csv_to_sample_data(dataframe))
+
+    # 2) 초기화: 첫 호출은 CSV 경로 + 스냅샷 저장, 이후는 스냅샷 경로
+    started = time.perf_counter()
+    app.initialize_data_system()
+    results['initialize_data_system (cold)'] = {'runs': 1, 'median_ms': round((time.perf_counter() - started) * 1000, 4)}
+    print(f"  {draws:>9,}  {'initialize_data_system (cold)':<40} {results['initialize_data_system (cold)']['median_ms']:>12.3f} ms")
+    record('initialize_data_system (snapshot)', app.initialize_data_system)
+
+    # 3) 분석
+    record('analyze_frequency_patterns', app.analyze_frequency_patterns)
+    record('analyze_trend_patterns', app.analyze_trend_patterns)
+    record('analyze_pattern_relationships', app.analyze_pattern_relationships)
+    record('AnalysisEngine', lambda: app.AnalysisEngine(app.current_dataset().store))
+
+    # 4) 모델별 예측 1장
+    rng = np.random.default_rng(seed)
+    for model_name in app.DEFAULT_MODEL_NAMES:
+        record(f'generate_ai_prediction {model_name}', lambda m=model_name: app.generate_ai_prediction(m, [], rng=rng))
+
+    # 5) 라우트
+    client = app.app.test_client()
+    for name, call in route_cases(client):
+        record(name, call)
+
+    return results
+
+
+def compare_with_baseline(report, baseline, threshold, min_delta_ms):
+    """중앙값이 baseline 대비 threshold 비율 + min_delta_ms 이상 느려진 케이스 목록"""
+    regressions = []
+    for size, cases in report['results'].items():
+        for name, result in cases.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if not base:
+                continue
+            current_ms, base_ms = result['median_ms'], base['median_ms']
+            if current_ms > base_ms * (1 + threshold) and current_ms - base_ms > min_delta_ms:
+                regressions.append({
+                    'draws': size,
+                    'case': name,
+                    'baseline_ms': base_ms,
+                    'current_ms': current_ms,
+                    'ratio': round(current_ms / base_ms, 3) if base_ms else None
+                })
+    return regressions
+
+
+def run_benchmark(sizes, repeat=20, min_time=1.0, seed=0, workdir=None):
+    """크기별 벤치마크 실행 후 보고서 딕셔너리 반환"""
+    # 측정 중에는 로그 출력과 예측 프로세스 풀을 끄고 연산 자체만 잰다
+    app.LOG_LEVEL_NO = logging.WARNING
+    app.prediction_executor.workers = 0
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'seed': seed,
+        'results': {}
+    }
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for draws in sizes:
+            print(f"=== {draws:,}회차 ===")
+            report['results'][str(draws)] = run_size(draws, tmp, repeat, min_time, seed)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LottoPro AI 성능 벤치마크')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000], help='합성 이력 회차 수 목록')
+    parser.add_argument('--repeat', type=int, default=20, help='케이스당 최대 반복 횟수')
+    parser.add_argument('--min-time', type=float, default=1.0, help='케이스당 최소 측정 시간 (초)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='합성 CSV / 스냅샷 임시 디렉터리 위치')
+    parser.add_argument('--output', help='JSON 결과 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.25, help='허용 지연 증가 비율 (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='이보다 작은 차이는 회귀로 보지 않음 (ms)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sizes, args.repeat, args.min_time, args.seed, args.workdir)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.threshold, args.min_delta_ms)
+        report['baseline'] = {'path': args.baseline, 'threshold': args.threshold, 'regressions': regressions}
+        if regressions:
+            status = 1
+            print(f"\n❌ 성능 회귀 {len(regressions)}건 (임계값 {args.threshold:.0%})")
+            for r in regressions:
+                print(f"  {int(r['draws']):>9,}  {r['case']:<40} {r['baseline_ms']:.3f} → {r['current_ms']:.3f} ms (x{r['ratio']})")
+        else:
+            print(f"\n✅ 기준 대비 회귀 없음 (임계값 {args.threshold:.0%})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
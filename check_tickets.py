@@ -0,0 +1,70 @@
+"""LottoPro AI 티켓 대량 당첨 확인
+
+티켓 파일(한 줄에 "1,2,3,4,5,6", 첫 줄 헤더 허용 / 또는 JSON 배열)을 읽어
+한 회차 또는 전체 이력과 대조하고 등수별 당첨 수를 출력한다.
+
+    python check_tickets.py tickets.csv
+    python check_tickets.py tickets.csv --round 1196 --output check_report.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import app
+
+
+def load_ticket_file(path):
+    """티켓 파일 → (T, 6) 배열 (JSON 배열 또는 줄 단위 텍스트)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return app.parse_tickets(json.loads(text))
+    return app.parse_tickets(text)
+
+
+def print_report(report):
+    if 'round' in report:
+        draw = report['draw']
+        print(f"\n=== {report['round']}회차 ({draw['draw_date']}) {draw['numbers']} + {draw['bonus']}: "
+              f"티켓 {report['tickets']:,}장 ===")
+    else:
+        print(f"\n=== 전체 이력 {report['from_round']}~{report['to_round']}회차: 티켓 {report['tickets']:,}장, "
+              f"{report['elapsed_seconds']}초 ===")
+    for tier, count in report['hits'].items():
+        print(f"{tier:>4} {count:>12,}")
+    for hit in report.get('top_hits', [])[:20]:
+        print(f"  {hit['tier']}: 티켓 #{hit['ticket'] + 1}, {hit['round']}회차")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LottoPro AI 티켓 대량 당첨 확인')
+    parser.add_argument('tickets', help='티켓 파일 (CSV/텍스트 또는 JSON)')
+    parser.add_argument('--round', type=int, help='대조할 회차 (기본: 전체 이력)')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    args = parser.parse_args(argv)
+
+    try:
+        tickets = load_ticket_file(args.tickets)
+    except ValueError as e:
+        print(f"티켓 파일 오류: {e}", file=sys.stderr)
+        return 2
+
+    if args.round is not None and app.current_dataset().store.row_of(args.round) < 0:
+        print(f"{args.round}회차 데이터가 없습니다", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    report = app.check_tickets(tickets, args.round)
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""LottoPro AI gunicorn 설정 - 공유 메모리 멀티 워커 모드
+
+마스터가 app 모듈을 미리 로드(preload_app)해서 데이터 시스템을 한 번만
+초기화하고, 당첨번호 배열을 multiprocessing.shared_memory 블록으로 옮긴 뒤
+워커를 fork 한다. 각 워커는 그 블록에 읽기 전용으로 연결하므로 워커 수를
+늘려도 이력 데이터는 메모리에 한 벌만 유지된다.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+환경 변수:
+    PORT              바인딩 포트 (기본 5000)
+    WEB_CONCURRENCY   워커 프로세스 수 (기본 4)
+    GUNICORN_THREADS  워커당 스레드 수 (기본 4)
+
+워커마다 데이터셋 감시 스레드가 CSV / 리로드 트리거 파일을 확인해 새 데이터셋을
+게시하므로, CSV를 교체하거나 /admin/reload를 호출하면 재시작 없이 모든 워커가
+DATASET_WATCH_INTERVAL초 안에 새 버전을 사용한다.
+
+지표는 워커마다 METRICS_DIR(지정하지 않으면 임시 디렉터리)에 자기 합계 파일을
+METRICS_FLUSH_INTERVAL초마다 쓰고, /metrics는 어느 워커가 응답하든 모든 파일을
+합쳐 내보낸다.
+"""
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# 마스터에서 app 모듈을 한 번만 import → initialize_data_system()도 한 번만 실행
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+
+# 요청 처리는 대부분 짧은 NumPy 연산이므로 스레드 워커로 동시성 확보
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+timeout = 30
+graceful_timeout = 30
+
+# app 모듈을 preload하기 전에 정해야 모든 프로세스가 같은 지표 디렉터리를 쓴다
+_metrics_tmpdir = None
+if not os.environ.get('METRICS_DIR'):
+    _metrics_tmpdir = tempfile.mkdtemp(prefix='lottopro-metrics-')
+    os.environ['METRICS_DIR'] = _metrics_tmpdir
+
+
+def when_ready(server):
+    """preload 이후, 워커 fork 직전 (마스터 프로세스)"""
+    import app
+    app.publish_shared_dataset()
+    # 이전 실행의 지표 파일을 지우고, preload 중 기록된 지표는 마스터 파일에 한 번만 남긴다
+    app.metrics.clear_directory()
+    app.metrics.flush(include_gauges=False)
+
+
+def post_fork(server, worker):
+    """fork 직후 (워커 프로세스)"""
+    import app
+    # 예측 프로세스 풀은 스레드(지표 기록, 감시, 로그 출력)가 생기기 전에 fork한다
+    app.prediction_executor.start()
+    # 마스터에서 복제된 지표는 마스터 파일에 이미 있으므로 버린다 (워커 수만큼 중복 집계 방지)
+    app.metrics.reset()
+    app.metrics.start_flusher(app.METRICS_FLUSH_INTERVAL)
+    app.attach_shared_dataset()
+    app.dataset_watcher.start()
+
+
+def worker_exit(server, worker):
+    """워커 종료 직전 (워커 프로세스): 마지막 합계를 파일에 남김"""
+    import app
+    app.metrics.flush()
+
+
+def on_exit(server):
+    """마스터 종료 (마스터 프로세스)"""
+    import app
+    app.release_shared_dataset()
+    if _metrics_tmpdir:
+        shutil.rmtree(_metrics_tmpdir, ignore_errors=True)
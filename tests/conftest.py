@@ -0,0 +1,36 @@
+"""테스트 공통 설정
+
+app 모듈은 import 시 CSV_PATH(상대 경로)로 데이터 시스템을 초기화하므로
+저장소 루트를 작업 디렉터리와 import 경로로 잡는다.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('PREDICTION_POOL_WORKERS', '0')
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(1234)
+
+
+@pytest.fixture
+def random_draws():
+    """무작위 당첨번호 (count, 6)와 보너스 (count,)를 만드는 함수"""
+    def make(rng, count):
+        picks = np.argsort(rng.random((count, 45)), axis=1)[:, :7] + 1
+        return np.sort(picks[:, :6], axis=1).astype(np.uint8), picks[:, 6].astype(np.uint8)
+    return make
+
+
+@pytest.fixture
+def client():
+    import app
+    return app.app.test_client()
@@ -0,0 +1,71 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+import app
+
+
+def alias_distribution(prob, alias):
+    """별칭 표가 나타내는 번호별 확률 (칸 선택 1/n × 칸 안 동전)"""
+    size = len(prob)
+    mass = prob / size
+    np.add.at(mass, alias, (1 - prob) / size)
+    return mass
+
+
+@pytest.mark.parametrize('fixed', [(), (1,), (5, 17, 44)])
+def test_alias_table_reproduces_weights(rng, fixed):
+    weights = rng.gamma(0.5, size=45)
+    weights[[9, 30]] = 0.0
+    prob, alias, support = app.build_alias_table(weights.tobytes(), fixed)
+
+    expected = weights.copy()
+    expected[np.asarray(fixed, dtype=np.intp) - 1] = 0.0
+    np.testing.assert_allclose(alias_distribution(prob, alias), expected / expected.sum(), atol=1e-12)
+    assert support == np.count_nonzero(expected)
+
+
+def test_alias_sample_frequencies(rng):
+    weights = np.arange(1, 46, dtype=np.float64)
+    prob, alias, _ = app.build_alias_table(weights.tobytes())
+    draws = app.alias_sample(prob, alias, 450000, rng)
+    frequencies = np.bincount(draws, minlength=46)[1:] / len(draws)
+    np.testing.assert_allclose(frequencies, weights / weights.sum(), atol=0.002)
+
+
+def test_weighted_tickets_are_valid_and_keep_fixed_numbers(rng):
+    weights = np.ones(45)
+    weights[40:] = 0.0
+    tickets = app.sample_weighted_tickets(weights, [3, 12], 5000, rng)
+
+    assert tickets.shape == (5000, 6)
+    assert (np.diff(tickets, axis=1) > 0).all()
+    assert all({3, 12} <= set(t) for t in tickets.tolist())
+    assert tickets.max() <= 40
+
+
+def test_weighted_tickets_match_sequential_sampling(rng):
+    # 양수 가중치 번호 7개: 순차 비복원 추출의 번호별 포함 확률과 비교
+    weights = np.zeros(45)
+    weights[:7] = [1, 2, 3, 4, 5, 6, 7]
+    tickets = app.sample_weighted_tickets(weights, [], 60000, rng)
+    observed = np.bincount(tickets.ravel(), minlength=46)[1:8] / len(tickets)
+
+    # 7개 중 6개 = 빠지는 번호 1개. 마지막까지 남을 확률을 순열 전체로 계산
+    w = weights[:7]
+    excluded = np.zeros(7)
+    for order in permutations(range(7)):
+        p, remaining = 1.0, w.sum()
+        for i in order[:6]:
+            p *= w[i] / remaining
+            remaining -= w[i]
+        excluded[order[6]] += p
+    np.testing.assert_allclose(observed, 1 - excluded, atol=0.01)
+
+
+def test_too_few_positive_weights_raises(rng):
+    weights = np.zeros(45)
+    weights[:5] = 1.0
+    with pytest.raises(ValueError):
+        app.sample_weighted_tickets(weights, [], 1, rng)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def reference_tier(ticket, numbers, bonus):
+    """집합 연산으로 계산한 등수 인덱스 (0=1등 … 4=5등, -1=낙첨)"""
+    matched = len(set(ticket) & set(numbers))
+    if matched == 6:
+        return 0
+    if matched == 5:
+        return 1 if bonus in ticket else 2
+    return {4: 3, 3: 4}.get(matched, -1)
+
+
+def make_store(numbers, bonus):
+    rounds = np.arange(1, len(numbers) + 1)
+    return app.DrawStore(rounds, [f'd{r}' for r in rounds], numbers, bonus)
+
+
+def test_popcount_matches_python(rng):
+    masks = rng.integers(0, np.iinfo(np.int64).max, size=1000, dtype=np.int64).astype(np.uint64) << np.uint64(1)
+    expected = [bin(int(m)).count('1') for m in masks]
+    np.testing.assert_array_equal(app.popcount64(masks), expected)
+    np.testing.assert_array_equal(
+        app._POPCOUNT_TABLE[masks.view(np.uint8).reshape(-1, 8)].sum(axis=1), expected
+    )
+
+
+def test_prize_tiers_match_set_reference(rng, random_draws):
+    draw = [3, 11, 19, 27, 35, 43]
+    bonus = 7
+    tickets, _ = random_draws(rng, 3000)
+    # 1~3등과 2등이 확실히 포함되도록 당첨번호를 섞은 티켓 추가
+    tickets = np.concatenate([tickets, [draw, [3, 11, 19, 27, 35, 7], [3, 11, 19, 27, 35, 8], [3, 11, 19, 27, 1, 2]]])
+
+    tiers = app.prize_tiers(app.numbers_to_masks(tickets), app.numbers_to_masks(draw), np.uint64(1) << np.uint64(bonus))
+    expected = [reference_tier(t, draw, bonus) for t in tickets.tolist()]
+    np.testing.assert_array_equal(tiers, expected)
+    assert tiers[-4:].tolist() == [0, 1, 2, 3]
+
+
+def test_check_all_rounds_matches_per_round_loop(rng, random_draws):
+    numbers, bonus = random_draws(rng, 40)
+    store = make_store(numbers, bonus)
+    tickets, _ = random_draws(rng, 5000)
+    # 같은 조합과 5개+보너스 조합을 섞어 1~3등 목록도 검증
+    tickets[10] = numbers[4]
+    tickets[20] = np.sort(np.append(numbers[7][:5], bonus[7]))
+
+    result = app.check_tickets(tickets, store=store)
+
+    hits = np.zeros(5, dtype=np.int64)
+    top = []
+    for d in range(len(store)):
+        for t, ticket in enumerate(tickets.tolist()):
+            tier = reference_tier(ticket, numbers[d].tolist(), int(bonus[d]))
+            if tier >= 0:
+                hits[tier] += 1
+                if tier <= 2:
+                    top.append((tier, t, d))
+    assert result['hits'] == dict(zip(app.PRIZE_TIERS, hits.tolist()))
+    assert result['top_hits'] == [
+        {'ticket': t, 'round': d + 1, 'tier': app.PRIZE_TIERS[tier]} for tier, t, d in sorted(top)
+    ]
+    assert {'ticket': 10, 'round': 5, 'tier': '1등'} in result['top_hits']
+    assert {'ticket': 20, 'round': 8, 'tier': '2등'} in result['top_hits']
+
+
+def test_check_single_round():
+    store = make_store([[1, 2, 3, 4, 5, 6]], [7])
+    result = app.check_tickets(np.array([[1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 7], [10, 11, 12, 13, 14, 15]]), 1, store)
+    assert result['tiers'] == [1, 2, 0]
+    assert result['hits'] == {'1등': 1, '2등': 1, '3등': 0, '4등': 0, '5등': 0}
+    with pytest.raises(KeyError):
+        app.check_tickets(np.array([[1, 2, 3, 4, 5, 6]]), 2, store)
+
+
+@pytest.mark.parametrize('value', [[], [[1, 2, 3, 4, 5]], [[1, 2, 3, 4, 5, 5]], [[0, 2, 3, 4, 5, 6]], [['a', 2, 3, 4, 5, 6]]])
+def test_parse_tickets_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        app.parse_tickets(value)
+
+
+def test_parse_tickets_text_with_header():
+    tickets = app.parse_tickets("n1,n2,n3,n4,n5,n6\n6, 5,4,3,2,1\n\n45,1,2,3,4,5\n")
+    assert tickets.tolist() == [[1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 45]]
@@ -0,0 +1,61 @@
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+import app
+
+
+def test_rank_bounds():
+    assert app.COMBINATION_COUNT == comb(45, 6)
+    assert int(app.rank_tickets([1, 2, 3, 4, 5, 6])) == 0
+    assert int(app.rank_tickets([40, 41, 42, 43, 44, 45])) == app.COMBINATION_COUNT - 1
+
+
+def test_unrank_is_inverse_and_ordered():
+    ranks = np.arange(0, 300000)
+    tickets = app.unrank_tickets(ranks)
+
+    assert (np.diff(tickets, axis=1) > 0).all()
+    assert tickets.min() >= 1 and tickets.max() <= 45
+    np.testing.assert_array_equal(app.rank_tickets(tickets), ranks)
+
+
+def test_rank_matches_colex_enumeration():
+    # colex 순서: 가장 큰 번호부터 비교한 사전식 순서
+    small = sorted(combinations(range(1, 11), 6), key=lambda t: t[::-1])
+    np.testing.assert_array_equal(app.rank_tickets(np.array(small)), np.arange(len(small)))
+
+
+def test_round_trip_random_ranks(rng):
+    ranks = rng.integers(0, app.COMBINATION_COUNT, size=100000)
+    np.testing.assert_array_equal(app.rank_tickets(app.unrank_tickets(ranks)), ranks)
+    assert app.unrank_tickets(np.uint32(app.COMBINATION_COUNT - 1)).tolist() == [40, 41, 42, 43, 44, 45]
+
+
+def test_dedupe_keeps_first_occurrence_order():
+    tickets = np.array([
+        [6, 5, 4, 3, 2, 1],
+        [7, 8, 9, 10, 11, 12],
+        [1, 2, 3, 4, 5, 6],
+        [40, 41, 42, 43, 44, 45],
+        [12, 11, 10, 9, 8, 7],
+    ])
+    np.testing.assert_array_equal(app.dedupe_tickets(tickets), tickets[[0, 1, 3]])
+
+
+def test_winning_index_appends_match_constructor(rng, random_draws):
+    numbers, _ = random_draws(rng, 2000)
+    numbers[1500:1600] = numbers[:100]
+
+    index = app.WinningCombinationIndex(numbers[:10])
+    for draw in numbers[10:]:
+        index.add_draw(draw[::-1])
+    expected = app.WinningCombinationIndex(numbers)
+
+    np.testing.assert_array_equal(index.sorted_ranks, expected.sorted_ranks)
+    np.testing.assert_array_equal(index.bitset, expected.bitset)
+    assert all(index.has_won(draw) for draw in numbers)
+
+    unseen = np.setdiff1d(rng.integers(0, app.COMBINATION_COUNT, size=1000), expected.sorted_ranks)
+    assert not index.contains_ranks(unseen).any()
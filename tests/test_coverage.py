@@ -0,0 +1,53 @@
+import time
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import app
+
+
+def pair_coverage(tickets):
+    return len({pair for row in np.asarray(tickets).tolist() for pair in combinations(row, 2)})
+
+
+def candidate_pool(rng, size):
+    return np.sort(np.argsort(rng.random((size, 45)), axis=1)[:, :6] + 1, axis=1)
+
+
+@pytest.mark.parametrize('count', [10, 100, 400])
+def test_coverage_beats_independent_tickets(rng, count):
+    candidates = candidate_pool(rng, max(2000, count * 8))
+    chosen = app.optimize_ticket_coverage(candidates, np.ones(45), count)
+
+    assert chosen.shape == (count, 6)
+    assert len({tuple(row) for row in chosen.tolist()}) == count
+    assert pair_coverage(chosen) >= pair_coverage(candidates[:count])
+
+
+@pytest.mark.parametrize('count', [100, 400])
+def test_expired_deadline_is_no_worse_than_independent(rng, count):
+    """시간 예산을 넘겨도 남은 자리는 무작위 후보로 채우므로 독립 추출보다 나빠지지 않는다"""
+    candidates = candidate_pool(rng, max(2000, count * 8))
+    chosen = app.optimize_ticket_coverage(candidates, np.ones(45), count, deadline=time.perf_counter())
+
+    assert len({tuple(row) for row in chosen.tolist()}) == count
+    assert pair_coverage(chosen) >= pair_coverage(candidates[:count]) - 5
+
+
+def test_all_pairs_covered_then_remainder_filled(rng):
+    candidates = candidate_pool(rng, 4000)
+    chosen = app.optimize_ticket_coverage(candidates, np.ones(45), 500)
+
+    assert pair_coverage(chosen) == 990
+    assert len({tuple(row) for row in chosen.tolist()}) == 500
+
+
+def test_seeded_coverage_ignores_time_budget(monkeypatch):
+    monkeypatch.setattr(app, 'COVERAGE_TIME_BUDGET_SECONDS', 1e-9)
+    names = ['빈도분석 모델']
+    first = app.compute_prediction_models(names, [], app.request_rng(7), None, 'coverage', 300)
+    second = app.compute_prediction_models(names, [], app.request_rng(7), None, 'coverage', 300)
+
+    assert first == second
+    assert pair_coverage(first[0]['빈도분석 모델']['predictions']) == 990
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def test_rows_sorted_by_round_and_numbers(rng):
+    store = app.DrawStore([3, 1, 2], ['c', 'a', 'b'], [[6, 5, 4, 3, 2, 1], [1, 2, 3, 4, 5, 6], [45, 1, 30, 2, 10, 7]], [7, 8, 9])
+
+    assert store.rounds.tolist() == [1, 2, 3]
+    assert store.dates.tolist() == ['a', 'b', 'c']
+    assert store.numbers[1].tolist() == [1, 2, 7, 10, 30, 45]
+    assert store.latest_round == 3
+    assert store.get_draw(2) == {'round': 2, 'draw_date': 'b', 'numbers': [1, 2, 7, 10, 30, 45], 'bonus': 9}
+    assert store.get_draw(99) is None
+    assert store.row_of(-1) == -1
+
+
+def test_append_grows_buffers_and_matches_constructor(rng, random_draws):
+    numbers, bonus = random_draws(rng, 100)
+    rounds = np.arange(1, 101)
+    dates = [f'd{r}' for r in rounds]
+
+    store = app.DrawStore(rounds[:1], dates[:1], numbers[:1], bonus[:1])
+    for i in range(1, 100):
+        store.append(int(rounds[i]), dates[i], numbers[i][::-1], int(bonus[i]))
+
+    expected = app.DrawStore(rounds, dates, numbers, bonus)
+    for name in ('rounds', 'dates', 'numbers', 'bonus'):
+        np.testing.assert_array_equal(getattr(store, name), getattr(expected, name))
+    assert store.row_of(57) == 56
+    np.testing.assert_array_equal(store.last(3), numbers[-3:])
+
+
+def test_append_rejects_non_increasing_round():
+    store = app.DrawStore([5], ['d'], [[1, 2, 3, 4, 5, 6]], [7])
+    with pytest.raises(ValueError):
+        store.append(5, 'd', [1, 2, 3, 4, 5, 6], 7)
+
+
+def test_from_lines_skips_bad_rows():
+    store = app.DrawStore.from_lines([
+        '2,2002.12.14,9,13,21,25,32,42,2',
+        'not,a,valid,row,x,x,x,x,x',
+        '1,2002.12.07,10,23,29,33,37,40,16',
+    ])
+    assert store.rounds.tolist() == [1, 2]
+    assert store.get_draw(1)['numbers'] == [10, 23, 29, 33, 37, 40]
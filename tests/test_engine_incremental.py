@@ -0,0 +1,148 @@
+"""AnalysisEngine.append_draw 증분 갱신 == 처음부터 다시 만든 엔진"""
+import numpy as np
+import pytest
+
+import app
+
+
+def make_store(numbers, bonus, first_round=1):
+    rounds = np.arange(first_round, first_round + len(numbers))
+    return app.DrawStore(rounds, [f'd{r}' for r in rounds], numbers, bonus)
+
+
+def trimmed_histogram(histogram):
+    """폭(여유 열)만 다른 히스토그램을 비교할 수 있게 뒤쪽 0열 제거"""
+    used = np.flatnonzero(histogram.any(axis=0))
+    return histogram[:, :used[-1] + 1 if len(used) else 0]
+
+
+def assert_engines_equal(engine, expected):
+    np.testing.assert_array_equal(engine.store.numbers, expected.store.numbers)
+    np.testing.assert_array_equal(engine.frequency_counts, expected.frequency_counts)
+    np.testing.assert_array_equal(engine.trend_counts, expected.trend_counts)
+    np.testing.assert_array_equal(engine.even_histogram, expected.even_histogram)
+    for name in ('consecutive_total', 'sum_total', 'sum_sq_total', 'even_total', 'sum_min', 'sum_max'):
+        assert getattr(engine, name) == getattr(expected, name), name
+
+    np.testing.assert_equal(engine.frequency_analysis(), expected.frequency_analysis())
+    np.testing.assert_equal(engine.trend_analysis(), expected.trend_analysis())
+    np.testing.assert_equal(engine.pattern_analysis(), expected.pattern_analysis())
+
+    np.testing.assert_array_equal(engine.cooccurrence.pair_counts, expected.cooccurrence.pair_counts)
+    np.testing.assert_array_equal(engine.cooccurrence.triple_counts, expected.cooccurrence.triple_counts)
+    np.testing.assert_array_equal(engine.transitions.counts, expected.transitions.counts)
+    np.testing.assert_array_equal(engine.cumulative.prefix, expected.cumulative.prefix)
+
+    for name in ('last_seen', 'gap_count', 'gap_sum', 'gap_max'):
+        np.testing.assert_array_equal(getattr(engine.gaps, name), getattr(expected.gaps, name), err_msg=name)
+    assert engine.gaps.draws == expected.gaps.draws
+    np.testing.assert_array_equal(trimmed_histogram(engine.gaps.histogram), trimmed_histogram(expected.gaps.histogram))
+    np.testing.assert_array_equal(engine.gaps.current_gaps(), expected.gaps.current_gaps())
+
+    np.testing.assert_array_equal(engine.winning_combinations.bitset, expected.winning_combinations.bitset)
+    np.testing.assert_array_equal(engine.winning_combinations.sorted_ranks, expected.winning_combinations.sorted_ranks)
+    assert all(engine.winning_combinations.has_won(ticket) for ticket in expected.store.numbers)
+    np.testing.assert_array_equal(engine.transition_weight_vector(), expected.transition_weight_vector())
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_append_matches_full_rebuild(seed, random_draws):
+    rng = np.random.default_rng(seed)
+    initial = int(rng.integers(0, 80))
+    appended = int(rng.integers(1, 120))
+    numbers, bonus = random_draws(rng, initial + appended)
+    # 가끔 같은 조합이 다시 당첨되는 경우도 포함
+    if initial and appended > 1:
+        numbers[-1] = numbers[0]
+
+    engine = app.AnalysisEngine(make_store(numbers[:initial], bonus[:initial]), trend_window=20)
+    for row in range(initial, initial + appended):
+        engine.append_draw(row + 1, f'd{row + 1}', numbers[row][rng.permutation(6)], int(bonus[row]))
+
+    expected = app.AnalysisEngine(make_store(numbers, bonus), trend_window=20)
+    assert_engines_equal(engine, expected)
+
+
+def test_append_after_snapshot_restore_matches_full_rebuild(rng, random_draws):
+    numbers, bonus = random_draws(rng, 150)
+    built = app.AnalysisEngine(make_store(numbers[:100], bonus[:100]))
+    arrays, scalars = built.state()
+    restored = app.AnalysisEngine.from_state(make_store(numbers[:100], bonus[:100]), arrays, scalars)
+
+    for row in range(100, 150):
+        restored.append_draw(row + 1, f'd{row + 1}', numbers[row], int(bonus[row]))
+
+    assert_engines_equal(restored, app.AnalysisEngine(make_store(numbers, bonus)))
+
+
+def test_window_counts_match_direct_bincount(rng, random_draws):
+    numbers, bonus = random_draws(rng, 60)
+    engine = app.AnalysisEngine(make_store(numbers[:10], bonus[:10], first_round=101))
+    for row in range(10, 60):
+        engine.append_draw(101 + row, 'd', numbers[row], int(bonus[row]))
+
+    for window in (1, 7, 60, 500):
+        counts, draws = engine.window_counts(window)
+        assert draws == min(window, 60)
+        np.testing.assert_array_equal(counts, np.bincount(numbers[60 - draws:].ravel(), minlength=46))
+
+    counts, draws = engine.window_counts(from_round=120, to_round=139)
+    assert draws == 20
+    np.testing.assert_array_equal(counts, np.bincount(numbers[19:39].ravel(), minlength=46))
+
+
+@pytest.mark.parametrize('numbers, bonus', [
+    ([1, 2, 3, 4, 5, 5], 7),
+    ([0, 2, 3, 4, 5, 6], 7),
+    ([1, 2, 3, 4, 5, 46], 7),
+    ([1, 2, 3, 4, 5, 6], 6),
+])
+def test_append_rejects_invalid_draw(numbers, bonus):
+    engine = app.AnalysisEngine(make_store([[1, 2, 3, 4, 5, 6]], [7]))
+    with pytest.raises(ValueError):
+        engine.append_draw(2, 'd', numbers, bonus)
+    assert len(engine.store) == 1
+
+
+def test_forked_versions_do_not_see_each_others_draws(rng, random_draws):
+    """fork()한 버전은 버퍼를 공유해도 서로의 append가 보이지 않는다 (형제 버전이 갈라지는 경우 포함)"""
+    numbers, bonus = random_draws(rng, 90)
+    base = app.AnalysisEngine(make_store(numbers[:30], bonus[:30]), trend_window=20)
+
+    first = base.fork()
+    for row in range(30, 60):
+        first.append_draw(row + 1, f'd{row + 1}', numbers[row], int(bonus[row]))
+    # 같은 기준 버전에서 다른 회차를 덧붙인 형제 버전
+    second = base.fork()
+    for offset, row in enumerate(range(60, 90)):
+        second.append_draw(31 + offset, f'd{31 + offset}', numbers[row], int(bonus[row]))
+    third = first.fork()
+    third.append_draw(61, 'd61', numbers[60], int(bonus[60]))
+
+    assert_engines_equal(base, app.AnalysisEngine(make_store(numbers[:30], bonus[:30]), trend_window=20))
+    assert_engines_equal(first, app.AnalysisEngine(make_store(numbers[:60], bonus[:60]), trend_window=20))
+    sibling = np.concatenate([numbers[:30], numbers[60:]]), np.concatenate([bonus[:30], bonus[60:]])
+    assert_engines_equal(second, app.AnalysisEngine(make_store(*sibling), trend_window=20))
+    assert_engines_equal(third, app.AnalysisEngine(make_store(numbers[:61], bonus[:61]), trend_window=20))
+
+    assert base.store.row_of(31) == -1 and base.store.get_draw(45) is None
+    assert first.store.get_draw(31)['numbers'] == numbers[30].tolist()
+    assert second.store.get_draw(31)['numbers'] == numbers[60].tolist()
+    assert first.store.row_of(61) == -1
+
+
+def test_detached_fork_does_not_inherit_sibling_rounds():
+    """여유 용량이 있는 버퍼에서 갈라진 형제 버전이 상대의 회차를 조회하지 못한다"""
+    store = app.DrawStore([1, 2], ['d1', 'd2'], [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]], [7, 13])
+    store.append(3, 'd3', [13, 14, 15, 16, 17, 18], 19)
+    a, b = store.fork(), store.fork()
+
+    a.append(5, 'd5', [20, 21, 22, 23, 24, 25], 26)
+    b.append(4, 'd4', [30, 31, 32, 33, 34, 35], 36)
+    b.append(6, 'd6', [40, 41, 42, 43, 44, 45], 1)
+
+    assert b.row_of(5) == -1 and b.get_draw(5) is None
+    assert b.get_draw(4)['numbers'] == [30, 31, 32, 33, 34, 35]
+    assert a.get_draw(5)['numbers'] == [20, 21, 22, 23, 24, 25]
+    assert a.row_of(4) == -1 and a.row_of(6) == -1
+    assert store.row_of(4) == -1 and store.row_of(5) == -1
@@ -0,0 +1,56 @@
+import re
+import subprocess
+import sys
+
+import app
+
+
+def sample(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_directory_mode_merges_process_files(tmp_path, monkeypatch):
+    other = app.MetricsRegistry(directory=str(tmp_path))
+    other.inc('lottopro_generate_tickets_total', (('model_type', 'A'),), 5)
+    other.observe('lottopro_generate_seconds', (('model_type', 'A'),), 0.003)
+    other.gauge('lottopro_dataset_draws', 'draws', lambda: 7)
+    # 살아 있는 다른 워커(부모 프로세스 pid)와 끝난 워커가 남긴 파일로 흉내
+    sibling, finished = app.os.getppid(), subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                                                         capture_output=True, text=True).stdout.strip()
+    for pid in (sibling, int(finished)):
+        monkeypatch.setattr(app.os, 'getpid', lambda pid=pid: pid)
+        other.flush()
+    monkeypatch.undo()
+
+    registry = app.MetricsRegistry(directory=str(tmp_path))
+    registry.describe('lottopro_generate_tickets_total', 'counter', 'tickets')
+    registry.inc('lottopro_generate_tickets_total', (('model_type', 'A'),), 2)
+    registry.observe('lottopro_generate_seconds', (('model_type', 'A'),), 0.02)
+    registry.gauge('lottopro_dataset_draws', 'draws', lambda: 9)
+    text = registry.render()
+
+    assert sample(text, 'lottopro_generate_tickets_total{model_type="A"}') == 12
+    assert sample(text, 'lottopro_generate_seconds_count{model_type="A"}') == 3
+    assert sample(text, 'lottopro_generate_seconds_bucket{model_type="A",le="0.005"}') == 2
+    assert sample(text, f'lottopro_dataset_draws{{pid="{app.os.getpid()}"}}') == 9
+    # 게이지는 살아 있는 프로세스 것만 (끝난 워커의 카운터는 합계에 남음)
+    assert sample(text, f'lottopro_dataset_draws{{pid="{sibling}"}}') == 7
+    assert sample(text, f'lottopro_dataset_draws{{pid="{finished}"}}') is None
+
+
+def test_reset_drops_inherited_records(tmp_path):
+    registry = app.MetricsRegistry(directory=str(tmp_path))
+    registry.inc('x_total', (), 3)
+    registry.reset()
+    registry.inc('x_total', (), 1)
+    assert sample(registry.render(), 'x_total') == 1
+
+
+def test_local_mode_renders_without_directory():
+    registry = app.MetricsRegistry()
+    registry.inc('x_total', (('a', 'b'),), 2)
+    registry.gauge('g', 'gauge', lambda: [((('state', 'active'),), 3)])
+    text = registry.render()
+    assert sample(text, 'x_total{a="b"}') == 2
+    assert sample(text, 'g{state="active"}') == 3
@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+import app
+
+
+def slow_square(value, seconds):
+    time.sleep(seconds)
+    return value * value
+
+
+def run(executor, *args, timeout):
+    executor.acquire()
+    try:
+        return executor.call(slow_square, *args, timeout=timeout)
+    finally:
+        executor.release()
+
+
+def wait_until(predicate, limit=5.0):
+    deadline = time.monotonic() + limit
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_timed_out_work_keeps_its_slot_until_it_finishes():
+    executor = app.PredictionExecutor(workers=1, queue_size=1)
+    assert run(executor, 3, 0, timeout=5) == 9
+
+    # 워커 1개를 붙잡은 작업이 마감 초과 → 끝날 때까지 슬롯을 계속 차지
+    with pytest.raises(FutureTimeoutError):
+        run(executor, 1, 0.6, timeout=0.05)
+    stats = executor.stats()
+    assert stats['abandoned'] == 1 and stats['active'] == 1
+
+    # 워커가 모두 포기한 작업을 실행 중이므로 새 요청은 504가 아니라 즉시 503
+    with pytest.raises(app.PredictionPoolSaturated):
+        executor.acquire()
+    assert executor.stats()['rejected'] == 1
+
+    wait_until(lambda: executor.stats()['abandoned'] == 0)
+    assert run(executor, 4, 0, timeout=5) == 16
+    assert executor.stats()['active'] == 0
+
+
+def test_abandoned_work_counts_against_capacity():
+    executor = app.PredictionExecutor(workers=2, queue_size=0)
+    with pytest.raises(FutureTimeoutError):
+        run(executor, 1, 0.6, timeout=0.05)
+
+    executor.acquire()
+    with pytest.raises(app.PredictionPoolSaturated):
+        executor.acquire()
+    executor.release()
+
+    wait_until(lambda: executor.stats()['abandoned'] == 0)
+    executor.acquire()
+    executor.acquire()
+    executor.release()
+    executor.release()
+
+
+def test_inline_executor_still_limits_concurrency():
+    executor = app.PredictionExecutor(workers=0, queue_size=1)
+    executor.acquire()
+    executor.acquire()
+    with pytest.raises(app.PredictionPoolSaturated):
+        executor.acquire()
+    executor.release()
+    assert executor.call(slow_square, 5, 0) == 25
+
+
+def worker_dataset_version():
+    return app.active_dataset.version, app.active_dataset.store.latest_round
+
+
+def test_workers_follow_dataset_versions_without_refork(monkeypatch):
+    """풀은 한 번만 만들고, 작업과 함께 보낸 데이터셋 참조로 워커가 새 회차를 따라온다"""
+    base = app.current_dataset()
+    executor = app.PredictionExecutor(workers=1, queue_size=0)
+    executor.start()
+    pool = executor._pool
+    assert executor.call(worker_dataset_version, timeout=30) == (base.version, base.store.latest_round)
+
+    latest = base.store.latest_round
+    appended = base.append_draws([(latest + 1, '2099-01-01', [1, 2, 3, 4, 5, 6], 7)])
+    monkeypatch.setattr(app, 'active_dataset', appended)
+    assert executor.call(worker_dataset_version, timeout=30) == (appended.version, latest + 1)
+    assert executor._pool is pool
+    assert base.store.latest_round == latest
@@ -0,0 +1,72 @@
+import numpy as np
+
+import app
+
+
+def test_window_stats_include_numbers_that_never_appeared(client):
+    dataset = app.current_dataset()
+    recent = dataset.store.numbers[-3:]
+    expected = np.bincount(recent.ravel(), minlength=46)[1:]
+
+    response = client.get('/api/stats?window=3')
+    payload = response.get_json()
+
+    assert response.status_code == 200 and payload['total_draws'] == 3
+    assert len(payload['frequency']) == 45
+    assert [payload['frequency'][str(n)] for n in range(1, 46)] == expected.tolist()
+    # 한 번도 안 나온 번호(31개 이상)가 가장 차가운 번호다
+    assert [count for _, count in payload['cold_numbers']] == [0] * 10
+    assert [number for number, _ in payload['cold_numbers']] == (np.flatnonzero(expected == 0)[:10] + 1).tolist()
+    assert payload['hot_numbers'][0][1] == expected.max()
+
+
+def test_readyz_waits_for_cache_warmup(client, monkeypatch):
+    monkeypatch.setattr(app, 'warmed_version', None)
+    response = client.get('/readyz')
+    assert response.status_code == 503 and response.get_json()['status'] == 'starting'
+
+    monkeypatch.setattr(app, 'warmed_version', app.current_dataset().version)
+    assert client.get('/readyz').status_code == 200
+
+
+def test_cached_response_revalidates_with_etag(client):
+    first = client.get('/api/stats')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag
+
+    second = client.get('/api/stats', headers={'If-None-Match': etag})
+    assert second.status_code == 304 and second.data == b''
+    assert second.headers['ETag'] == etag
+    assert client.get('/api/stats', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_admin_reload_requires_token(client, monkeypatch):
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', '')
+    assert client.post('/admin/reload').status_code == 404
+
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    assert client.post('/admin/reload').status_code == 401
+    assert client.post('/admin/reload', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+
+def test_admin_reload_refuses_shrink_unless_forced(client, monkeypatch, tmp_path):
+    """CSV보다 긴 데이터셋이 게시돼 있으면 409로 유지하고, ?force=1이면 CSV로 되돌린다"""
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(app, 'RELOAD_TRIGGER_PATH', str(tmp_path / 'reload.trigger'))
+    monkeypatch.setattr(app, 'warmed_version', app.warmed_version)
+    base = app.current_dataset()
+    latest = base.store.latest_round
+    longer = base.append_draws([(latest + 1, '2099-01-01', [1, 2, 3, 4, 5, 6], 7)])
+    monkeypatch.setattr(app, 'active_dataset', longer)
+    headers = {'X-Admin-Token': 'secret'}
+
+    response = client.post('/admin/reload', headers=headers)
+    assert response.status_code == 409
+    assert response.get_json()['result'] == 'shrink'
+    assert app.active_dataset is longer
+
+    response = client.post('/admin/reload?force=1', headers=headers)
+    payload = response.get_json()
+    assert response.status_code == 200 and payload['result'] == 'published'
+    assert payload['previous_version'] == longer.version and payload['version'] == base.version
+    assert (tmp_path / 'reload.trigger').exists()
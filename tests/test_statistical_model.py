@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import app
+import backtest
+import train_model
+
+
+def make_dataset(numbers, bonus, csv_hash):
+    rounds = np.arange(1, len(numbers) + 1)
+    store = app.DrawStore(rounds, [f'd{r}' for r in rounds], numbers, bonus)
+    return app.Dataset.from_engine(app.AnalysisEngine(store), None, csv_hash)
+
+
+@pytest.fixture
+def draws(rng, random_draws):
+    return random_draws(rng, 100)
+
+
+@pytest.fixture
+def model_dir(tmp_path, draws):
+    """앞 80회차, 해시 'trained'로 학습된 아티팩트 하나가 든 디렉터리"""
+    numbers, bonus = draws
+    store = make_dataset(numbers[:80], bonus[:80], 'trained').store
+    train_model.save_artifact(train_model.train(store, 'trained', min_history=30), str(tmp_path))
+    return str(tmp_path)
+
+
+def test_loads_artifact_trained_on_current_dataset(model_dir, draws):
+    numbers, bonus = draws
+    model = app.load_statistical_model(make_dataset(numbers[:80], bonus[:80], 'trained'), model_dir)
+
+    assert model is not None
+    assert model.dataset_hash == 'trained' and model.latest_round == 80
+
+
+def test_loads_artifact_trained_on_prefix_of_longer_history(model_dir, draws, monkeypatch):
+    """CSV가 갱신돼 회차가 늘어도 앞부분이 같으면 모델을 계속 쓰고 뒤처진 회차 수를 노출한다"""
+    numbers, bonus = draws
+    dataset = make_dataset(numbers, bonus, 'updated')
+    model = app.load_statistical_model(dataset, model_dir)
+
+    assert model is not None
+    monkeypatch.setattr(app, 'active_dataset', dataset._replace(statistical_model=model))
+    assert app.statistical_model_stale_rounds() == 20
+
+
+def test_refuses_artifact_from_other_history(model_dir, draws):
+    numbers, bonus = draws
+    changed = numbers.copy()
+    changed[10] = [1, 2, 3, 4, 5, 6] if changed[10].tolist() != [1, 2, 3, 4, 5, 6] else [7, 8, 9, 10, 11, 12]
+
+    assert app.load_statistical_model(make_dataset(changed, bonus, 'edited'), model_dir) is None
+    # 학습 이력보다 짧은 이력
+    assert app.load_statistical_model(make_dataset(numbers[:60], bonus[:60], 'shorter'), model_dir) is None
+
+
+def test_weights_follow_model_of_pinned_dataset(model_dir, draws, monkeypatch):
+    """통계분석 모델은 Dataset에 담겨 데이터셋과 함께 게시된다"""
+    dataset = make_dataset(*draws, 'updated')
+    model = app.load_statistical_model(dataset, model_dir)
+
+    monkeypatch.setattr(app, 'active_dataset', dataset._replace(statistical_model=model))
+    weights = app.get_model_weights('통계분석 모델')
+    np.testing.assert_allclose(weights, model.weight_vector(dataset.engine))
+    assert not np.allclose(weights, 1.0)
+
+    monkeypatch.setattr(app, 'active_dataset', dataset._replace(statistical_model=None))
+    np.testing.assert_array_equal(app.get_model_weights('통계분석 모델'), np.ones(45))
+
+
+def test_walk_forward_model_ignores_future_rounds(draws):
+    numbers, bonus = draws
+    future = numbers.copy()
+    future[60:] = future[60:][::-1]
+    store = make_dataset(numbers, bonus, 'a').store
+    changed = make_dataset(future, bonus, 'b').store
+
+    model = backtest.fit_walk_forward_model(store, 60, min_history=30)
+    same = backtest.fit_walk_forward_model(changed, 60, min_history=30)
+    np.testing.assert_allclose(model.coef, same.coef)
+    assert model.latest_round == 60
+    assert backtest.fit_walk_forward_model(store, 30, min_history=30) is None
+
+
+def test_explicit_engine_ignores_dataset_model(model_dir, draws, monkeypatch):
+    """백테스트처럼 엔진을 직접 주면 전체 이력으로 학습된 데이터셋 모델을 쓰지 않는다"""
+    dataset = make_dataset(*draws, 'updated')
+    model = app.load_statistical_model(dataset, model_dir)
+    monkeypatch.setattr(app, 'active_dataset', dataset._replace(statistical_model=model))
+
+    engine = make_dataset(draws[0][:50], draws[1][:50], None).engine
+    np.testing.assert_array_equal(app.get_model_weights('통계분석 모델', engine), np.ones(45))
+    np.testing.assert_allclose(
+        app.get_model_weights('통계분석 모델', engine, statistical_model=model), model.weight_vector(engine)
+    )
+
+
+def test_backtest_chunk_includes_refit_statistical_model():
+    latest = app.current_dataset().store.latest_round
+    rounds, tier_counts, uniform_rounds = backtest.backtest_chunk(latest - 2, latest, ['통계분석 모델'], 5, 0)
+
+    assert rounds == 3 and uniform_rounds == 0
+    assert sum(tier_counts['통계분석 모델']) <= 15
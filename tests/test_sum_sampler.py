@@ -0,0 +1,62 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+import app
+
+
+def all_ticket_sums():
+    """8,145,060개 조합 전체의 합계 히스토그램 (무차별 대입 기준값)"""
+    histogram = np.zeros(app.MAX_TICKET_SUM + 1, dtype=np.int64)
+    for start in range(0, app.COMBINATION_COUNT, 1 << 20):
+        ranks = np.arange(start, min(start + (1 << 20), app.COMBINATION_COUNT))
+        histogram += np.bincount(app.unrank_tickets(ranks).sum(axis=1), minlength=len(histogram))
+    return histogram
+
+
+def test_sum_table_counts_match_enumeration():
+    table = app.build_sum_table()
+    np.testing.assert_array_equal(table[6, 1:46].sum(axis=(0, 2, 3)), all_ticket_sums())
+
+
+@pytest.mark.parametrize('fixed, track_even, track_consecutive', [
+    ((), True, True),
+    ((7,), False, False),
+    ((3, 44), True, False),
+    ((10, 11, 12), False, True),
+])
+def test_sum_table_total_is_number_of_completions(fixed, track_even, track_consecutive):
+    table = app.build_sum_table(fixed, track_even, track_consecutive)
+    # 고정 번호가 있으면 시작 번호(최솟값)는 가장 작은 고정 번호 이하
+    start_limit = fixed[0] if fixed else 45
+    assert int(table[6, 1:start_limit + 1].sum()) == comb(45 - len(fixed), 6 - len(fixed))
+
+
+def test_samples_satisfy_constraints(rng):
+    fixed = (8, 30)
+    tickets = app.sample_sum_constrained_tickets(
+        rng, 5000, (120, 140), fixed, even_counts=[2, 3], consecutive_counts=[0, 1]
+    )
+
+    assert (np.diff(tickets, axis=1) > 0).all()
+    assert tickets.min() >= 1 and tickets.max() <= 45
+    assert all(set(fixed) <= set(t) for t in tickets.tolist())
+    sums = tickets.sum(axis=1)
+    assert ((sums >= 120) & (sums <= 140)).all()
+    assert np.isin((tickets % 2 == 0).sum(axis=1), [2, 3]).all()
+    assert np.isin((np.diff(tickets, axis=1) == 1).sum(axis=1), [0, 1]).all()
+
+
+def test_samples_uniform_over_matching_combinations(rng):
+    # 합계 21~23: {1..6}, {1,2,3,4,5,7}, {1,2,3,4,5,8}, {1,2,3,4,6,7} 네 조합
+    tickets = app.sample_sum_constrained_tickets(rng, 40000, (21, 23))
+    ranks, counts = np.unique(app.rank_tickets(tickets), return_counts=True)
+
+    assert len(ranks) == 4
+    assert np.abs(counts / 40000 - 0.25).max() < 0.015
+
+
+def test_impossible_range_raises(rng):
+    with pytest.raises(ValueError):
+        app.sample_sum_constrained_tickets(rng, 10, (0, 20))
@@ -0,0 +1,180 @@
+"""LottoPro AI 통계분석 모델 오프라인 학습
+
+이력의 각 회차 r에 대해 1..r-1회차 상태의 번호별 특징(app.number_feature_matrix)과
+r회차 출현 여부를 모아 번호별 로지스틱 회귀(L2, 뉴턴법)를 학습한다. 특징 행렬은
+AnalysisEngine을 한 번 만든 뒤 append_draw로 한 회차씩 증분 갱신하며 만든다.
+결과는 가중치, 특징 정규화 상수, 데이터셋 해시, 마지막 학습 회차와 이력 해시,
+학습 지표를 담은 버전 있는 .npz 아티팩트(models/statistical-<생성 시각>.npz)로
+저장되고, 앱은 학습 이력이 현재 이력의 앞부분인 가장 최신 아티팩트를 로드한다.
+
+    python train_model.py --output-dir models --holdout 0.2 --l2 1.0
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import app
+
+
+def build_training_set(store, min_history=100):
+    """워크포워드 특징/정답 (X: (R*45, F), y: (R*45,), rounds: (R,))"""
+    if len(store) <= min_history:
+        raise ValueError(f"학습에 필요한 회차가 부족합니다: {len(store)} <= {min_history}")
+
+    engine = app.AnalysisEngine(app.DrawStore(
+        store.rounds[:min_history], store.dates[:min_history], store.numbers[:min_history], store.bonus[:min_history]
+    ))
+    features, labels = [], []
+    for row in range(min_history, len(store)):
+        draw_numbers = store.numbers[row]
+        features.append(app.number_feature_matrix(engine))
+        target = np.zeros(46)
+        target[draw_numbers] = 1.0
+        labels.append(target[1:])
+        engine.append_draw(int(store.rounds[row]), store.dates[row], draw_numbers, int(store.bonus[row]))
+
+    return np.concatenate(features), np.concatenate(labels), store.rounds[min_history:]
+
+
+def fit_logistic(X, y, l2=1.0, iterations=50, tolerance=1e-8):
+    """L2 정규화 로지스틱 회귀 (뉴턴-랩슨). 특징은 이미 표준화되어 있어야 한다. 반환: (coef, intercept)"""
+    design = np.column_stack([np.ones(len(X)), X])
+    penalty = np.full(design.shape[1], l2)
+    penalty[0] = 0.0  # 절편은 정규화하지 않음
+    params = np.zeros(design.shape[1])
+    params[0] = np.log(y.mean() / (1 - y.mean()))
+
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(design @ params)))
+        gradient = design.T @ (p - y) + penalty * params
+        hessian = (design * (p * (1 - p))[:, None]).T @ design + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        params -= step
+        if np.abs(step).max() < tolerance:
+            break
+    return params[1:], float(params[0])
+
+
+def fit_model(X, y, l2=1.0):
+    """특징 표준화 후 로지스틱 회귀 학습. 반환: (coef, intercept, mean, scale)"""
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    coef, intercept = fit_logistic((X - mean) / scale, y, l2)
+    return coef, intercept, mean, scale
+
+
+def log_loss(y, p):
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def roc_auc(y, scores):
+    """순위 기반 AUC (동점은 평균 순위)"""
+    order = np.argsort(scores, kind='stable')
+    ranks = np.empty(len(scores))
+    sorted_scores = scores[order]
+    _, first, counts = np.unique(sorted_scores, return_index=True, return_counts=True)
+    average_ranks = first + (counts + 1) / 2
+    ranks[order] = np.repeat(average_ranks, counts)
+    positives = y.sum()
+    negatives = len(y) - positives
+    if positives == 0 or negatives == 0:
+        return 0.5
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def train(store, dataset_hash, min_history=100, holdout=0.2, l2=1.0):
+    """학습 후 아티팩트 내용 딕셔너리 반환"""
+    started = time.perf_counter()
+    X, y, rounds = build_training_set(store, min_history)
+
+    # 마지막 holdout 비율 회차는 평가용 (시간 순서 유지)
+    split_round = int(len(rounds) * (1 - holdout))
+    split = split_round * 45
+    X_train, y_train, X_test, y_test = X[:split], y[:split], X[split:], y[split:]
+
+    coef, intercept, mean, scale = fit_model(X_train, y_train, l2)
+
+    model = app.StatisticalModel(None, coef, intercept, mean, scale, dataset_hash, {}, '')
+    baseline = 6 / 45
+    metrics = {
+        'train_rounds': split_round,
+        'holdout_rounds': len(rounds) - split_round,
+        'train_log_loss': log_loss(y_train, model.predict_proba(X_train)),
+        'train_baseline_log_loss': log_loss(y_train, np.full(len(y_train), baseline)),
+        'elapsed_seconds': None
+    }
+    if len(y_test):
+        test_p = model.predict_proba(X_test)
+        metrics.update({
+            'holdout_from_round': int(rounds[split_round]),
+            'holdout_log_loss': log_loss(y_test, test_p),
+            'holdout_baseline_log_loss': log_loss(y_test, np.full(len(y_test), baseline)),
+            'holdout_auc': roc_auc(y_test, test_p)
+        })
+    metrics['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+
+    return {
+        'format_version': np.array(app.STATISTICAL_MODEL_VERSION),
+        'feature_names': np.array(app.STATISTICAL_FEATURES),
+        'coef': coef,
+        'intercept': np.array(intercept),
+        'mean': mean,
+        'scale': scale,
+        'dataset_hash': np.array(dataset_hash or ''),
+        'latest_round': np.array(store.latest_round),
+        'history_hash': np.array(app.history_prefix_hash(store, len(store))),
+        'metrics': np.array(json.dumps(metrics)),
+        'created': np.array(datetime.now().isoformat(timespec='seconds'))
+    }
+
+
+def save_artifact(artifact, output_dir):
+    """statistical-<생성 시각>.npz로 원자적으로 저장하고 경로 반환"""
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = str(artifact['created']).replace('-', '').replace(':', '')
+    path = os.path.join(output_dir, f'statistical-{stamp}.npz')
+    tmp_path = os.path.join(output_dir, f'.statistical-{stamp}.{os.getpid()}.npz')
+    np.savez(tmp_path, **artifact)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LottoPro AI 통계분석 모델 오프라인 학습')
+    parser.add_argument('--output-dir', default=app.MODEL_DIR, help='아티팩트 저장 디렉터리')
+    parser.add_argument('--min-history', type=int, default=100, help='첫 학습 샘플 전에 쌓을 회차 수')
+    parser.add_argument('--holdout', type=float, default=0.2, help='평가용으로 남길 마지막 회차 비율')
+    parser.add_argument('--l2', type=float, default=1.0, help='L2 정규화 강도')
+    args = parser.parse_args(argv)
+
+    dataset = app.current_dataset()
+    store = dataset.store
+    if not store:
+        print("❌ 학습할 데이터가 없습니다")
+        return 2
+    try:
+        artifact = train(store, dataset.hash, args.min_history, args.holdout, args.l2)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    path = save_artifact(artifact, args.output_dir)
+    metrics = json.loads(str(artifact['metrics']))
+    print(f"\n=== 통계분석 모델 학습: {store.latest_round}회차까지, {metrics['elapsed_seconds']}초 ===")
+    for name, value in zip(app.STATISTICAL_FEATURES, artifact['coef']):
+        print(f"  {name:<16}{value:+.4f}")
+    for key, value in metrics.items():
+        print(f"  {key:<28}{value}")
+    print(f"아티팩트 저장: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())